@@ -1,12 +1,27 @@
 import streamlit as st
 import numpy as np
-import joblib
-import requests
 import os
+import sys
+import logging
 import time
 from datetime import datetime
 from dotenv import load_dotenv
 
+# Shared project code (label rules, ...) lives in src/
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+from label_rules import evaluate, evaluate_one
+from model_registry import get_model, health as model_health, is_available
+from feature_store import FEATURES
+from inference import forecast_batch, predict_batch, predict_one
+from live_poller import latest_snapshot, network_frame, read_snapshot, start_poller
+from locations import DELHI_CENTRAL, get_locations
+from observation_store import STORE
+from prediction_cache import PREDICTIONS
+from profiling import LATENCY, current_rss_mb, timed
+
+# Stage latencies (p50/p95) are logged by src/profiling.py
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"))
+
 load_dotenv()
 
 # ==================================================
@@ -26,6 +41,8 @@ if "live_data" not in st.session_state:
     st.session_state.live_data = None
 if "last_refresh" not in st.session_state:
     st.session_state.last_refresh = None
+if "observed_at" not in st.session_state:
+    st.session_state.observed_at = None
 
 # ==================================================
 # ENHANCED DARK THEME (WHITE BACKGROUND FIXED)
@@ -153,34 +170,57 @@ html, body, [class*="css"] {
 """, unsafe_allow_html=True)
 
 # ==================================================
-# LOAD MODELS (UNCHANGED)
+# MODELS
 # ==================================================
-pm25_model = joblib.load("models/pm25_model.pkl")
-pm10_model = joblib.load("models/pm10_model.pkl")
-extreme_model = joblib.load("models/extreme_pollution_classifier.pkl")
-fog_model = joblib.load("models/fog_prediction_model.pkl")
+# Loaded lazily through the process-wide registry (src/model_registry.py):
+# each model is deserialized once per server process, not on every rerun.
+
+# Health check: open the app with ?health=1 for a JSON status report
+if st.query_params.get("health"):
+    st.json({
+        "process_rss_mb": current_rss_mb(),
+        "models": model_health(),
+    })
+    st.stop()
 
 # ==================================================
-# API CONFIG (UNCHANGED)
+# API CONFIG
 # ==================================================
 API_KEY = os.getenv("OPENWEATHER_API_KEY")
-LAT, LON = 28.6139, 77.2090
+LOCATION_ID, LAT, LON = DELHI_CENTRAL.id, DELHI_CENTRAL.lat, DELHI_CENTRAL.lon
+
+# Background poller (src/live_poller.py) keeps a local snapshot of the
+# latest observation for every location (LIVE_LOCATIONS: CPCB stations by
+# default, or grid:<km>); started once per server process. Set
+# LIVE_POLLER=external when it runs as its own process instead.
+if os.getenv("LIVE_POLLER", "thread") == "thread":
+    locations = get_locations()
+    if DELHI_CENTRAL not in locations:
+        locations = [DELHI_CENTRAL] + locations
+    start_poller(locations, API_KEY)
+
+# Shown until the first poll lands (typical Delhi readings)
+FALLBACK_OBSERVATION = {
+    "temperature": 25, "humidity": 60, "pressure": 1013,
+    "wind_speed": 5, "pm25": 100, "pm10": 150
+}
 
 def fetch_real_time_data():
-    weather = requests.get(
-        f"https://api.openweathermap.org/data/2.5/weather?lat={LAT}&lon={LON}&appid={API_KEY}&units=metric"
-    ).json()
-    air = requests.get(
-        f"https://api.openweathermap.org/data/2.5/air_pollution?lat={LAT}&lon={LON}&appid={API_KEY}"
-    ).json()
-    return {
-        "temperature": weather["main"]["temp"],
-        "humidity": weather["main"]["humidity"],
-        "pressure": weather["main"]["pressure"],
-        "wind_speed": weather["wind"]["speed"],
-        "pm25": air["list"][0]["components"]["pm2_5"],
-        "pm10": air["list"][0]["components"]["pm10"],
-    }
+    # Page loads only read the local snapshot, so they never wait on the
+    # provider. Before the very first poll has landed there is no reading
+    # yet: returns None and the page shows FALLBACK_OBSERVATION, instead
+    # of fetching inline (which would block every rerun during an outage).
+    with timed("fetch_real_time_data"):
+        entry = latest_snapshot(LOCATION_ID)
+        if entry is None or "observation" not in entry:
+            return None
+        observation, observed_at = entry["observation"], entry["fetched_at"]
+        FEATURES.update(LOCATION_ID, observation, observed_at)
+        st.session_state.observed_at = observed_at
+        st.session_state.last_refresh = (
+            datetime.fromtimestamp(observed_at).strftime("%H:%M:%S")
+        )
+        return observation
 
 # ==================================================
 # 🚨 EVERYTHING BELOW THIS LINE IS UNCHANGED 🚨
@@ -214,12 +254,13 @@ with st.container():
             st.markdown(f"🕐 **Last Updated:** {st.session_state.last_refresh}")
         else:
             st.markdown("🕐 **Last Updated:** --:--")
+        entry = latest_snapshot(LOCATION_ID)
+        if entry and entry.get("error"):
+            st.caption("⚠️ Provider unavailable, showing the last good reading")
     with col3:
         if st.button("🔄 Refresh Data", type="primary", use_container_width=True):
-            with st.spinner("Fetching latest data..."):
-                st.session_state.live_data = fetch_real_time_data()
-                st.session_state.last_refresh = datetime.now().strftime("%H:%M:%S")
-                st.rerun()
+            st.session_state.live_data = fetch_real_time_data()
+            st.rerun()
 
 
 # ==================================================
@@ -232,22 +273,16 @@ tabs = st.tabs(["📊 Dashboard", "🌡️ Live Sensors", "🔮 Forecast Lab", "
 # DASHBOARD TAB - ENHANCED
 # ==================================================
 with tabs[0]:
-    try:
-        if st.session_state.live_data is None:
-            st.session_state.live_data = fetch_real_time_data()
-            st.session_state.last_refresh = datetime.now().strftime("%H:%M:%S")
-        data = st.session_state.live_data
-    except:
-        data = st.session_state.live_data or {
-            "temperature": 25, "humidity": 60, "pressure": 1013,
-            "wind_speed": 5, "pm25": 100, "pm10": 150
-        }
-    
-    # Risk predictions
-    risk = extreme_model.predict([[data["temperature"], data["humidity"], data["pressure"], 
-                                   data["wind_speed"], data["pm10"]]])[0]
-    fog = fog_model.predict([[data["temperature"], data["humidity"], data["pressure"], 
-                              data["wind_speed"], data["pm25"], data["pm10"]]])[0]
+    # Cheap local read: every rerun picks up the poller's latest snapshot
+    st.session_state.live_data = fetch_real_time_data()
+    data = st.session_state.live_data
+    if data is None:
+        st.info("⏳ Waiting for the first live reading; showing typical values until the poller's first refresh lands.")
+        data = FALLBACK_OBSERVATION
+    
+    # Risk predictions (one batched call through src/inference.py)
+    prediction = predict_one(data, outputs=["risk", "fog"])
+    risk, fog = prediction["risk"], prediction["fog"]
     
     # --- EXECUTIVE OVERVIEW ---
     st.markdown('<div class="block">', unsafe_allow_html=True)
@@ -257,33 +292,20 @@ with tabs[0]:
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
+        # Trend and comfort bands from label_rules.py
+        trend = evaluate_one("temperature_trend", data)
         st.metric("🌡️ Temperature", f"{data['temperature']:.1f}°C", 
-                 delta="+2°C" if data['temperature'] > 28 else "-1°C" if data['temperature'] < 20 else None)
+                 delta={"Warm": "+2°C", "Cool": "-1°C"}.get(trend))
     
     with col2:
-        # Air Quality Index
-        if data['pm25'] < 50:
-            aqi_color = "green"
-            aqi_status = "Good"
-        elif data['pm25'] < 100:
-            aqi_color = "yellow"
-            aqi_status = "Moderate"
-        elif data['pm25'] < 200:
-            aqi_color = "orange"
-            aqi_status = "Poor"
-        else:
-            aqi_color = "red"
-            aqi_status = "Severe"
+        # Air Quality Index (bands from label_rules.py)
+        aqi_status = evaluate_one("air_quality", data)
         st.metric("💨 Air Quality", aqi_status, 
                  delta=f"PM2.5: {data['pm25']:.0f} µg/m³")
     
     with col3:
         # Comfort Index
-        comfort = "Comfortable"
-        if data['humidity'] > 80:
-            comfort = "Humid"
-        elif data['temperature'] > 30:
-            comfort = "Hot"
+        comfort = evaluate_one("comfort", data)
         st.metric("😌 Comfort", comfort, 
                  delta=f"{data['humidity']}% RH")
     
@@ -357,6 +379,9 @@ with tabs[0]:
     status_cols[2].markdown('<div class="status-pill" style="background: #3b82f620; color: #3b82f6;">🔄 Real-time Processing</div>', unsafe_allow_html=True)
     status_cols[3].markdown(f'<div class="status-pill" style="background: #8b5cf620; color: #8b5cf6;">📊 {len(["pm25", "pm10", "extreme", "fog"])} Models Active</div>', unsafe_allow_html=True)
     
+    with st.expander("🩺 Model Health"):
+        st.dataframe(model_health(), use_container_width=True, hide_index=True)
+    
     st.markdown("""
     <div style="margin-top: 20px; padding: 15px; background: rgba(59, 130, 246, 0.1); border-radius: 12px; border-left: 4px solid #3b82f6;">
     <strong>System Intelligence:</strong> 
@@ -377,7 +402,7 @@ with tabs[1]:
     st.markdown('<div class="block">', unsafe_allow_html=True)
     st.markdown('<div class="section-title">🌡️ Live Sensor Data</div>', unsafe_allow_html=True)
     
-    data = st.session_state.live_data or fetch_real_time_data()
+    data = st.session_state.live_data or FALLBACK_OBSERVATION
     
     # Environmental Metrics
     st.markdown("### Environmental Parameters")
@@ -408,13 +433,18 @@ with tabs[1]:
         """, unsafe_allow_html=True)
     
     with env_col3:
-        wind_color = "#60a5fa" if data["wind_speed"] < 10 else "#f59e0b" if data["wind_speed"] < 20 else "#ef4444"
+        wind_color = {"Normal": "#60a5fa", "High": "#f59e0b", "Severe": "#ef4444"}[
+            evaluate_one("wind_alert", data)
+        ]
+        wind_label = {"Breeze": "🌬️ Breeze", "Moderate": "💨 Moderate", "Strong": "🌪️ Strong"}[
+            evaluate_one("wind_level", data)
+        ]
         st.markdown(f"""
         <div style="text-align: center; padding: 20px; background: rgba(96, 165, 250, 0.1); border-radius: 16px;">
             <div style="font-size: 2rem; font-weight: bold; color: {wind_color};">{data["wind_speed"]:.1f} m/s</div>
             <div style="color: #94a3b8;">Wind Speed</div>
             <div style="font-size: 0.9rem; color: {wind_color}; margin-top: 5px;">
-                {'🌬️ Breeze' if data["wind_speed"] < 5 else '💨 Moderate' if data["wind_speed"] < 10 else '🌪️ Strong'}
+                {wind_label}
             </div>
         </div>
         """, unsafe_allow_html=True)
@@ -424,10 +454,10 @@ with tabs[1]:
     pol_col1, pol_col2, pol_col3 = st.columns(3)
     
     with pol_col1:
-        pm25_level = "Low" if data["pm25"] < 50 else "Moderate" if data["pm25"] < 100 else "High"
-        pm25_color = "#10b981" if data["pm25"] < 50 else "#f59e0b" if data["pm25"] < 100 else "#ef4444"
+        pm25_level = evaluate_one("pm25_level", data)
+        pm25_color = "#10b981" if pm25_level == "Low" else "#f59e0b" if pm25_level == "Moderate" else "#ef4444"
         st.markdown(f"""
-        <div style="text-align: center; padding: 20px; background: rgba({'34, 197, 94' if data['pm25'] < 50 else '245, 158, 11' if data['pm25'] < 100 else '239, 68, 68'}, 0.1); border-radius: 16px;">
+        <div style="text-align: center; padding: 20px; background: rgba({'34, 197, 94' if pm25_level == 'Low' else '245, 158, 11' if pm25_level == 'Moderate' else '239, 68, 68'}, 0.1); border-radius: 16px;">
             <div style="font-size: 2rem; font-weight: bold; color: {pm25_color};">{data["pm25"]:.1f}</div>
             <div style="color: #94a3b8;">PM2.5 (µg/m³)</div>
             <div style="font-size: 0.9rem; color: {pm25_color}; margin-top: 5px;">
@@ -437,10 +467,10 @@ with tabs[1]:
         """, unsafe_allow_html=True)
     
     with pol_col2:
-        pm10_level = "Low" if data["pm10"] < 50 else "Moderate" if data["pm10"] < 100 else "High"
-        pm10_color = "#10b981" if data["pm10"] < 50 else "#f59e0b" if data["pm10"] < 100 else "#ef4444"
+        pm10_level = evaluate_one("pm10_level", data)
+        pm10_color = "#10b981" if pm10_level == "Low" else "#f59e0b" if pm10_level == "Moderate" else "#ef4444"
         st.markdown(f"""
-        <div style="text-align: center; padding: 20px; background: rgba({'34, 197, 94' if data['pm10'] < 50 else '245, 158, 11' if data['pm10'] < 100 else '239, 68, 68'}, 0.1); border-radius: 16px;">
+        <div style="text-align: center; padding: 20px; background: rgba({'34, 197, 94' if pm10_level == 'Low' else '245, 158, 11' if pm10_level == 'Moderate' else '239, 68, 68'}, 0.1); border-radius: 16px;">
             <div style="font-size: 2rem; font-weight: bold; color: {pm10_color};">{data["pm10"]:.1f}</div>
             <div style="color: #94a3b8;">PM10 (µg/m³)</div>
             <div style="font-size: 0.9rem; color: {pm10_color}; margin-top: 5px;">
@@ -455,13 +485,45 @@ with tabs[1]:
             <div style="font-size: 2rem; font-weight: bold; color: #a78bfa;">{data["pressure"]:.0f}</div>
             <div style="color: #94a3b8;">Pressure (hPa)</div>
             <div style="font-size: 0.9rem; color: #a78bfa; margin-top: 5px;">
-                {'Normal' if 1010 < data['pressure'] < 1020 else 'High' if data['pressure'] >= 1020 else 'Low'}
+                {evaluate_one("pressure_level", data)}
             </div>
         </div>
         """, unsafe_allow_html=True)
     
     st.markdown('</div>', unsafe_allow_html=True)
 
+    # --- STATION NETWORK ---
+    st.markdown('<div class="block">', unsafe_allow_html=True)
+    st.markdown('<div class="section-title">🗺️ Station Network</div>', unsafe_allow_html=True)
+
+    network = network_frame(read_snapshot())
+    if network.empty:
+        st.info("Waiting for the first poll of the station network...")
+    else:
+        # Every location scored in one batched model pass, with lag
+        # features from each location's recent readings
+        with timed("score_network"):
+            rows = [
+                FEATURES.features(row["id"], row, row["fetched_at"])
+                for row in network.to_dict("records")
+            ]
+            network = network.join(predict_batch(rows))
+        network["air_quality"] = evaluate("air_quality", network)
+        network["risk_level"] = network["risk"].map({0: "Low", 1: "High", 2: "Severe"})
+        network["color"] = network["risk"].map({0: "#10b981", 1: "#f59e0b", 2: "#ef4444"})
+
+        st.map(network, latitude="lat", longitude="lon", color="color", size=600)
+        st.dataframe(
+            network[["name", "pm25", "pm10", "pm25_pred", "pm10_pred",
+                     "air_quality", "risk_level", "fog", "stale"]]
+            .sort_values("pm25", ascending=False)
+            .round(1),
+            use_container_width=True, hide_index=True,
+        )
+        st.caption(f"{len(network)} locations • {int(network['stale'].sum())} showing a stale reading")
+
+    st.markdown('</div>', unsafe_allow_html=True)
+
 
 # ==================================================
 # FORECAST LAB TAB - ENHANCED
@@ -478,10 +540,7 @@ with tabs[2]:
     """, unsafe_allow_html=True)
     
     # Get live data or defaults
-    live_data = st.session_state.live_data or {
-        "temperature": 25, "humidity": 60, "pressure": 1013,
-        "wind_speed": 5, "pm25": 100, "pm10": 150
-    }
+    live_data = st.session_state.live_data or FALLBACK_OBSERVATION
     
     # Interactive Controls in two columns
     col1, col2 = st.columns(2)
@@ -507,13 +566,25 @@ with tabs[2]:
     # Prediction Button
     if st.button("🚀 Generate Forecast", type="primary", use_container_width=True):
         with st.spinner("Running ML models..."):
-            time.sleep(0.5)  # Simulate processing
-            
-            # Predictions
-            pm25_pred = pm25_model.predict([[temperature, humidity, pressure, wind_speed, pm25, pm25]])[0]
-            pm10_pred = pm10_model.predict([[temperature, humidity, pressure, wind_speed, pm10, pm10]])[0]
-            risk = extreme_model.predict([[temperature, humidity, pressure, wind_speed, pm10]])[0]
-            fog = fog_model.predict([[temperature, humidity, pressure, wind_speed, pm25, pm10]])[0]
+            # Predictions: all four models in one call. The sliders stand in
+            # for the latest reading and are the PM forecast's lag 1; older
+            # lags are the real readings before it (src/feature_store.py).
+            with timed("forecast_total"):
+                scenario = {
+                    "temperature": temperature, "humidity": humidity,
+                    "pressure": pressure, "wind_speed": wind_speed,
+                    "pm25": pm25, "pm10": pm10,
+                }
+                if st.session_state.observed_at is not None:
+                    scenario = FEATURES.features(
+                        LOCATION_ID, scenario, st.session_state.observed_at
+                    )
+                # Shared by all sessions; repeated what-ifs skip the models
+                prediction = PREDICTIONS.predict_one(scenario)
+            pm25_pred = prediction["pm25_pred"]
+            pm10_pred = prediction["pm10_pred"]
+            risk = prediction["risk"]
+            fog = prediction["fog"]
             
             # Results Display
             st.markdown("### 📊 Prediction Results")
@@ -591,6 +662,43 @@ with tabs[2]:
                 {insight}
             </div>
             """, unsafe_allow_html=True)
+            
+            # Several hours ahead, all targets in one batched call
+            # (src/multi_horizon.py; optional model)
+            if is_available("multi_horizon"):
+                st.markdown("### ⏩ Multi-Horizon Outlook")
+                with timed("forecast_horizons"):
+                    outlook = forecast_batch([{
+                        **scenario,
+                        "observed_at": st.session_state.observed_at or time.time(),
+                    }]).iloc[0]
+                horizons = get_model("multi_horizon").horizons
+                st.dataframe(
+                    {
+                        "": ["PM2.5 (µg/m³)", "PM10 (µg/m³)", "Temperature (°C)"],
+                        **{
+                            f"+{h}h": [round(outlook[f"{target}_{h}h"], 1)
+                                       for target in ("pm25", "pm10", "temperature")]
+                            for h in horizons
+                        },
+                    },
+                    use_container_width=True, hide_index=True,
+                )
+
+            # Real latency of each stage (last run, p50 and p95)
+            with st.expander("⏱️ Latency Breakdown"):
+                st.dataframe(LATENCY.summary(), use_container_width=True, hide_index=True)
+
+            # Prediction cache effectiveness across all sessions
+            with st.expander("🗃️ Prediction Cache"):
+                cache = PREDICTIONS.stats()
+                cache_col1, cache_col2, cache_col3 = st.columns(3)
+                cache_col1.metric(
+                    "Hit Rate",
+                    f"{cache['hit_rate']:.0%}" if cache["hit_rate"] is not None else "n/a",
+                )
+                cache_col2.metric("Hits / Misses", f"{cache['hits']} / {cache['misses']}")
+                cache_col3.metric("Entries", f"{cache['entries']} / {cache['max_entries']}")
     
     st.markdown('</div>', unsafe_allow_html=True)
 
@@ -610,13 +718,9 @@ with tabs[3]:
     """, unsafe_allow_html=True)
     
     # Get current data for analysis
-    current_data = st.session_state.live_data or fetch_real_time_data()
-    risk = extreme_model.predict([[current_data["temperature"], current_data["humidity"], 
-                                   current_data["pressure"], current_data["wind_speed"], 
-                                   current_data["pm10"]]])[0]
-    fog = fog_model.predict([[current_data["temperature"], current_data["humidity"], 
-                              current_data["pressure"], current_data["wind_speed"], 
-                              current_data["pm25"], current_data["pm10"]]])[0]
+    current_data = st.session_state.live_data or FALLBACK_OBSERVATION
+    prediction = predict_one(current_data, outputs=["risk", "fog"])
+    risk, fog = prediction["risk"], prediction["fog"]
     
     # Risk Matrix
     st.markdown("### 🎯 Risk Matrix")
@@ -627,7 +731,7 @@ with tabs[3]:
         
         # Health Risk
         with risk_cols[0]:
-            health_risk = "High" if current_data["pm25"] > 150 else "Medium" if current_data["pm25"] > 75 else "Low"
+            health_risk = evaluate_one("health_risk", current_data)
             health_color = "#ef4444" if health_risk == "High" else "#f59e0b" if health_risk == "Medium" else "#10b981"
             st.markdown(f"""
             <div style="text-align: center; padding: 20px; background: rgba({'239, 68, 68' if health_risk == 'High' else '245, 158, 11' if health_risk == 'Medium' else '34, 197, 94'}, 0.1); 
@@ -704,7 +808,7 @@ with tabs[3]:
         </div>
         """)
     
-    if current_data["temperature"] > 35:
+    if evaluate_one("heat_stress", current_data) == 1:
         recommendations.append("""
         <div class="insight-card">
             <strong>🔥 Heat Stress Advisory:</strong><br>
@@ -744,6 +848,26 @@ with tabs[4]:
     </div>
     """, unsafe_allow_html=True)
     
+    # Recent observations from the local history (src/observation_store.py)
+    st.markdown("### 🕒 Recent Observations")
+
+    trend_cols = st.columns([2, 1])
+    stations = {
+        entry.get("name", location_id): location_id
+        for location_id, entry in read_snapshot()["locations"].items()
+    } or {DELHI_CENTRAL.name: LOCATION_ID}
+    station = trend_cols[0].selectbox("Location", list(stations))
+    hours = trend_cols[1].selectbox("Window", [6, 24, 72, 168], index=1,
+                                    format_func=lambda h: f"Last {h} h")
+
+    with timed("history_query"):
+        history = STORE.query(stations[station], hours=hours)
+    if history.empty:
+        st.info("No stored observations in this window yet; the poller adds one every refresh.")
+    else:
+        st.line_chart(history.set_index("observed_at")[["pm25", "pm10"]])
+        st.caption(f"{len(history)} observations • {LATENCY.summary(['history_query'])[0]['last_ms']:.1f} ms query")
+
     # Key Relationships
     st.markdown("### 🔗 Key Environmental Relationships")
     
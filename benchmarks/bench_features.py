@@ -0,0 +1,40 @@
+from .common import SIZES, enter
+
+from data_store import TIMESTAMP_COLUMN, load_dataset
+from features import FEATURE_SPEC, build_features
+from labels import extreme_event_label, fog_label, pollution_risk_label
+
+
+# --------------------------------------------------
+# Label rules and feature building on the raw, time-sorted dataset
+# --------------------------------------------------
+class Features:
+    params = list(SIZES)
+    param_names = ["rows"]
+    timeout = 1800
+    number = 1
+
+    def setup(self, size):
+        enter(size)
+        self.df = load_dataset().sort_values(TIMESTAMP_COLUMN, ignore_index=True)
+
+    def time_fog_label(self, size):
+        fog_label(self.df)
+
+    def time_extreme_event_label(self, size):
+        extreme_event_label(self.df)
+
+    def time_pollution_risk_label(self, size):
+        pollution_risk_label(self.df["pm25"])
+
+    def time_lag_features(self, size):
+        build_features(self.df, {"lags": FEATURE_SPEC["lags"]})
+
+    def time_rolling_features(self, size):
+        build_features(self.df, {"rolling": FEATURE_SPEC["rolling"]})
+
+    def time_build_features(self, size):
+        build_features(self.df)
+
+    def peakmem_build_features(self, size):
+        build_features(self.df)
@@ -0,0 +1,72 @@
+import shutil
+import tempfile
+
+import pandas as pd
+
+from .common import SIZES, enter
+
+from data_store import (
+    CSV_PATH, RAW_COLUMNS, TIMESTAMP_COLUMN, build_cache, csv_schema, load_dataset,
+)
+from features import load_features
+import train_pm25_model
+
+
+# --------------------------------------------------
+# Loading the dataset: raw CSV, Parquet cache, cached feature frame
+# --------------------------------------------------
+class LoadCSV:
+    params = list(SIZES)
+    param_names = ["rows"]
+    timeout = 1800
+    number = 1
+
+    def setup(self, size):
+        enter(size)
+        self.schema = csv_schema()
+
+    def time_read_csv(self, size):
+        pd.read_csv(CSV_PATH, dtype=self.schema, parse_dates=[TIMESTAMP_COLUMN])
+
+    def peakmem_read_csv(self, size):
+        pd.read_csv(CSV_PATH, dtype=self.schema, parse_dates=[TIMESTAMP_COLUMN])
+
+
+class BuildParquetCache:
+    params = list(SIZES)
+    param_names = ["rows"]
+    timeout = 3600
+    number = 1
+    repeat = 1
+
+    def setup(self, size):
+        enter(size)
+        self.cache_dir = tempfile.mkdtemp()
+
+    def teardown(self, size):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def time_build_cache(self, size):
+        build_cache(cache_dir=self.cache_dir)
+
+
+class LoadParquet:
+    params = list(SIZES)
+    param_names = ["rows"]
+    timeout = 1800
+    number = 1
+
+    def setup(self, size):
+        enter(size)
+
+    def time_load_dataset(self, size):
+        load_dataset()
+
+    def peakmem_load_dataset(self, size):
+        load_dataset()
+
+    def time_load_model_columns(self, size):
+        load_dataset(columns=RAW_COLUMNS["pm25"])
+
+    def time_load_features(self, size):
+        load_features(columns=train_pm25_model.features + [train_pm25_model.TARGET])
@@ -0,0 +1,44 @@
+import joblib
+import numpy as np
+
+from .common import MODEL_SIZE, enter, ensure_models
+
+from train_all_models import TRAINERS, load_shared_frame
+
+
+# --------------------------------------------------
+# Each model's training script (fit + test-set evaluation) and raw
+# predict() on batches of its feature matrix
+# --------------------------------------------------
+class Fit:
+    # 10M rows of fully grown forests takes hours; run it by hand
+    params = (["10k", "1m"], list(TRAINERS), ["forest", "hgb"])
+    param_names = ["rows", "model", "backend"]
+    timeout = 3600
+    number = 1
+    repeat = 1
+
+    def setup(self, size, name, backend):
+        enter(size)
+        self.trainer = TRAINERS[name]
+        self.df = load_shared_frame({name: self.trainer})
+
+    def time_train(self, size, name, backend):
+        self.trainer.train(self.df, backend=backend)
+
+
+class Predict:
+    params = (list(TRAINERS), [1, 1000, 100_000])
+    param_names = ["model", "batch"]
+    timeout = 600
+
+    def setup(self, name, batch):
+        ensure_models(MODEL_SIZE)
+        trainer = TRAINERS[name]
+        self.model = joblib.load(trainer.MODEL_PATH)
+        X = load_shared_frame({name: trainer})[trainer.features].dropna()
+        # Repeat the (small) workspace to the batch size
+        self.X = X.iloc[np.arange(batch) % len(X)]
+
+    def time_predict(self, name, batch):
+        self.model.predict(self.X)
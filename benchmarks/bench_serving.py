@@ -0,0 +1,85 @@
+import os
+import tempfile
+import threading
+
+from .common import MODEL_SIZE, ensure_models
+
+import live_data
+from data_store import load_dataset
+from inference import predict_batch, predict_one
+from live_data import fetch_from_provider, fetch_many
+from live_poller import latest_snapshot, poll_once, write_snapshot
+from locations import DELHI_CENTRAL, STATIONS
+from observation_store import ObservationStore
+from stub_openweather_server import serve
+
+OBSERVATION_COLUMNS = [
+    "temperature", "humidity", "pressure", "wind_speed", "pm25", "pm10",
+]
+
+
+# --------------------------------------------------
+# Dashboard inference through the model registry: one predict_one call
+# per observation vs one predict_batch call for all of them
+# --------------------------------------------------
+class Inference:
+    params = [1, 10, 100]
+    param_names = ["observations"]
+    timeout = 600
+
+    def setup(self, rows):
+        ensure_models(MODEL_SIZE)
+        frame = load_dataset(columns=OBSERVATION_COLUMNS).dropna()
+        self.observations = frame.iloc[:rows].to_dict("records")
+        predict_batch(self.observations[:1])  # load the models
+
+    def time_predict_one_per_row(self, rows):
+        for observation in self.observations:
+            predict_one(observation)
+
+    def time_predict_batch(self, rows):
+        predict_batch(self.observations)
+
+
+# --------------------------------------------------
+# Live-data paths against the local stub provider (no network, no API
+# key): the snapshot app.fetch_real_time_data reads, and the poller's
+# side: a cycle where every station is still fresh in the TTL cache, and
+# a cold provider fetch (two HTTP calls)
+# --------------------------------------------------
+class FetchRealTimeData:
+    timeout = 120
+
+    def setup(self):
+        self.server = serve(port=0)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        live_data.OPENWEATHER_BASE_URL = (
+            f"http://127.0.0.1:{self.server.server_address[1]}"
+        )
+
+        self.tmp_dir = tempfile.mkdtemp()
+        self.snapshot_path = os.path.join(self.tmp_dir, "snapshot.json")
+        self.poll_path = os.path.join(self.tmp_dir, "poll.json")
+        self.store = ObservationStore(os.path.join(self.tmp_dir, "history.sqlite"))
+        observation = fetch_from_provider(DELHI_CENTRAL.lat, DELHI_CENTRAL.lon, "stub")
+        write_snapshot({"locations": {
+            loc.id: {"observation": observation, "fetched_at": 0.0}
+            for loc in STATIONS
+        }}, self.snapshot_path)
+        poll_once(STATIONS, "stub", self.poll_path, self.store)  # fills the cache
+
+    def teardown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def time_snapshot_read(self):
+        latest_snapshot(DELHI_CENTRAL.id, self.snapshot_path)
+
+    def time_poll_cached(self):
+        poll_once(STATIONS, "stub", self.poll_path, self.store)
+
+    def time_provider_fetch(self):
+        fetch_from_provider(DELHI_CENTRAL.lat, DELHI_CENTRAL.lon, "stub")
+
+    def time_provider_fetch_stations(self):
+        fetch_many([(loc.lat, loc.lon) for loc in STATIONS], "stub")
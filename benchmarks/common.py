@@ -0,0 +1,65 @@
+import os
+import sys
+
+# --------------------------------------------------
+# Shared setup for the asv benchmarks
+# --------------------------------------------------
+# The scripts in src/ are not an installable package, so asv's install
+# step copies each commit's src/ into its environment (asv.conf.json) and
+# it is put on sys.path here; outside asv the working tree's src/ is used.
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_ENV_SRC = os.path.join(os.environ.get("ASV_ENV_DIR", ""), "project_src")
+SRC_DIR = _ENV_SRC if os.path.isdir(_ENV_SRC) else os.path.join(REPO_ROOT, "src")
+sys.path.insert(0, SRC_DIR)
+
+from data_store import TIMESTAMP_COLUMN, count_rows  # noqa: E402
+from features import load_features  # noqa: E402
+from synthetic_data import SIZES, parse_rows, write_csv  # noqa: E402
+
+# Every benchmark runs inside a synthetic workspace per size
+# (data/delhi_weather_pollution.csv, its Parquet and feature caches, and
+# models/), generated once and reused by later runs.
+DATA_DIR = os.environ.get(
+    "BENCHMARK_DATA_DIR", os.path.join(REPO_ROOT, ".asv", "data")
+)
+
+# Sizes to run; e.g. BENCHMARK_SIZES=10k for a quick pass. Parameter
+# combinations outside it are reported as skipped.
+ENABLED_SIZES = os.environ.get("BENCHMARK_SIZES", ",".join(SIZES)).split(",")
+
+# Serving benchmarks score with models trained in this workspace
+MODEL_SIZE = "10k"
+
+
+def require(size):
+    if size not in ENABLED_SIZES:
+        raise NotImplementedError(f"{size} not in BENCHMARK_SIZES")  # asv: skip
+
+
+def enter(size):
+    """chdir into the workspace for size, creating it on first use."""
+    require(size)
+    path = os.path.join(DATA_DIR, size)
+    csv_path = os.path.join(path, "data", "delhi_weather_pollution.csv")
+    if not os.path.exists(csv_path):
+        write_csv(parse_rows(size), csv_path)
+    os.makedirs(os.path.join(path, "models"), exist_ok=True)
+    os.chdir(path)
+
+    # Build both caches now so no benchmark is charged for them
+    count_rows()
+    load_features(columns=[TIMESTAMP_COLUMN])
+    return path
+
+
+def ensure_models(size=MODEL_SIZE):
+    """enter(size) with every dashboard model trained (forest backend)."""
+    enter(size)
+    from train_all_models import TRAINERS, train_all
+
+    missing = [
+        name for name, trainer in TRAINERS.items()
+        if not os.path.exists(trainer.MODEL_PATH)
+    ]
+    if missing:
+        train_all(missing)
@@ -0,0 +1,228 @@
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from data_store import TIMESTAMP_COLUMN
+from estimators import BACKENDS, make_estimator
+from features import lag_column
+from shared_memmap import ARRAYS, memmap_pool
+from train_all_models import TRAINERS, load_shared_frame
+
+# --------------------------------------------------
+# ROLLING-ORIGIN BACKTEST
+# --------------------------------------------------
+# Replays the history the way the models would have been used: walk a
+# cutoff forward in fixed steps, train only on rows before each cutoff
+# (expanding, or a trailing --window), then forecast the next step. With
+# --retrain-every k a model is reused for k consecutive steps.
+#   - Retraining blocks are independent, so they run in a process pool
+#     that memory-maps one shared copy of the feature matrix; the time-
+#     sorted train/test ranges are contiguous and sliced as views.
+#   - Every prediction lands in one frame and the error tables are
+#     vectorized group-bys over it (overall, per month, per season), next
+#     to a persistence baseline (the last reading carried forward) where
+#     the model has a lag-1 feature.
+#   python src/backtest.py [--models pm25 pm10] [--step 30D] [--backend hgb]
+REGRESSION_MODELS = [
+    name for name, trainer in TRAINERS.items() if not hasattr(trainer, "CLASSES")
+]
+
+BACKTEST_DIR = "data/backtests"
+
+# Delhi's seasons (IMD-style; winter is the smog season)
+SEASONS = {
+    12: "Winter", 1: "Winter", 2: "Winter",
+    3: "Pre-monsoon", 4: "Pre-monsoon", 5: "Pre-monsoon",
+    6: "Monsoon", 7: "Monsoon", 8: "Monsoon", 9: "Monsoon",
+    10: "Post-monsoon", 11: "Post-monsoon",
+}
+SEASON_ORDER = ["Winter", "Pre-monsoon", "Monsoon", "Post-monsoon"]
+
+
+# --------------------------------------------------
+# Windows
+# --------------------------------------------------
+def walk_forward(timestamps, initial, step, window=None):
+    """(cutoff, train_start, train_stop, test_start, test_stop) row ranges
+    over time-sorted timestamps, one per step."""
+    timestamps = pd.DatetimeIndex(timestamps)
+    initial, step = pd.Timedelta(initial), pd.Timedelta(step)
+    window = pd.Timedelta(window) if window else None
+
+    cutoffs = pd.date_range(timestamps[0] + initial, timestamps[-1], freq=step)
+    result = []
+    for cutoff in cutoffs:
+        train_stop = timestamps.searchsorted(cutoff)
+        train_start = timestamps.searchsorted(cutoff - window) if window else 0
+        test_stop = timestamps.searchsorted(cutoff + step)
+        if test_stop > train_stop and train_stop > train_start:
+            result.append((cutoff, train_start, train_stop, train_stop, test_stop))
+    return result
+
+
+def retrain_blocks(windows, retrain_every):
+    """One task per retraining: the first window's training rows, and the
+    test rows of every window that reuses that model."""
+    blocks = []
+    for i in range(0, len(windows), retrain_every):
+        block = windows[i:i + retrain_every]
+        _, train_start, train_stop, _, _ = block[0]
+        blocks.append((train_start, train_stop, block[0][3], block[-1][4]))
+    return blocks
+
+
+# --------------------------------------------------
+# Worker side (one per process, arrays from shared_memmap.py)
+# --------------------------------------------------
+def _run_block(backend, forest_params, train_start, train_stop, test_start, test_stop):
+    X, y = ARRAYS["X"], ARRAYS["y"]
+    model = make_estimator(backend, "regressor", forest_params, n_jobs=1)
+    model.fit(X[train_start:train_stop], y[train_start:train_stop])
+    return test_start, model.predict(X[test_start:test_stop]).astype(np.float32)
+
+
+# --------------------------------------------------
+# Vectorized scoring
+# --------------------------------------------------
+def error_table(predictions, by):
+    # float64 sums: float32 means over millions of rows drift
+    actual = predictions["actual"].astype(np.float64)
+    error = predictions["predicted"].astype(np.float64) - actual
+    frame = predictions.assign(
+        abs_error=error.abs(), squared_error=error ** 2, error=error,
+    )
+    aggregations = {
+        "rows": ("actual", "size"),
+        "mae": ("abs_error", "mean"),
+        "rmse": ("squared_error", "mean"),
+        "bias": ("error", "mean"),
+    }
+    if "persistence" in frame:
+        frame["persistence_error"] = (
+            frame["persistence"].astype(np.float64) - actual
+        ).abs()
+        aggregations["persistence_mae"] = ("persistence_error", "mean")
+
+    table = frame.groupby(by, observed=True, sort=True).agg(**aggregations)
+    table["rmse"] = np.sqrt(table["rmse"])
+    if "persistence_mae" in table:
+        table["skill"] = 1 - table["mae"] / table["persistence_mae"]
+    return table
+
+
+def backtest(name, backend="forest", initial="365D", step="30D", window=None,
+             retrain_every=1, workers=None):
+    trainer = TRAINERS[name]
+    if hasattr(trainer, "CLASSES"):
+        raise ValueError(f"backtest supports regression models: {REGRESSION_MODELS}")
+
+    # --------------------------------------------------
+    # 1. Complete rows of the time-sorted feature frame
+    # --------------------------------------------------
+    df = load_shared_frame({name: trainer})
+    complete = np.logical_and.reduce(
+        [df[column].notna().to_numpy() for column in trainer.features + [trainer.TARGET]]
+    )
+    timestamps = df.loc[complete, TIMESTAMP_COLUMN].to_numpy()
+    X = df.loc[complete, trainer.features].to_numpy(dtype=np.float32)
+    y = df.loc[complete, trainer.TARGET].to_numpy(dtype=np.float32)
+    del df
+
+    windows = walk_forward(timestamps, initial, step, window)
+    if not windows:
+        raise ValueError("history is shorter than the initial training period")
+    blocks = retrain_blocks(windows, retrain_every)
+
+    # --------------------------------------------------
+    # 2. Retrain/forecast blocks in parallel over a shared memmap
+    # --------------------------------------------------
+    workers = workers or os.cpu_count() or 1
+    predicted = np.full(len(y), np.nan, dtype=np.float32)
+    start = time.perf_counter()
+    with memmap_pool(workers, X=X, y=y) as pool:
+        futures = [
+            pool.submit(_run_block, backend, trainer.FOREST_PARAMS, *block)
+            for block in blocks
+        ]
+        for future in futures:
+            test_start, values = future.result()
+            predicted[test_start:test_start + len(values)] = values
+    print(f"{name} ({backend}): {len(windows)} windows, {len(blocks)} trainings "
+          f"in {time.perf_counter() - start:.1f}s with {workers} workers")
+
+    # --------------------------------------------------
+    # 3. One frame of every out-of-sample forecast
+    # --------------------------------------------------
+    scored = ~np.isnan(predicted)
+    cutoffs = np.array([w[0] for w in windows], dtype="datetime64[ns]")
+    scored_timestamps = pd.DatetimeIndex(timestamps[scored])
+    predictions = pd.DataFrame({
+        TIMESTAMP_COLUMN: scored_timestamps,
+        "window": cutoffs[np.searchsorted(cutoffs, scored_timestamps.to_numpy(), side="right") - 1],
+        "actual": y[scored],
+        "predicted": predicted[scored],
+    })
+    persistence = lag_column(trainer.TARGET, 1)
+    if persistence in trainer.features:
+        predictions["persistence"] = X[scored, trainer.features.index(persistence)]
+
+    predictions["month"] = scored_timestamps.month
+    predictions["season"] = pd.Categorical(
+        scored_timestamps.month.map(SEASONS), categories=SEASON_ORDER, ordered=True
+    )
+    return predictions
+
+
+def report(name, predictions):
+    pd.set_option("display.width", 120)
+    overall = error_table(predictions.assign(model=name), "model")
+    print(f"\n===== {name}: overall =====")
+    print(overall.round(3).to_string())
+    print(f"\n===== {name}: by month =====")
+    print(error_table(predictions, "month").round(3).to_string())
+    print(f"\n===== {name}: by season =====")
+    print(error_table(predictions, "season").round(3).to_string())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Walk-forward backtest with per-month and per-season errors."
+    )
+    parser.add_argument(
+        "--models", nargs="+", choices=REGRESSION_MODELS, default=["pm25", "pm10"],
+    )
+    parser.add_argument("--backend", choices=BACKENDS, default="forest")
+    parser.add_argument(
+        "--initial", default="365D",
+        help="History before the first cutoff (pandas offset, default 365D)"
+    )
+    parser.add_argument("--step", default="30D", help="Forecast period per window")
+    parser.add_argument(
+        "--window",
+        help="Train on this trailing period only (default: all history)"
+    )
+    parser.add_argument(
+        "--retrain-every", type=int, default=1,
+        help="Reuse each model for this many windows"
+    )
+    parser.add_argument("--workers", type=int, help="Worker processes (default: one per core)")
+    parser.add_argument(
+        "--save", action="store_true",
+        help=f"Write every forecast to {BACKTEST_DIR}/<model>-<backend>.parquet"
+    )
+    args = parser.parse_args()
+
+    for name in args.models:
+        predictions = backtest(
+            name, args.backend, args.initial, args.step, args.window,
+            args.retrain_every, args.workers,
+        )
+        report(name, predictions)
+        if args.save:
+            os.makedirs(BACKTEST_DIR, exist_ok=True)
+            path = os.path.join(BACKTEST_DIR, f"{name}-{args.backend}.parquet")
+            predictions.to_parquet(path, index=False)
+            print(f"\nForecasts written to {path}")
@@ -0,0 +1,103 @@
+import argparse
+import pickle
+import time
+
+import numpy as np
+
+from sklearn.metrics import (
+    accuracy_score,
+    f1_score,
+    mean_absolute_error,
+    mean_squared_error,
+)
+
+from estimators import BACKENDS, available_backends, make_estimator
+from train_all_models import TRAINERS, load_shared_frame
+
+# --------------------------------------------------
+# Estimator backends side by side (src/estimators.py): fit time, predict
+# latency (one row, and per row over the whole test set), pickled size and
+# test error for every model, on the shared feature frame and the same
+# time-based 80/20 split as train_all_models.py.
+#   python src/benchmark_estimators.py [--models pm25 fog] [--backends forest hgb]
+# --------------------------------------------------
+SINGLE_ROW_CALLS = 50
+
+
+def score(trainer, y_true, y_pred):
+    if hasattr(trainer, "CLASSES"):
+        accuracy = accuracy_score(y_true, y_pred)
+        f1 = f1_score(y_true, y_pred, labels=trainer.CLASSES,
+                      average="macro", zero_division=0)
+        return f"acc {accuracy:.3f}  F1 {f1:.3f}"
+    mae = mean_absolute_error(y_true, y_pred)
+    rmse = np.sqrt(mean_squared_error(y_true, y_pred))
+    return f"MAE {mae:.2f}  RMSE {rmse:.2f}"
+
+
+def benchmark(name, backend, df, split_index):
+    trainer = TRAINERS[name]
+    task = "classifier" if hasattr(trainer, "CLASSES") else "regressor"
+    complete = np.logical_and.reduce(
+        [df[column].notna().to_numpy() for column in trainer.features + [trainer.TARGET]]
+    )
+    before_split = df.index < split_index
+    X_train = df.loc[complete & before_split, trainer.features]
+    y_train = df.loc[complete & before_split, trainer.TARGET]
+    X_test = df.loc[complete & ~before_split, trainer.features]
+    y_test = df.loc[complete & ~before_split, trainer.TARGET]
+
+    model = make_estimator(backend, task, trainer.FOREST_PARAMS)
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    y_pred = model.predict(X_test)
+    batch_us = (time.perf_counter() - start) / len(X_test) * 1e6
+
+    row = X_test.iloc[:1]
+    timings = []
+    for _ in range(SINGLE_ROW_CALLS):
+        start = time.perf_counter()
+        model.predict(row)
+        timings.append(time.perf_counter() - start)
+
+    return {
+        "fit_seconds": fit_seconds,
+        "single_ms": np.median(timings) * 1000,
+        "batch_us": batch_us,
+        "size_mb": len(pickle.dumps(model)) / (1024 * 1024),
+        "score": score(trainer, y_test, y_pred),
+    }
+
+
+def run(names, backends):
+    df = load_shared_frame({name: TRAINERS[name] for name in names})
+    split_index = int(len(df) * 0.8)
+    print(f"{len(df)} rows, {split_index} before the split\n")
+
+    print(f"{'model':<18}{'backend':<10}{'fit s':>8}{'1 row ms':>10}"
+          f"{'batch us/row':>14}{'size MB':>9}   test")
+    for name in names:
+        for backend in backends:
+            r = benchmark(name, backend, df, split_index)
+            print(
+                f"{name:<18}{backend:<10}{r['fit_seconds']:>8.1f}{r['single_ms']:>10.1f}"
+                f"{r['batch_us']:>14.2f}{r['size_mb']:>9.1f}   {r['score']}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare estimator backends on every model."
+    )
+    parser.add_argument(
+        "--models", nargs="+", choices=list(TRAINERS), default=list(TRAINERS),
+    )
+    parser.add_argument(
+        "--backends", nargs="+", choices=BACKENDS, default=available_backends(),
+    )
+    args = parser.parse_args()
+
+    run(args.models, args.backends)
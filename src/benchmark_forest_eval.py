@@ -0,0 +1,108 @@
+import argparse
+import os
+import time
+import warnings
+
+import joblib
+import numpy as np
+
+import compact_forest
+from compact_forest import CompactForest, is_forest
+from features import load_features
+from train_all_models import TRAINERS
+
+# Benchmark batches are plain arrays (the evaluator's input); the .pkl
+# forests were fitted on DataFrames
+warnings.filterwarnings("ignore", message="X does not have valid feature names")
+
+# --------------------------------------------------
+# Forest predict latency per call at 1 / 100 / 100k rows:
+#   sklearn          the .pkl as saved (n_jobs=-1 threads)
+#   sklearn 1 job    the same forest with n_jobs=1
+#   numpy            exact CompactForest, all trees walked at once
+#   numba            exact CompactForest, compiled kernel (if installed)
+# and whether the exact evaluator's output is identical to sklearn's.
+#   python src/benchmark_forest_eval.py [--models pm25 fog] [--rows 1 100 100000]
+# --------------------------------------------------
+ROWS = [1, 100, 100_000]
+
+
+def median_ms(predict, X, budget_seconds=2.0, max_calls=200):
+    timings = []
+    deadline = time.perf_counter() + budget_seconds
+    while len(timings) < max_calls and (not timings or time.perf_counter() < deadline):
+        start = time.perf_counter()
+        predict(X)
+        timings.append(time.perf_counter() - start)
+    return np.median(timings) * 1000
+
+
+def engines(forest, model_path, compact):
+    sklearn_one_job = joblib.load(model_path)
+    sklearn_one_job.set_params(n_jobs=1)
+
+    def with_engine(engine):
+        def predict(X):
+            compact_forest.ENGINE = engine
+            return compact.predict(X)
+        return predict
+
+    result = {
+        "sklearn": forest.predict,
+        "sklearn 1 job": sklearn_one_job.predict,
+        "numpy": with_engine("numpy"),
+    }
+    if compact_forest._numba_leaf_sums is not None:
+        result["numba"] = with_engine("numba")
+    return result, sklearn_one_job
+
+
+def identical(reference, compact, X):
+    if compact.classes_ is not None:
+        return np.array_equal(reference.predict_proba(X), compact.predict_proba(X))
+    return np.array_equal(reference.predict(X), compact.predict(X))
+
+
+def run(names, rows):
+    print(f"{'model':<18}{'engine':<15}" + "".join(f"{f'{n} rows ms':>16}" for n in rows))
+    checks = {}
+    for name in names:
+        trainer = TRAINERS[name]
+        if not os.path.exists(trainer.MODEL_PATH):
+            print(f"{name:<18}not trained")
+            continue
+        forest = joblib.load(trainer.MODEL_PATH)
+        if not is_forest(forest):
+            print(f"{name:<18}{type(forest).__name__} is not a forest")
+            continue
+
+        compact = CompactForest.from_sklearn(forest, exact=True)
+        X = load_features(columns=trainer.features).dropna().to_numpy(np.float32)
+        batches = {n: X[np.arange(n) % len(X)] for n in rows}
+
+        predictors, one_job = engines(forest, trainer.MODEL_PATH, compact)
+        for engine, predict in predictors.items():
+            predict(batches[rows[0]])  # warm up (numba compiles here)
+            print(f"{name:<18}{engine:<15}" + "".join(
+                f"{median_ms(predict, batches[n]):>16.2f}" for n in rows
+            ))
+        checks[name] = identical(one_job, compact, batches[rows[-1]])
+
+    compact_forest.ENGINE = "auto"
+    print()
+    for name, same in checks.items():
+        print(f"{name}: exact evaluator {'identical to' if same else 'DIFFERS from'} "
+              f"sklearn on {rows[-1]} rows")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Latency of the exact forest evaluator vs sklearn."
+    )
+    parser.add_argument(
+        "--models", nargs="+", choices=list(TRAINERS), default=list(TRAINERS),
+    )
+    parser.add_argument("--rows", nargs="+", type=int, default=ROWS)
+    args = parser.parse_args()
+
+    run(args.models, args.rows)
@@ -0,0 +1,83 @@
+import time
+
+from data_store import load_dataset
+from labels import (
+    fog_label,
+    extreme_event_label,
+    pollution_risk_label,
+)
+
+# --------------------------------------------------
+# Old row-wise rules (reference implementation)
+# --------------------------------------------------
+def is_fog(row):
+    if (
+        row["humidity"] >= 90 and
+        row["wind_speed"] <= 2 and
+        row["temperature"] <= 15 and
+        row["pm25"] >= 100
+    ):
+        return 1
+    else:
+        return 0
+
+
+def extreme_event(row):
+    if row["pm25"] >= 300:
+        return "Extreme Pollution"
+    elif row["temperature"] >= 45:
+        return "Heatwave"
+    elif row["fog"] == 1 and row["humidity"] >= 90:
+        return "Extreme Fog"
+    else:
+        return "Normal"
+
+
+def pollution_risk(pm25):
+    if pm25 <= 60:
+        return 0
+    elif pm25 <= 250:
+        return 1
+    else:
+        return 2
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+# --------------------------------------------------
+# Benchmark on the full dataset
+# --------------------------------------------------
+if __name__ == "__main__":
+    df = load_dataset(columns=[
+        "temperature", "humidity", "wind_speed", "pm25"
+    ])
+    df["fog"] = fog_label(df)
+    print(f"Rows: {len(df)}\n")
+
+    cases = [
+        ("fog",
+         lambda: df.apply(is_fog, axis=1),
+         lambda: fog_label(df)),
+        ("extreme_event",
+         lambda: df.apply(extreme_event, axis=1),
+         lambda: extreme_event_label(df)),
+        ("pollution_risk",
+         lambda: df["pm25"].apply(pollution_risk),
+         lambda: pollution_risk_label(df["pm25"])),
+    ]
+
+    print(f"{'label':<18}{'apply (s)':>12}{'vectorized (s)':>16}{'speedup':>10}  identical")
+    for name, old, new in cases:
+        expected, old_seconds = timed(old)
+        result, new_seconds = timed(new)
+        identical = result.equals(expected.astype(result.dtype))
+        print(
+            f"{name:<18}{old_seconds:>12.3f}{new_seconds:>16.4f}"
+            f"{old_seconds / new_seconds:>9.0f}x  {identical}"
+        )
+        if not identical:
+            raise SystemExit(f"{name}: vectorized labels differ from apply()")
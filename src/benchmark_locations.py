@@ -0,0 +1,81 @@
+import argparse
+import threading
+import time
+
+import live_data
+from compact_forest import EVALUATOR_MAX_ROWS
+from inference import predict_batch
+from live_data import fetch_many
+from locations import get_locations
+from stub_openweather_server import serve
+
+# --------------------------------------------------
+# How a refresh scales with the number of locations: provider fetch
+# (against the local stub, with simulated latency) at --concurrency and
+# one location at a time, and one batched scoring pass over every
+# location. --skip-sequential leaves out the one-at-a-time fetch, which
+# takes points x latency.
+#   python src/benchmark_locations.py [--delay 0.2] [--concurrency 8]
+# --------------------------------------------------
+SPECS = ["central", "stations", "grid:5", "grid:2"]
+
+
+def timed_fetch(locations, concurrency):
+    start = time.perf_counter()
+    results = fetch_many(
+        [(loc.lat, loc.lon) for loc in locations], "stub", concurrency
+    )
+    return results, time.perf_counter() - start
+
+
+def run(delay, concurrency, sequential=True, port=8766):
+    server = serve(port, delay=delay)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    live_data.OPENWEATHER_BASE_URL = f"http://127.0.0.1:{port}"
+
+    # Warm the model registry so no row pays for loading: a single row
+    # for the evaluator, a large batch for the sklearn forests behind it
+    # (compact_forest.DispatchedForest)
+    for rows in (1, EVALUATOR_MAX_ROWS + 1):
+        predict_batch([{
+            "temperature": 20.0, "humidity": 50.0, "pressure": 1010.0,
+            "wind_speed": 2.0, "pm25": 100.0, "pm10": 150.0,
+        }] * rows)
+
+    print(f"\nProvider latency {delay * 1000:.0f} ms, concurrency {concurrency}\n")
+    print(f"{'locations':<12}{'points':>8}{'fetch s':>10}{'sequential s':>14}{'score ms':>10}{'ms/point':>10}")
+    for spec in SPECS:
+        locations = get_locations(spec)
+
+        results, fetch_seconds = timed_fetch(locations, concurrency)
+        sequential_seconds = (
+            timed_fetch(locations, 1)[1] if sequential else float("nan")
+        )
+
+        observations = [r for r in results if not isinstance(r, Exception)]
+        start = time.perf_counter()
+        predict_batch(observations)
+        score_ms = (time.perf_counter() - start) * 1000
+
+        print(
+            f"{spec:<12}{len(locations):>8}{fetch_seconds:>10.2f}"
+            f"{sequential_seconds:>14.2f}{score_ms:>10.1f}"
+            f"{score_ms / len(locations):>10.2f}"
+        )
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark multi-location fetch and scoring."
+    )
+    parser.add_argument("--delay", type=float, default=0.2,
+                        help="Simulated provider latency per request (s)")
+    parser.add_argument("--concurrency", type=int,
+                        default=live_data.MAX_CONCURRENT_FETCHES)
+    parser.add_argument("--skip-sequential", action="store_true",
+                        help="Do not measure the one-at-a-time fetch")
+    args = parser.parse_args()
+
+    run(args.delay, args.concurrency, sequential=not args.skip_sequential)
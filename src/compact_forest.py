@@ -0,0 +1,352 @@
+import json
+import os
+import shutil
+import threading
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:  # optional: the NumPy evaluator is used instead
+    numba = None
+
+# --------------------------------------------------
+# COMPACT FOREST ARTIFACT
+# --------------------------------------------------
+# A fitted RandomForestRegressor / RandomForestClassifier flattened into a
+# handful of contiguous arrays (all trees back to back):
+#   feature    int16   split feature per node (-1 for leaves)
+#   threshold  float32 split threshold per node (float64 when exact)
+#   left/right int32   global child index (-1 for leaves)
+#   value      float32 node mean (regression) or class probabilities
+#                      (float64 when exact)
+#   roots      int32   index of each tree's root node
+# The arrays are stored as plain .npy files so np.load(mmap_mode="r")
+# maps them straight from disk: several Streamlit workers then share one
+# copy of the pages through the OS page cache.
+ARRAYS = ("feature", "threshold", "left", "right", "value", "roots")
+
+# Artifacts live in a compact/ directory next to their .pkl
+# (models/compact/<model> for the default model paths)
+COMPACT_DIR = "compact"
+
+# Serving artifacts are exact (full depth, float64: the .pkl's predictions
+# bit for bit). A depth cap gives smaller, approximate artifacts; deeper
+# nodes are folded into their ancestor at the cap (sklearn stores a value
+# for every node). This is the cap export_compact_models.py offers.
+CAPPED_MAX_DEPTH = 14
+
+# Evaluator: "numba" (compiled, when installed), "numpy", or "auto"
+ENGINE = os.getenv("FOREST_ENGINE", "auto")
+
+# Rows traversed at a time by the NumPy evaluator (bounds its scratch
+# arrays to a few MB per 100 trees)
+BATCH_ROWS = 4096
+
+# Batches of at most this many rows go to the evaluator, larger ones to
+# the sklearn forest (DispatchedForest). The evaluator has no per-call
+# overhead but walks every (row, tree) pair in NumPy passes, so sklearn's
+# compiled loop overtakes it at a few hundred rows on our forests (~250
+# for the deep PM models, ~1000 for fog).
+EVALUATOR_MAX_ROWS = int(os.getenv("FOREST_EVALUATOR_MAX_ROWS", "200"))
+
+
+def _float32_thresholds(threshold):
+    # sklearn compares float32 inputs against float64 thresholds. Rounding
+    # each threshold DOWN to float32 keeps every comparison x <= t unchanged
+    # for float32 x, so the cast never moves a sample to the other child.
+    t32 = threshold.astype(np.float32)
+    too_high = t32.astype(np.float64) > threshold
+    t32[too_high] = np.nextafter(t32[too_high], np.float32(-np.inf))
+    return t32
+
+
+def _node_depths(left, right):
+    depth = np.zeros(len(left), dtype=np.int32)
+    frontier = np.array([0])
+    level = 0
+    while len(frontier):
+        children = np.concatenate([left[frontier], right[frontier]])
+        frontier = children[children != -1]
+        level += 1
+        depth[frontier] = level
+    return depth
+
+
+def _flatten_tree(tree, max_depth, is_classifier, value_dtype, exact):
+    left = tree.children_left.astype(np.int64)
+    right = tree.children_right.astype(np.int64)
+    feature = tree.feature.astype(np.int64)
+    threshold = tree.threshold
+
+    if is_classifier:
+        value = tree.value[:, 0, :]
+        value = value / value.sum(axis=1, keepdims=True)
+    else:
+        value = tree.value[:, 0, 0]
+
+    keep = np.ones(len(left), dtype=bool)
+    if max_depth is not None:
+        depth = _node_depths(left, right)
+        keep = depth <= max_depth
+        # Nodes on the cap become leaves holding their own (mean) value
+        cut = depth == max_depth
+        left = np.where(cut, -1, left)
+        right = np.where(cut, -1, right)
+
+    # Renumber surviving nodes 0..n-1 (parents always precede children)
+    new_index = np.cumsum(keep) - 1
+    left, right = left[keep], right[keep]
+    is_leaf = left == -1
+    left = np.where(is_leaf, -1, new_index[np.maximum(left, 0)])
+    right = np.where(is_leaf, -1, new_index[np.maximum(right, 0)])
+    feature = np.where(is_leaf, -1, feature[keep])
+
+    return {
+        "feature": feature.astype(np.int16),
+        "threshold": threshold[keep] if exact else _float32_thresholds(threshold[keep]),
+        "left": left.astype(np.int32),
+        "right": right.astype(np.int32),
+        "value": value[keep].astype(value_dtype),
+    }
+
+
+class CompactForest:
+    """Flat-array forest with the predict() interface of the sklearn model."""
+
+    def __init__(self, arrays, meta):
+        for name in ARRAYS:
+            setattr(self, name, arrays[name])
+        self.meta = meta
+        self.classes_ = (
+            np.array(meta["classes"]) if meta.get("classes") is not None else None
+        )
+        self.n_features_in_ = meta["n_features"]
+        if meta.get("feature_names"):
+            self.feature_names_in_ = np.array(meta["feature_names"], dtype=object)
+
+    # --------------------------------------------------
+    # Build from a fitted sklearn forest
+    # --------------------------------------------------
+    @classmethod
+    def from_sklearn(cls, model, max_depth=None, value_dtype=np.float32, exact=False):
+        """exact=True keeps every node, float64 thresholds and values: the
+        predictions are then bit-for-bit those of sklearn's predict with
+        n_jobs=1 (threaded sklearn sums trees in a varying order, so it
+        differs from itself in the last bits)."""
+        if exact:
+            max_depth, value_dtype = None, np.float64
+        is_classifier = hasattr(model, "classes_")
+        trees = [
+            _flatten_tree(est.tree_, max_depth, is_classifier, value_dtype, exact)
+            for est in model.estimators_
+        ]
+
+        sizes = np.array([len(t["left"]) for t in trees])
+        offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.int32)
+        arrays = {"roots": offsets}
+        for name in ("feature", "threshold", "value"):
+            arrays[name] = np.concatenate([t[name] for t in trees])
+        for name in ("left", "right"):
+            arrays[name] = np.concatenate([
+                np.where(t[name] == -1, -1, t[name] + offset)
+                for t, offset in zip(trees, offsets)
+            ]).astype(np.int32)
+
+        meta = {
+            "kind": "classifier" if is_classifier else "regressor",
+            "classes": model.classes_.tolist() if is_classifier else None,
+            "n_features": int(model.n_features_in_),
+            "feature_names": (
+                list(model.feature_names_in_)
+                if hasattr(model, "feature_names_in_") else None
+            ),
+            "n_trees": len(trees),
+            "n_nodes": int(sizes.sum()),
+            "max_depth": max_depth,
+            "exact": exact,
+        }
+        return cls(arrays, meta)
+
+    # --------------------------------------------------
+    # Save / load (uncompressed .npy so the arrays can be memory-mapped)
+    # --------------------------------------------------
+    def save(self, path):
+        os.makedirs(path, exist_ok=True)
+        for name in ARRAYS:
+            np.save(os.path.join(path, f"{name}.npy"), getattr(self, name))
+        with open(os.path.join(path, "meta.json"), "w") as f:
+            json.dump(self.meta, f, indent=2)
+        return path
+
+    @classmethod
+    def load(cls, path, mmap_mode="r"):
+        arrays = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode)
+            for name in ARRAYS
+        }
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        return cls(arrays, meta)
+
+    # --------------------------------------------------
+    # Inference
+    # --------------------------------------------------
+    # Every tree is walked at once: one flat array holds the current node
+    # of each (row, tree) pair, each pass moves all of them one level down
+    # and drops the pairs that reached a leaf, so a batch costs about
+    # max-depth NumPy passes instead of one Python loop per tree. Leaf
+    # values are then summed tree by tree in training order, the order
+    # sklearn accumulates them in.
+    def _leaves(self, X):
+        """Leaf node index per (row, tree), shape (rows, trees)."""
+        n_trees = len(self.roots)
+        leaves = np.tile(np.asarray(self.roots, dtype=np.intp), len(X))
+        active = np.arange(len(leaves))
+        while len(active):
+            node = leaves[active]
+            left = self.left[node]
+            internal = left != -1
+            active, node, left = active[internal], node[internal], left[internal]
+            go_left = X[active // n_trees, self.feature[node]] <= self.threshold[node]
+            leaves[active] = np.where(go_left, left, self.right[node])
+        return leaves.reshape(len(X), n_trees)
+
+    def _leaf_sums_numpy(self, X):
+        sums = []
+        for start in range(0, len(X), BATCH_ROWS):
+            values = np.asarray(
+                self.value[self._leaves(X[start:start + BATCH_ROWS])],
+                dtype=np.float64,
+            )
+            total = values[:, 0].copy()
+            for tree in range(1, values.shape[1]):
+                total += values[:, tree]
+            sums.append(total)
+        return np.concatenate(sums)
+
+    def _leaf_sums_numba(self, X):
+        value = np.asarray(self.value)
+        sums = _numba_leaf_sums(
+            np.ascontiguousarray(X), np.asarray(self.roots),
+            np.asarray(self.feature), np.asarray(self.threshold),
+            np.asarray(self.left), np.asarray(self.right),
+            value.reshape(len(value), -1),
+        )
+        return sums.reshape((len(X),) + value.shape[1:])
+
+    def _use_numba(self):
+        return _numba_leaf_sums is not None and ENGINE in ("auto", "numba")
+
+    def _leaf_values(self, X):
+        if len(X) == 0:
+            shape = (0,) if self.classes_ is None else (0, len(self.classes_))
+            return np.zeros(shape)
+        sums = self._leaf_sums_numba(X) if self._use_numba() else self._leaf_sums_numpy(X)
+        return sums / len(self.roots)
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        mean = self._leaf_values(X)
+        if self.classes_ is None:
+            return mean
+        return self.classes_[np.argmax(mean, axis=1)]
+
+    def predict_proba(self, X):
+        return self._leaf_values(np.asarray(X, dtype=np.float32))
+
+
+class DispatchedForest:
+    """An exact CompactForest for small batches and the sklearn forest for
+    large ones (EVALUATOR_MAX_ROWS). load() returns the sklearn forest and
+    is called on the first large batch, so a process serving only small
+    batches never unpickles it."""
+
+    def __init__(self, compact, load, max_rows=EVALUATOR_MAX_ROWS):
+        self.compact = compact
+        self.forest = None
+        self._load = load
+        self._lock = threading.Lock()
+        self.max_rows = max_rows
+        self.classes_ = compact.classes_
+        self.n_features_in_ = compact.n_features_in_
+        if hasattr(compact, "feature_names_in_"):
+            self.feature_names_in_ = compact.feature_names_in_
+
+    def _forest(self):
+        if self.forest is None:
+            with self._lock:
+                if self.forest is None:
+                    self.forest = self._load()
+        return self.forest
+
+    def _model(self, X):
+        return self.compact if len(X) <= self.max_rows else self._forest()
+
+    def predict(self, X):
+        return self._model(X).predict(X)
+
+    def predict_proba(self, X):
+        return self._model(X).predict_proba(X)
+
+
+if numba is not None:
+    @numba.njit(parallel=True, cache=True)
+    def _numba_leaf_sums(X, roots, feature, threshold, left, right, value):
+        sums = np.zeros((X.shape[0], value.shape[1]))
+        for row in numba.prange(X.shape[0]):
+            for root in roots:
+                node = root
+                while left[node] != -1:
+                    if X[row, feature[node]] <= threshold[node]:
+                        node = left[node]
+                    else:
+                        node = right[node]
+                for k in range(value.shape[1]):
+                    sums[row, k] += value[node, k]
+        return sums
+else:
+    _numba_leaf_sums = None
+
+
+def is_forest(model):
+    """True for a fitted sklearn RandomForest (trees with a tree_)."""
+    return hasattr(model, "estimators_") and hasattr(model.estimators_[0], "tree_")
+
+
+def compact_path(model_path):
+    directory, filename = os.path.split(model_path)
+    return os.path.join(directory, COMPACT_DIR, os.path.splitext(filename)[0])
+
+
+def export_compact(model, model_path, max_depth=None, path=None):
+    """Write the serving artifact for a trained forest next to its .pkl,
+    or to path (e.g. a staging directory for replace_compact). Exact by
+    default; max_depth writes a smaller, approximate float32 artifact.
+
+    Other estimators (src/estimators.py) are served from the .pkl; any
+    artifact left by an earlier forest is removed so it cannot be served.
+    """
+    path = path or compact_path(model_path)
+    if not is_forest(model):
+        shutil.rmtree(path, ignore_errors=True)
+        return None
+    compact = (
+        CompactForest.from_sklearn(model, exact=True) if max_depth is None
+        else CompactForest.from_sklearn(model, max_depth=max_depth)
+    )
+    compact.save(path)
+    return path
+
+
+def replace_compact(staged, model_path):
+    """Swap a staged artifact directory in for the model's artifact. The
+    old one is renamed aside first, so a reader never sees a mix."""
+    path = compact_path(model_path)
+    retired = f"{path}.old"
+    shutil.rmtree(retired, ignore_errors=True)
+    if os.path.exists(path):
+        os.replace(path, retired)
+    os.replace(staged, path)
+    shutil.rmtree(retired, ignore_errors=True)
+    return path
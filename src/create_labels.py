@@ -1,36 +1,24 @@
-import pandas as pd
+from data_store import load_dataset
+from labels import fog_label, extreme_event_label
 
-# Load dataset
-df = pd.read_csv("data/delhi_weather_pollution.csv")
-
-# Convert timestamp to datetime
-df["event_timestamp"] = pd.to_datetime(df["event_timestamp"])
+# Load dataset (timestamps are already native datetimes in the cache)
+df = load_dataset(columns=[
+    "event_timestamp", "temperature", "humidity", "wind_speed", "pm25"
+])
 
 # -------------------------
 # FOG LOGIC
 # -------------------------
 # Fog conditions (Delhi specific, explainable in viva)
-# High humidity + very low wind speed + high pollution
-df["fog"] = (
-    (df["humidity"] >= 85) &
-    (df["wind_speed"] <= 2) &
-    (df["pm25"] >= 100)
-).astype(int)
+# High humidity + very low wind speed + low temperature + high pollution
+# (same rule the fog model is trained on, see label_rules.py)
+df["fog"] = fog_label(df)
 
 # -------------------------
 # EXTREME EVENT LOGIC
 # -------------------------
-def extreme_event(row):
-    if row["pm25"] >= 300:
-        return "Extreme Pollution"
-    elif row["temperature"] >= 45:
-        return "Heatwave"
-    elif row["fog"] == 1 and row["humidity"] >= 90:
-        return "Extreme Fog"
-    else:
-        return "Normal"
-
-df["extreme_event"] = df.apply(extreme_event, axis=1)
+# Extreme Pollution > Heatwave > Extreme Fog > Normal (first match wins)
+df["extreme_event"] = extreme_event_label(df)
 
 # -------------------------
 # Quick verification
@@ -0,0 +1,256 @@
+import hashlib
+import os
+import shutil
+import sys
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+# --------------------------------------------------
+# Paths (relative to the project root, like every script in src/)
+# --------------------------------------------------
+CSV_PATH = "data/delhi_weather_pollution.csv"
+CACHE_DIR = "data/parquet"
+TIMESTAMP_COLUMN = "event_timestamp"
+
+# Marker written last, so a half-written cache is never read
+SUCCESS_MARKER = "_SUCCESS"
+PARTITION_COLUMNS = ["year", "month"]
+
+# Explicit dtype schema: every numeric measurement is float32, any text
+# column (station ids/names) is categorical once loaded, and the timestamp
+# is a native datetime64. Nothing goes through read_csv's float64/object
+# defaults.
+MEASUREMENT_DTYPE = "float32"
+SCHEMA_SAMPLE_ROWS = 10_000
+
+# Raw dataset columns each model's features are built from (for readers
+# that load a model's columns without the feature cache, e.g. streaming)
+WEATHER_COLUMNS = [TIMESTAMP_COLUMN, "temperature", "humidity", "pressure", "wind_speed"]
+RAW_COLUMNS = {
+    "pm25": WEATHER_COLUMNS + ["pm25"],
+    "pm10": WEATHER_COLUMNS + ["pm10"],
+    "temperature": WEATHER_COLUMNS + ["pm25", "pm10", "no2", "so2", "co"],
+    "fog": WEATHER_COLUMNS + ["pm25", "pm10"],
+    "extreme_pollution": WEATHER_COLUMNS + ["pm25", "pm10"],
+}
+
+
+# --------------------------------------------------
+# 1. Ingest: CSV -> typed, time-partitioned Parquet
+# --------------------------------------------------
+def csv_schema(csv_path=CSV_PATH):
+    """read_csv dtypes for the raw file, inferred once from a sample."""
+    sample = pd.read_csv(csv_path, nrows=SCHEMA_SAMPLE_ROWS)
+    return {
+        column: MEASUREMENT_DTYPE
+        if pd.api.types.is_numeric_dtype(sample[column]) else "str"
+        for column in sample.columns
+        if column != TIMESTAMP_COLUMN
+    }
+
+
+def _compact_chunk(chunk):
+    # Already typed by the schema; only the partition keys are added.
+    # Text columns stay plain strings here (Parquet dictionary-encodes
+    # them) and become categoricals in load_dataset.
+    chunk["year"] = chunk[TIMESTAMP_COLUMN].dt.year.astype("int16")
+    chunk["month"] = chunk[TIMESTAMP_COLUMN].dt.month.astype("int8")
+    return chunk
+
+
+def build_cache(csv_path=CSV_PATH, cache_dir=CACHE_DIR, chunksize=500_000):
+    """Convert the raw CSV into a year/month partitioned Parquet dataset."""
+    tmp_dir = cache_dir + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    rows = 0
+    reader = pd.read_csv(
+        csv_path, chunksize=chunksize,
+        dtype=csv_schema(csv_path), parse_dates=[TIMESTAMP_COLUMN],
+    )
+    for chunk in reader:
+        chunk = _compact_chunk(chunk)
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        pq.write_to_dataset(table, tmp_dir, partition_cols=PARTITION_COLUMNS)
+        rows += len(chunk)
+
+    with open(os.path.join(tmp_dir, SUCCESS_MARKER), "w") as f:
+        f.write(f"{os.path.abspath(csv_path)}\n{rows}\n")
+
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    os.replace(tmp_dir, cache_dir)
+    return rows
+
+
+def cache_is_fresh(csv_path=CSV_PATH, cache_dir=CACHE_DIR):
+    marker = os.path.join(cache_dir, SUCCESS_MARKER)
+    if not os.path.exists(marker):
+        return False
+    if not os.path.exists(csv_path):
+        # Cache only (e.g. CSV archived elsewhere) is still usable
+        return True
+    return os.path.getmtime(marker) >= os.path.getmtime(csv_path)
+
+
+# --------------------------------------------------
+# 2. Loader: only the columns and time range asked for
+# --------------------------------------------------
+def _ensure_cache(csv_path, cache_dir):
+    if not cache_is_fresh(csv_path, cache_dir):
+        print("Building Parquet cache from CSV (one-time step)...")
+        build_cache(csv_path, cache_dir)
+
+
+def _time_filter(start, end, partitioned=True):
+    timestamp = ds.field(TIMESTAMP_COLUMN)
+    year = ds.field("year")
+    filters = []
+    if start is not None:
+        start = pd.Timestamp(start)
+        filters.append(timestamp >= start)
+        if partitioned:
+            filters.append(year >= start.year)
+    if end is not None:
+        end = pd.Timestamp(end)
+        filters.append(timestamp < end)
+        if partitioned:
+            filters.append(year <= end.year)
+
+    row_filter = None
+    for condition in filters:
+        row_filter = condition if row_filter is None else row_filter & condition
+    return row_filter
+
+
+def _data_columns(dataset, columns):
+    if columns is None:
+        return [
+            name for name in dataset.schema.names
+            if name not in PARTITION_COLUMNS
+        ]
+    return list(columns)
+
+
+def load_dataset(columns=None, start=None, end=None,
+                 csv_path=CSV_PATH, cache_dir=CACHE_DIR):
+    """Load the dataset from the Parquet cache, building it on first use.
+
+    ``columns`` limits the columns read from disk; ``start`` (inclusive)
+    and ``end`` (exclusive) limit the event_timestamp range.
+    """
+    _ensure_cache(csv_path, cache_dir)
+
+    dataset = ds.dataset(cache_dir, format="parquet", partitioning="hive")
+    table = dataset.to_table(
+        columns=_data_columns(dataset, columns),
+        filter=_time_filter(start, end),
+    )
+    return _to_pandas(table)
+
+
+def _to_pandas(table):
+    # One block per column (no consolidation copy), Arrow buffers released
+    # as each column is converted, and text columns as categoricals
+    return table.to_pandas(
+        split_blocks=True, self_destruct=True, strings_to_categorical=True
+    )
+
+
+# --------------------------------------------------
+# 3. Streaming reader: time-ordered chunks in bounded memory
+# --------------------------------------------------
+def _month_partitions(cache_dir):
+    partitions = []
+    for year_dir in os.listdir(cache_dir):
+        if not year_dir.startswith("year="):
+            continue
+        for month_dir in os.listdir(os.path.join(cache_dir, year_dir)):
+            if month_dir.startswith("month="):
+                partitions.append((
+                    int(year_dir.split("=")[1]),
+                    int(month_dir.split("=")[1]),
+                    os.path.join(cache_dir, year_dir, month_dir),
+                ))
+    return sorted(partitions)
+
+
+def iter_dataset(columns=None, start=None, end=None, chunk_rows=500_000,
+                 csv_path=CSV_PATH, cache_dir=CACHE_DIR):
+    """Yield the dataset as time-sorted DataFrame chunks.
+
+    Only one month partition is held in memory at a time; chunks never
+    span two months and are at most ``chunk_rows`` long.
+    """
+    _ensure_cache(csv_path, cache_dir)
+
+    first_month = last_month = None
+    if start is not None:
+        first_month = (pd.Timestamp(start).year, pd.Timestamp(start).month)
+    if end is not None:
+        last_month = (pd.Timestamp(end).year, pd.Timestamp(end).month)
+
+    for year, month, path in _month_partitions(cache_dir):
+        if first_month is not None and (year, month) < first_month:
+            continue
+        if last_month is not None and (year, month) > last_month:
+            continue
+
+        dataset = ds.dataset(path, format="parquet")
+        names = _data_columns(dataset, columns)
+        if TIMESTAMP_COLUMN not in names:
+            names.append(TIMESTAMP_COLUMN)
+        frame = _to_pandas(dataset.to_table(
+            columns=names,
+            filter=_time_filter(start, end, partitioned=False),
+        ))
+        frame = frame.sort_values(TIMESTAMP_COLUMN, ignore_index=True)
+
+        for offset in range(0, len(frame), chunk_rows):
+            yield frame.iloc[offset:offset + chunk_rows]
+
+
+def count_rows(csv_path=CSV_PATH, cache_dir=CACHE_DIR):
+    """Row count from Parquet metadata (no data is read)."""
+    _ensure_cache(csv_path, cache_dir)
+    return ds.dataset(cache_dir, format="parquet", partitioning="hive").count_rows()
+
+
+def text_columns(csv_path=CSV_PATH, cache_dir=CACHE_DIR):
+    """Text columns (station ids/names) from the Parquet schema."""
+    _ensure_cache(csv_path, cache_dir)
+    schema = ds.dataset(cache_dir, format="parquet", partitioning="hive").schema
+    return [
+        field.name for field in schema
+        if field.name not in PARTITION_COLUMNS
+        and (pa.types.is_string(field.type) or pa.types.is_large_string(field.type)
+             or pa.types.is_dictionary(field.type))
+    ]
+
+
+def dataset_fingerprint(csv_path=CSV_PATH, cache_dir=CACHE_DIR):
+    """Hash of the Parquet cache's files (path, size, mtime); changes
+    whenever the cache is rebuilt, without reading any data."""
+    _ensure_cache(csv_path, cache_dir)
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(cache_dir):
+        dirs.sort()
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            stat = os.stat(path)
+            digest.update(
+                f"{os.path.relpath(path, cache_dir)}:{stat.st_size}:{stat.st_mtime_ns}\n".encode()
+            )
+    return digest.hexdigest()
+
+
+# --------------------------------------------------
+# Run directly to (re)build the cache:
+#   python src/data_store.py
+# --------------------------------------------------
+if __name__ == "__main__":
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else CSV_PATH
+    total = build_cache(csv_path)
+    print(f"Parquet cache written to {CACHE_DIR} ({total} rows).")
@@ -0,0 +1,77 @@
+from sklearn.ensemble import (
+    HistGradientBoostingClassifier,
+    HistGradientBoostingRegressor,
+    RandomForestClassifier,
+    RandomForestRegressor,
+)
+
+try:
+    from lightgbm import LGBMClassifier, LGBMRegressor
+except ImportError:  # optional backend
+    LGBMClassifier = LGBMRegressor = None
+
+# --------------------------------------------------
+# ESTIMATOR BACKENDS
+# --------------------------------------------------
+# Every training script builds its model through make_estimator(), so the
+# algorithm is a flag rather than an edit:
+#   forest    RandomForest with the script's own settings (default; the
+#             only backend with a compact serving artifact)
+#   hgb       HistGradientBoosting: bins each feature into <= 255 buckets
+#             and grows shallow boosted trees, far faster to fit and far
+#             smaller than fully grown forests
+#   lightgbm  LGBM*, when the lightgbm package is installed
+# Compare them with: python src/benchmark_estimators.py
+BACKENDS = ["forest", "hgb", "lightgbm"]
+
+HGB_PARAMS = {
+    "max_iter": 300,
+    "learning_rate": 0.1,
+    "max_leaf_nodes": 63,
+    "early_stopping": True,
+    "random_state": 42,
+}
+
+LGBM_PARAMS = {
+    "n_estimators": 300,
+    "learning_rate": 0.1,
+    "num_leaves": 63,
+    "random_state": 42,
+    "verbose": -1,
+}
+
+
+def available_backends():
+    return [b for b in BACKENDS if b != "lightgbm" or LGBMRegressor is not None]
+
+
+def make_estimator(backend, task, forest_params, n_jobs=-1, params=None):
+    """Unfitted estimator for task "regressor" or "classifier".
+
+    forest_params are the script's RandomForest settings; the boosting
+    backends use their own defaults and only share class_weight. params
+    override the chosen backend's settings (e.g. from src/tune_models.py).
+    """
+    is_classifier = task == "classifier"
+    params = params or {}
+
+    if backend == "forest":
+        cls = RandomForestClassifier if is_classifier else RandomForestRegressor
+        return cls(n_jobs=n_jobs, **{**forest_params, **params})
+
+    class_weight = (
+        {"class_weight": forest_params["class_weight"]}
+        if is_classifier and "class_weight" in forest_params else {}
+    )
+
+    if backend == "hgb":
+        cls = HistGradientBoostingClassifier if is_classifier else HistGradientBoostingRegressor
+        return cls(**{**HGB_PARAMS, **class_weight, **params})
+
+    if backend == "lightgbm":
+        if LGBMRegressor is None:
+            raise ValueError("the lightgbm backend needs `pip install lightgbm`")
+        cls = LGBMClassifier if is_classifier else LGBMRegressor
+        return cls(n_jobs=n_jobs, **{**LGBM_PARAMS, **class_weight, **params})
+
+    raise ValueError(f"backend must be one of {BACKENDS}")
@@ -0,0 +1,144 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+
+import joblib
+import numpy as np
+
+from compact_forest import CAPPED_MAX_DEPTH, CompactForest, export_compact
+from features import load_features
+from model_registry import MODEL_PATHS
+from profiling import current_rss_mb
+
+# Held-out inputs are plain arrays; the forests were fitted on DataFrames
+warnings.filterwarnings("ignore", message="X does not have valid feature names")
+
+# --------------------------------------------------
+# Export every trained .pkl forest to the compact serving format and
+# report size, load time and RSS before (pickle) and after (compact), and
+# how closely the artifact agrees with the .pkl on held-out feature rows.
+#   python src/export_compact_models.py [--max-depth 14]
+# --------------------------------------------------
+
+
+def dir_size_mb(path):
+    total = sum(
+        os.path.getsize(os.path.join(path, name)) for name in os.listdir(path)
+    )
+    return total / (1024 * 1024)
+
+
+def measure(kind, path, sample_path):
+    # Runs in a fresh interpreter so RSS numbers are not polluted; sklearn
+    # is imported up front so its import cost is not charged to the pickle
+    if kind == "pickle":
+        import sklearn.ensemble  # noqa: F401
+    rss_start = current_rss_mb()
+    start = time.perf_counter()
+    model = joblib.load(path) if kind == "pickle" else CompactForest.load(path)
+    load_seconds = time.perf_counter() - start
+    rss_loaded = current_rss_mb()
+
+    model.predict(np.load(sample_path))
+    rss_predicted = current_rss_mb()
+
+    print(json.dumps({
+        "load_seconds": load_seconds,
+        "rss_after_load_mb": rss_loaded - rss_start,
+        "rss_after_predict_mb": rss_predicted - rss_start,
+    }))
+
+
+def measure_in_subprocess(kind, path, sample_path):
+    output = subprocess.run(
+        [sys.executable, __file__, "--measure", kind, path, sample_path],
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def sample_inputs(model, rows=10_000, holdout=0.2):
+    """Held-out rows from the feature cache: the last 20% of complete
+    rows (the training scripts' test period), evenly thinned to rows."""
+    features = list(model.feature_names_in_)
+    X = load_features(columns=features).dropna().to_numpy(np.float32)
+    X = X[int(len(X) * (1 - holdout)):]
+    step = max(1, len(X) // rows)
+    return np.ascontiguousarray(X[::step][:rows])
+
+
+def export_all(max_depth=None):
+    rows = []
+    for name, model_path in MODEL_PATHS.items():
+        if not os.path.exists(model_path):
+            print(f"Skipping {name}: {model_path} not found")
+            continue
+
+        model = joblib.load(model_path)
+        path = export_compact(model, model_path, max_depth=max_depth)
+        if path is None:
+            print(f"Skipping {name}: {type(model).__name__} is served from the .pkl")
+            continue
+        compact = CompactForest.load(path)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            sample_path = os.path.join(tmp, "sample.npy")
+            X = sample_inputs(model)
+            np.save(sample_path, X)
+
+            if compact.classes_ is None:
+                drift = np.abs(model.predict(X) - compact.predict(X))
+                agreement = f"|diff| mean {drift.mean():.2f}, max {drift.max():.2f}"
+            else:
+                match = (model.predict(X) == compact.predict(X)).mean()
+                agreement = f"{match:.1%} same class"
+            del model
+
+            before = measure_in_subprocess("pickle", model_path, sample_path)
+            after = measure_in_subprocess("compact", path, sample_path)
+
+        rows.append((
+            name,
+            os.path.getsize(model_path) / (1024 * 1024), dir_size_mb(path),
+            before, after, agreement,
+        ))
+
+    label = "exact" if max_depth is None else f"max_depth={max_depth}"
+    print(f"\nCompact export ({label})\n")
+    print(
+        f"{'model':<18}{'size MB':>16}{'load s':>16}"
+        f"{'RSS MB':>16}{'RSS+predict MB':>20}  agreement"
+    )
+    for name, pkl_mb, compact_mb, before, after, agreement in rows:
+        print(
+            f"{name:<18}"
+            f"{pkl_mb:>7.1f} ->{compact_mb:>6.1f}"
+            f"{before['load_seconds']:>7.2f} ->{after['load_seconds']:>6.3f}"
+            f"{before['rss_after_load_mb']:>7.0f} ->{after['rss_after_load_mb']:>6.0f}"
+            f"{before['rss_after_predict_mb']:>11.0f} ->{after['rss_after_predict_mb']:>6.0f}"
+            f"  {agreement}"
+        )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--measure":
+        measure(*sys.argv[2:5])
+        sys.exit()
+
+    parser = argparse.ArgumentParser(
+        description="Export trained forests to compact, memory-mappable artifacts."
+    )
+    parser.add_argument(
+        "--max-depth", type=int, nargs="?", const=CAPPED_MAX_DEPTH,
+        help="Cap tree depth for smaller, approximate artifacts "
+             f"(default: exact; --max-depth alone caps at {CAPPED_MAX_DEPTH}). "
+             "The dashboard serves a capped artifact only without a .pkl"
+    )
+    args = parser.parse_args()
+
+    export_all(args.max_depth)
@@ -0,0 +1,81 @@
+import threading
+import time
+from collections import deque
+
+from features import LAGS, lags_from_history, read_row_interval
+from observation_store import STORE
+
+# --------------------------------------------------
+# ONLINE FEATURE STORE
+# --------------------------------------------------
+# Rolling per-location buffers of recent readings, so serving builds the
+# same lag features the models were trained on (see src/features.py)
+# instead of repeating the current value. Readings arrive every poll, but
+# a buffer is stepped by the dataset's row interval (inferred at training
+# time, see features.read_row_interval): a reading is kept only once a
+# full interval has passed since the last kept one, so the bounded deque
+# spans max-lag rows of history, not max-lag polls. Without a trained lag
+# model there is no interval, and no lags are served.
+#
+# A buffer is warmed from the observation history on first use, so lags
+# survive restarts and work when the poller runs in another process.
+DEPTH = max(max(lags) for lags in LAGS.values()) + 1
+
+# Timestamps round-trip through the history at sub-millisecond precision
+TIME_TOLERANCE = 1e-3
+
+
+class OnlineFeatureStore:
+    def __init__(self, store=STORE, depth=DEPTH, interval=None):
+        self.store = store
+        self.depth = depth
+        self.interval = interval if interval is not None else read_row_interval()
+        self._buffers = {}
+        self._lock = threading.Lock()
+
+    def _append(self, buffer, observed_at, observation):
+        # Caller holds self._lock
+        if not buffer or observed_at >= buffer[-1][0] + self.interval - TIME_TOLERANCE:
+            buffer.append((observed_at, dict(observation)))
+
+    def _buffer(self, location_id):
+        with self._lock:
+            buffer = self._buffers.get(location_id)
+            if buffer is None:
+                buffer = deque(maxlen=self.depth)
+                history = self.store.query(
+                    location_id, start=time.time() - (self.depth + 1) * self.interval
+                )
+                for row in history.to_dict("records"):
+                    self._append(buffer, row["observed_at"].timestamp(), row)
+                self._buffers[location_id] = buffer
+            return buffer
+
+    def update(self, location_id, observation, observed_at):
+        """Add a reading; kept when a row interval has passed since the
+        last kept one."""
+        if self.interval is None:
+            return
+        buffer = self._buffer(location_id)
+        with self._lock:
+            self._append(buffer, observed_at, observation)
+
+    def features(self, location_id, observation, observed_at):
+        """observation plus its lag features: the readings one, two, ...
+        row intervals before it (None where history is short)."""
+        if self.interval is None:
+            return dict(observation)
+        self.update(location_id, observation, observed_at)
+        buffer = self._buffer(location_id)
+        with self._lock:
+            history = [
+                entry for entry in buffer
+                if entry[0] < observed_at - TIME_TOLERANCE
+            ]
+        row = dict(observation)
+        for column in LAGS:
+            row.update(lags_from_history(history, column, observed_at, self.interval))
+        return row
+
+
+FEATURES = OnlineFeatureStore()
@@ -0,0 +1,359 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from data_store import TIMESTAMP_COLUMN, dataset_fingerprint, load_dataset
+from label_rules import LABEL_RULES, evaluate
+
+# --------------------------------------------------
+# FEATURE DEFINITIONS (shared by training and serving)
+# --------------------------------------------------
+# Lagged inputs per source column. lag k is the reading k steps earlier
+# at the same location: k dataset rows during training, k row intervals
+# when serving through src/feature_store.py.
+LAGS = {
+    "pm25": [1, 2],
+    "pm10": [1, 2],
+}
+
+# Spacing of the dataset's rows, inferred when the feature cache is built
+# and saved next to the models by the trainers. Serving looks up lags this
+# far apart, not one poll apart, so lag 1 means the same thing as in
+# training.
+FEATURE_META_PATH = "models/feature_meta.json"
+
+# Everything the training pipeline derives from the raw dataset, computed
+# in one vectorized pass and cached on disk (see load_features):
+#   lags      column -> steps back          pm25_lag_1
+#   leads     column -> steps ahead         temperature_lead_1 (targets)
+#   rolling   column -> trailing windows    pm25_roll_mean_6 (previous
+#             readings only, so the current value never leaks in)
+#   calendar  names from CALENDAR           hour_of_day, hour_sin, ...
+#   labels    rule names in label_rules.py  fog, pollution_risk
+#   by        "stations": lags, leads and rolling windows never cross
+#             stations (see station_columns); None: one series
+FEATURE_SPEC = {
+    "by": "stations",
+    "lags": LAGS,
+    "leads": {"temperature": [1]},
+    "rolling": {"pm25": [3, 6, 24], "pm10": [3, 6, 24]},
+    "calendar": ["hour_of_day", "day_of_week", "month_of_year",
+                 "hour_sin", "hour_cos"],
+    "labels": ["fog", "pollution_risk"],
+}
+
+CALENDAR = {
+    "hour_of_day": lambda ts: ts.dt.hour.astype("int8"),
+    "day_of_week": lambda ts: ts.dt.dayofweek.astype("int8"),
+    "month_of_year": lambda ts: ts.dt.month.astype("int8"),
+    "day_of_year": lambda ts: ts.dt.dayofyear.astype("int16"),
+    "hour_sin": lambda ts: np.sin(2 * np.pi * ts.dt.hour / 24).astype("float32"),
+    "hour_cos": lambda ts: np.cos(2 * np.pi * ts.dt.hour / 24).astype("float32"),
+}
+
+FEATURE_CACHE_DIR = "data/features"
+
+# Dataset timestamps are Delhi local time; serving converts to match
+LOCAL_TIMEZONE = "Asia/Kolkata"
+
+# Bump when build_features changes meaning, to invalidate old caches
+PIPELINE_VERSION = 2
+
+
+def lag_column(column, lag):
+    return f"{column}_lag_{lag}"
+
+
+def lag_columns(column):
+    return [lag_column(column, lag) for lag in LAGS[column]]
+
+
+def max_lag(column):
+    return max(LAGS[column])
+
+
+def lead_column(column, lead):
+    return f"{column}_lead_{lead}"
+
+
+def rolling_column(column, window):
+    return f"{column}_roll_mean_{window}"
+
+
+def station_columns(df):
+    """Columns identifying a station: the text columns, which load as
+    categoricals (see data_store.py). Empty for a single-station frame."""
+    return [
+        column for column in df.columns
+        if column != TIMESTAMP_COLUMN
+        and (isinstance(df[column].dtype, pd.CategoricalDtype)
+             or pd.api.types.is_string_dtype(df[column].dtype))
+    ]
+
+
+def lags_from_history(history, column, observed_at, interval):
+    """Lag values for a reading at observed_at, from (epoch seconds, row)
+    pairs oldest first: lag k is the reading nearest to k intervals
+    earlier, None where none lies within half an interval."""
+    lags = {}
+    for lag in LAGS[column]:
+        target = observed_at - lag * interval
+        nearest = min(history, key=lambda entry: abs(entry[0] - target), default=None)
+        lags[lag_column(column, lag)] = (
+            nearest[1].get(column)
+            if nearest is not None and abs(nearest[0] - target) <= interval / 2
+            else None
+        )
+    return lags
+
+
+def next_step_lags(frame, column):
+    """Lags of the row after each row of frame: lag 1 becomes the current
+    reading, lag k the row's lag k-1. The PM models predict a row's
+    reading from the readings before it, so this is how they forecast
+    the next one from the latest reading."""
+    lags = LAGS[column]
+    shifted = {}
+    for lag in lags:
+        previous = column if lag == 1 else lag_column(column, lag - 1)
+        shifted[lag_column(column, lag)] = (
+            frame[previous] if lag - 1 in lags or lag == 1 else np.nan
+        )
+    return shifted
+
+
+def sampling_step(df, by=()):
+    """Typical spacing of consecutive readings of one station."""
+    by = list(by)
+    timestamps = df[TIMESTAMP_COLUMN]
+    if not by and timestamps.duplicated().any():
+        raise ValueError(
+            "timestamps repeat: pass the station column(s) so each station's "
+            "targets are looked up separately"
+        )
+    diffs = df.groupby(by, observed=True)[TIMESTAMP_COLUMN].diff() if by else timestamps.diff()
+    step = diffs[diffs > pd.Timedelta(0)].median()
+    if pd.isna(step):
+        raise ValueError("cannot infer the sampling step: fewer than two distinct timestamps")
+    return step
+
+
+def calendar_features(observed_at, names):
+    """Calendar columns for epoch-second timestamps (serving side)."""
+    timestamps = pd.Series(
+        pd.to_datetime(observed_at, unit="s", utc=True)
+    ).dt.tz_convert(LOCAL_TIMEZONE).dt.tz_localize(None)
+    return {name: CALENDAR[name](timestamps).to_numpy() for name in names}
+
+
+# --------------------------------------------------
+# One-pass builder
+# --------------------------------------------------
+def build_features(df, spec=FEATURE_SPEC):
+    """Return df (time-sorted) with every feature in spec appended.
+
+    With spec["by"] == "stations", lags, leads and rolling means are taken
+    within each station. Entries whose source columns are not in df are
+    skipped, so a frame holding only one model's columns gets exactly the
+    features it can support. New columns are joined in a single concat.
+    """
+    by = station_columns(df) if spec.get("by") == "stations" else []
+    if by:
+        # Each station is its own series: shift within it
+        groups = df.groupby(by, observed=True, sort=False)
+
+        def shift(column, periods):
+            return groups[column].shift(periods)
+
+        def trailing_mean(values, window):
+            return values.groupby(
+                [df[key] for key in by], observed=True, sort=False
+            ).transform(lambda series: series.rolling(window, min_periods=window).mean())
+    else:
+        def shift(column, periods):
+            return df[column].shift(periods)
+
+        def trailing_mean(values, window):
+            return values.rolling(window, min_periods=window).mean()
+
+    new = {}
+    for column, lags in spec.get("lags", {}).items():
+        if column in df:
+            for lag in lags:
+                new[lag_column(column, lag)] = shift(column, lag)
+
+    for column, leads in spec.get("leads", {}).items():
+        if column in df:
+            for lead in leads:
+                new[lead_column(column, lead)] = shift(column, -lead)
+
+    for column, windows in spec.get("rolling", {}).items():
+        if column in df:
+            previous = shift(column, 1)
+            for window in windows:
+                new[rolling_column(column, window)] = (
+                    trailing_mean(previous, window).astype("float32")
+                )
+
+    if TIMESTAMP_COLUMN in df:
+        timestamps = df[TIMESTAMP_COLUMN]
+        for name in spec.get("calendar", []):
+            new[name] = CALENDAR[name](timestamps)
+
+    for name in spec.get("labels", []):
+        if _rule_inputs(name) <= set(df.columns):
+            new[name] = evaluate(name, df).astype("int8")
+
+    return pd.concat([df, pd.DataFrame(new, index=df.index)], axis=1)
+
+
+def _rule_inputs(name):
+    """Raw columns a label rule reads (references to other labels expanded)."""
+    rule = LABEL_RULES[name]
+    if rule["type"] == "bands":
+        columns = [rule["column"]]
+    elif rule["type"] == "all":
+        columns = [column for column, _, _ in rule["conditions"]]
+    else:
+        columns = [
+            column for _, conditions in rule["rules"]
+            for column, _, _ in conditions
+        ]
+
+    inputs = set()
+    for column in columns:
+        inputs |= _rule_inputs(column) if column in LABEL_RULES else {column}
+    return inputs
+
+
+# --------------------------------------------------
+# Disk cache keyed by (dataset fingerprint, spec)
+# --------------------------------------------------
+def spec_hash(spec=FEATURE_SPEC):
+    payload = {
+        "version": PIPELINE_VERSION,
+        "spec": spec,
+        # Label rules are part of the spec: editing a threshold re-labels
+        "rules": {name: LABEL_RULES[name] for name in spec.get("labels", [])},
+    }
+    return hashlib.sha256(
+        json.dumps(payload, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+def feature_cache_path(spec=FEATURE_SPEC):
+    key = f"{dataset_fingerprint()[:16]}-{spec_hash(spec)[:16]}"
+    return os.path.join(FEATURE_CACHE_DIR, f"features-{key}.parquet")
+
+
+def meta_path(path):
+    """Sidecar of a cached frame: facts about the dataset it was built
+    from (its row interval)."""
+    return os.path.splitext(path)[0] + ".json"
+
+
+def _write_json(path, payload):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(payload, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def prune_feature_cache(keep):
+    """Delete cached frames other than keep: every data or spec change
+    writes a new file, and the superseded ones are never read again."""
+    removed = 0
+    keep_meta = meta_path(keep)
+    for name in os.listdir(FEATURE_CACHE_DIR):
+        path = os.path.join(FEATURE_CACHE_DIR, name)
+        # .tmp files may be another process's build in progress
+        if not name.startswith("features-") or path in (keep, keep_meta):
+            continue
+        if name.endswith(".parquet"):
+            removed += 1
+        if name.endswith((".parquet", ".json")):
+            os.remove(path)
+    return removed
+
+
+def load_features(columns=None, spec=FEATURE_SPEC, refresh=False):
+    """Time-sorted feature frame for the whole dataset.
+
+    Built once per (dataset, spec) and cached as Parquet; later calls read
+    only the requested columns back. Building a new frame deletes the
+    superseded ones.
+    """
+    path = feature_cache_path(spec)
+    if refresh or not os.path.exists(path):
+        print("Building feature cache (one-time step per dataset/spec)...")
+        df = load_dataset()
+        df = df.sort_values(TIMESTAMP_COLUMN, ignore_index=True)
+        df = build_features(df, spec)
+
+        os.makedirs(FEATURE_CACHE_DIR, exist_ok=True)
+        _write_json(meta_path(path), {
+            "row_interval_seconds": sampling_step(df, station_columns(df)).total_seconds(),
+        })
+        tmp_path = f"{path}.tmp"
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+        prune_feature_cache(keep=path)
+        if columns is not None:
+            df = df[list(columns)]
+        return df
+
+    return pd.read_parquet(path, columns=list(columns) if columns is not None else None)
+
+
+def training_row_interval(spec=FEATURE_SPEC):
+    """Seconds between consecutive dataset rows: the span of one lag step
+    in the cached feature frame."""
+    path = feature_cache_path(spec)
+    if not os.path.exists(meta_path(path)):
+        if not os.path.exists(path):
+            load_features(columns=[TIMESTAMP_COLUMN], spec=spec)
+        else:
+            # Cache built before the sidecar existed
+            frame = pd.read_parquet(path)
+            _write_json(meta_path(path), {
+                "row_interval_seconds":
+                    sampling_step(frame, station_columns(frame)).total_seconds(),
+            })
+    with open(meta_path(path)) as f:
+        return json.load(f)["row_interval_seconds"]
+
+
+def write_feature_meta(row_interval, path=FEATURE_META_PATH):
+    """Record the row interval the lag features of the saved models span."""
+    _write_json(path, {"row_interval_seconds": float(row_interval)})
+
+
+def read_row_interval(path=FEATURE_META_PATH):
+    """Row interval (seconds) the served models were trained on; None
+    before any lag model has been trained."""
+    try:
+        with open(path) as f:
+            return json.load(f)["row_interval_seconds"]
+    except FileNotFoundError:
+        return None
+
+
+# --------------------------------------------------
+# Run directly to (re)build the cache:
+#   python src/features.py [--refresh]
+# --------------------------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the training feature cache.")
+    parser.add_argument("--refresh", action="store_true", help="Rebuild even if cached")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    df = load_features(refresh=args.refresh)
+    print(f"{feature_cache_path()}: {len(df)} rows x {df.shape[1]} columns, "
+          f"{training_row_interval():.0f}s row interval, "
+          f"in {time.perf_counter() - start:.1f}s")
@@ -0,0 +1,110 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from features import CALENDAR, LAGS, calendar_features, lag_columns, next_step_lags
+from model_registry import get_model
+from profiling import timed
+
+# --------------------------------------------------
+# INFERENCE SERVICE
+# --------------------------------------------------
+# Scores a batch of observations with all dashboard models in one call.
+# Each model's feature matrix is built once, in the column order the model
+# was trained with (feature_names_in_), so call sites never hand-write
+# feature lists again.
+
+# Output column -> registry model name
+OUTPUTS = {
+    "pm25_pred": "pm25",
+    "pm10_pred": "pm10",
+    "risk": "extreme_pollution",
+    "fog": "fog",
+}
+
+# Training feature order, used when a model does not carry feature names
+DEFAULT_FEATURES = {
+    "pm25": ["temperature", "humidity", "pressure", "wind_speed",
+             *lag_columns("pm25")],
+    "pm10": ["temperature", "humidity", "pressure", "wind_speed",
+             *lag_columns("pm10")],
+    "extreme_pollution": ["temperature", "humidity", "pressure",
+                          "wind_speed", "pm10"],
+    "fog": ["temperature", "humidity", "pressure", "wind_speed",
+            "pm25", "pm10"],
+}
+
+def model_features(name, model):
+    names = getattr(model, "feature_names_in_", None)
+    return list(names) if names is not None else DEFAULT_FEATURES[name]
+
+
+def build_frame(observations):
+    """One row per observation, with every column any model needs.
+
+    Lag columns come from the caller (see src/feature_store.py); where
+    they are missing the current reading stands in for its lags.
+    """
+    frame = pd.DataFrame(observations)
+    for column in LAGS:
+        for lag_column in lag_columns(column):
+            if lag_column not in frame:
+                frame[lag_column] = frame[column]
+            else:
+                frame[lag_column] = frame[lag_column].fillna(frame[column]).astype(float)
+    return frame
+
+
+def predict_batch(observations, outputs=None):
+    """Score observations (list of dicts or DataFrame) with every model.
+
+    pm25_pred / pm10_pred forecast the next row (one row interval after
+    the observation); risk and fog classify the observation itself.
+    Returns a DataFrame aligned with the input rows, with columns
+    pm25_pred, pm10_pred, risk and fog (or the requested subset).
+    """
+    with timed("build_features"):
+        frame = build_frame(observations)
+        # The PM models predict a row's reading from the readings before
+        # it: forecasting the next row makes the latest reading its lag 1
+        for column in LAGS:
+            if column in frame:
+                frame = frame.assign(**next_step_lags(frame, column))
+
+    result = pd.DataFrame(index=frame.index)
+    for output in outputs or OUTPUTS:
+        name = OUTPUTS[output]
+        model = get_model(name)
+        with timed(f"predict:{name}"):
+            X = frame[model_features(name, model)].astype(np.float32)
+            result[output] = model.predict(X)
+    return result
+
+
+def predict_one(observation, outputs=None):
+    """Single observation -> dict of plain Python scalars."""
+    result = predict_batch([observation], outputs)
+    return {column: result[column].iloc[0].item() for column in result}
+
+
+def forecast_batch(observations):
+    """PM2.5 / PM10 / temperature for every horizon (multi-horizon model).
+
+    Observations may carry observed_at (epoch seconds) for the calendar
+    features; otherwise the current time is used. Returns one row per
+    observation with columns such as pm25_1h ... temperature_24h.
+    """
+    model = get_model("multi_horizon")
+    with timed("build_features"):
+        frame = build_frame(observations)
+        observed_at = (
+            frame["observed_at"].fillna(time.time())
+            if "observed_at" in frame else np.full(len(frame), time.time())
+        )
+        calendar = [name for name in model.features if name in CALENDAR]
+        for name, values in calendar_features(observed_at, calendar).items():
+            frame[name] = values
+
+    with timed("predict:multi_horizon"):
+        return model.predict(frame[model.features].astype(np.float32))
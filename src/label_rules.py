@@ -0,0 +1,217 @@
+import operator
+
+import numpy as np
+import pandas as pd
+
+# --------------------------------------------------
+# LABEL RULE REGISTRY (single source of truth)
+# --------------------------------------------------
+# Every threshold used to label data - in training AND in the dashboard -
+# lives here. Rule types:
+#   "all"          -> true_value when every condition holds, else false_value
+#   "first_match"  -> value of the first rule whose conditions all hold
+#   "bands"        -> value of the band a column falls in; "closed" says
+#                     whether band edges belong to the lower band ("right",
+#                     x <= edge) or the upper one ("left", x < edge)
+# A condition may reference another label by name (e.g. "fog"); it is
+# evaluated on the fly when the data does not already carry that column.
+LABEL_RULES = {
+    # Delhi winter fog (PROJECT_LOG Step 12): also the fog model's target
+    "fog": {
+        "type": "all",
+        "conditions": [
+            ("humidity", ">=", 90),
+            ("wind_speed", "<=", 2),
+            ("temperature", "<=", 15),
+            ("pm25", ">=", 100),
+        ],
+        "true_value": 1,
+        "false_value": 0,
+    },
+    "extreme_event": {
+        "type": "first_match",
+        "rules": [
+            ("Extreme Pollution", [("pm25", ">=", 300)]),
+            ("Heatwave", [("temperature", ">=", 45)]),
+            ("Extreme Fog", [("fog", "==", 1), ("humidity", ">=", 90)]),
+        ],
+        "default": "Normal",
+    },
+    # Extreme pollution classifier target (PROJECT_LOG Step 11)
+    "pollution_risk": {
+        "type": "bands",
+        "column": "pm25",
+        "edges": [60, 250],
+        "values": [0, 1, 2],
+        "closed": "right",
+    },
+    # Dashboard bands. health_risk tests from the top down, so a missing
+    # reading is "Low" like the dashboard's original chain
+    "health_risk": {
+        "type": "first_match",
+        "rules": [
+            ("High", [("pm25", ">", 150)]),
+            ("Medium", [("pm25", ">", 75)]),
+        ],
+        "default": "Low",
+    },
+    "air_quality": {
+        "type": "bands",
+        "column": "pm25",
+        "edges": [50, 100, 200],
+        "values": ["Good", "Moderate", "Poor", "Severe"],
+        "closed": "left",
+    },
+    "pm25_level": {
+        "type": "bands",
+        "column": "pm25",
+        "edges": [50, 100],
+        "values": ["Low", "Moderate", "High"],
+        "closed": "left",
+    },
+    "pm10_level": {
+        "type": "bands",
+        "column": "pm10",
+        "edges": [50, 100],
+        "values": ["Low", "Moderate", "High"],
+        "closed": "left",
+    },
+    # Dashboard weather indicators
+    "temperature_trend": {
+        "type": "first_match",
+        "rules": [
+            ("Warm", [("temperature", ">", 28)]),
+            ("Cool", [("temperature", "<", 20)]),
+        ],
+        "default": "Normal",
+    },
+    "comfort": {
+        "type": "first_match",
+        "rules": [
+            ("Humid", [("humidity", ">", 80)]),
+            ("Hot", [("temperature", ">", 30)]),
+        ],
+        "default": "Comfortable",
+    },
+    "wind_level": {
+        "type": "bands",
+        "column": "wind_speed",
+        "edges": [5, 10],
+        "values": ["Breeze", "Moderate", "Strong"],
+        "closed": "left",
+    },
+    "wind_alert": {
+        "type": "bands",
+        "column": "wind_speed",
+        "edges": [10, 20],
+        "values": ["Normal", "High", "Severe"],
+        "closed": "left",
+    },
+    # Missing pressure is "Low", as in the original chain
+    "pressure_level": {
+        "type": "first_match",
+        "rules": [
+            ("Normal", [("pressure", ">", 1010), ("pressure", "<", 1020)]),
+            ("High", [("pressure", ">=", 1020)]),
+        ],
+        "default": "Low",
+    },
+    "heat_stress": {
+        "type": "all",
+        "conditions": [("temperature", ">", 35)],
+        "true_value": 1,
+        "false_value": 0,
+    },
+}
+
+OPERATORS = {
+    ">=": operator.ge,
+    ">": operator.gt,
+    "<=": operator.le,
+    "<": operator.lt,
+    "==": operator.eq,
+}
+
+
+# --------------------------------------------------
+# Compiler: spec -> vectorized evaluator
+# --------------------------------------------------
+# Evaluators take a DataFrame or a dict of scalars and return a numpy
+# array (0-d for a single row), so batch and single-row paths share code.
+def _column(data, name, compiled):
+    if name in data:
+        return np.asarray(data[name])
+    if name in compiled:
+        return compiled[name](data)
+    raise KeyError(f"Label rules need column '{name}'")
+
+
+def _compile_conditions(conditions, compiled):
+    checks = [
+        (column, OPERATORS[op], threshold)
+        for column, op, threshold in conditions
+    ]
+
+    def mask(data):
+        result = None
+        for column, compare, threshold in checks:
+            hit = compare(_column(data, column, compiled), threshold)
+            result = hit if result is None else result & hit
+        return result
+
+    return mask
+
+
+def _compile_all(spec, compiled):
+    mask = _compile_conditions(spec["conditions"], compiled)
+    true_value, false_value = spec["true_value"], spec["false_value"]
+    return lambda data: np.where(mask(data), true_value, false_value)
+
+
+def _compile_first_match(spec, compiled):
+    masks = [_compile_conditions(conds, compiled) for _, conds in spec["rules"]]
+    values = [value for value, _ in spec["rules"]]
+    default = spec["default"]
+    return lambda data: np.select([m(data) for m in masks], values, default)
+
+
+def _compile_bands(spec, compiled):
+    column, edges, values = spec["column"], spec["edges"], spec["values"]
+    compare = operator.le if spec["closed"] == "right" else operator.lt
+
+    def evaluate(data):
+        x = _column(data, column, compiled)
+        # NaN fails every comparison and lands in the last band, exactly
+        # like the if/elif chains these bands replace
+        return np.select([compare(x, edge) for edge in edges],
+                         values[:-1], values[-1])
+
+    return evaluate
+
+
+COMPILERS = {
+    "all": _compile_all,
+    "first_match": _compile_first_match,
+    "bands": _compile_bands,
+}
+
+
+def compile_rules(rules):
+    compiled = {}
+    for name, spec in rules.items():
+        compiled[name] = COMPILERS[spec["type"]](spec, compiled)
+    return compiled
+
+
+# Compiled once at import and shared by every caller
+COMPILED_RULES = compile_rules(LABEL_RULES)
+
+
+def evaluate(name, df):
+    """Label every row of a DataFrame; returns a Series aligned to df."""
+    return pd.Series(COMPILED_RULES[name](df), index=df.index)
+
+
+def evaluate_one(name, row):
+    """Label a single observation given as a dict of scalars."""
+    return COMPILED_RULES[name](row).item()
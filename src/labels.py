@@ -0,0 +1,24 @@
+from label_rules import evaluate
+
+# --------------------------------------------------
+# Vectorized label rules
+# --------------------------------------------------
+# Thin, named wrappers over the compiled rule registry in label_rules.py.
+# Each one evaluates the whole frame with numpy masks instead of a Python
+# call per row; NaN fails every comparison, as it did in the old
+# row-wise DataFrame.apply / Series.apply versions.
+
+
+def fog_label(df):
+    """Fog: humidity >= 90, wind <= 2, temperature <= 15, PM2.5 >= 100."""
+    return evaluate("fog", df)
+
+
+def extreme_event_label(df):
+    """Extreme Pollution > Heatwave > Extreme Fog > Normal (first match)."""
+    return evaluate("extreme_event", df)
+
+
+def pollution_risk_label(pm25):
+    """0 = Normal (<= 60), 1 = High (<= 250), 2 = Extreme (> 250)."""
+    return evaluate("pollution_risk", pm25.to_frame("pm25"))
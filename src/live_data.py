@@ -0,0 +1,202 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from profiling import timed
+
+# --------------------------------------------------
+# LIVE OBSERVATIONS (OpenWeather)
+# --------------------------------------------------
+# One pooled HTTP session and one observation cache per server process.
+# Within the TTL window each coordinate is fetched from the provider at
+# most once, whether by the background poller or by fetch_observation.
+OPENWEATHER_BASE_URL = os.getenv(
+    "OPENWEATHER_BASE_URL", "https://api.openweathermap.org/data/2.5"
+)
+CACHE_TTL_SECONDS = float(os.getenv("OBSERVATION_TTL_SECONDS", "300"))
+
+# (connect, read) timeouts in seconds
+REQUEST_TIMEOUT = (3.05, 10)
+
+# Retry transient failures (connection errors, timeouts, 429/5xx) with
+# exponential backoff: 0.5 s, 1 s, 2 s
+MAX_RETRIES = 3
+BACKOFF_SECONDS = 0.5
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+# Locations fetched at the same time by fetch_many (each needs two calls)
+MAX_CONCURRENT_FETCHES = int(os.getenv("MAX_CONCURRENT_FETCHES", "8"))
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=4, pool_maxsize=2 * MAX_CONCURRENT_FETCHES
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+# --------------------------------------------------
+# Provider calls: /weather and /air_pollution run concurrently, so a
+# refresh costs one round trip instead of two
+# --------------------------------------------------
+async def get_json(url, params):
+    """GET with timeouts and retry/backoff, without blocking the event loop."""
+    session = get_session()
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            response = await asyncio.to_thread(
+                session.get, url, params=params, timeout=REQUEST_TIMEOUT
+            )
+            if response.status_code not in RETRY_STATUS:
+                response.raise_for_status()
+                return response.json()
+            error = requests.HTTPError(
+                f"{response.status_code} from {url}", response=response
+            )
+        except (requests.ConnectionError, requests.Timeout) as exc:
+            error = exc
+
+        if attempt == MAX_RETRIES:
+            raise error
+        await asyncio.sleep(BACKOFF_SECONDS * 2 ** attempt)
+
+
+async def fetch_from_provider_async(lat, lon, api_key):
+    params = {"lat": lat, "lon": lon, "appid": api_key}
+    weather, air = await asyncio.gather(
+        get_json(f"{OPENWEATHER_BASE_URL}/weather", {**params, "units": "metric"}),
+        get_json(f"{OPENWEATHER_BASE_URL}/air_pollution", params),
+    )
+    return parse_observation(weather, air)
+
+
+def fetch_from_provider(lat, lon, api_key):
+    """Both provider calls -> one observation dict (no caching)."""
+    # Streamlit runs scripts in a thread without an event loop, so a
+    # private loop per fetch is safe here
+    with timed("openweather_provider"):
+        return asyncio.run(fetch_from_provider_async(lat, lon, api_key))
+
+
+async def _fetch_many_async(points, api_key, max_concurrency):
+    # Enough threads for every in-flight request, whatever the core count
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=2 * max_concurrency)
+    )
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def fetch(lat, lon):
+        async with semaphore:
+            return await fetch_from_provider_async(lat, lon, api_key)
+
+    return await asyncio.gather(
+        *(fetch(lat, lon) for lat, lon in points), return_exceptions=True
+    )
+
+
+def fetch_many(points, api_key, max_concurrency=MAX_CONCURRENT_FETCHES):
+    """Observations for many (lat, lon) points, at most max_concurrency at
+    a time. Results follow the input order; a failed point comes back as
+    its exception instead of failing the whole batch.
+    """
+    with timed("openweather_batch"):
+        return asyncio.run(_fetch_many_async(points, api_key, max_concurrency))
+
+
+def parse_observation(weather, air):
+    return {
+        "temperature": weather["main"]["temp"],
+        "humidity": weather["main"]["humidity"],
+        "pressure": weather["main"]["pressure"],
+        "wind_speed": weather["wind"]["speed"],
+        "pm25": air["list"][0]["components"]["pm2_5"],
+        "pm10": air["list"][0]["components"]["pm10"],
+    }
+
+
+# --------------------------------------------------
+# Process-wide TTL cache keyed by coordinate: the poller
+# (live_poller.poll_once) and fetch_observation both go through it
+# --------------------------------------------------
+class ObservationCache:
+    """Entries are stamped with time.monotonic() at the start of the
+    request, the clock the poller schedules on, so a poll one TTL after
+    the last one always finds the entry expired."""
+
+    def __init__(self, ttl=CACHE_TTL_SECONDS):
+        self.ttl = ttl
+        self._entries = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(lat, lon):
+        # ~10 m resolution, so float noise in coordinates shares an entry
+        return round(lat, 4), round(lon, 4)
+
+    def _key_lock(self, key):
+        with self._lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def fresh(self, lat, lon, ttl=None):
+        """The cached observation when younger than ttl, else None."""
+        ttl = self.ttl if ttl is None else ttl
+        entry = self._entries.get(self.key(lat, lon))
+        if entry is not None and time.monotonic() - entry[0] < ttl:
+            return dict(entry[1])
+        return None
+
+    def put(self, lat, lon, observation, started):
+        """Store an observation whose request started at started
+        (time.monotonic())."""
+        self._entries[self.key(lat, lon)] = (started, observation)
+
+    def get(self, lat, lon, fetch, ttl=None):
+        """Return a fresh cached observation, or call fetch() once to refresh.
+
+        Concurrent callers for the same coordinate wait on a per-key lock,
+        so a cache miss produces a single provider call. Failures are not
+        cached.
+        """
+        observation = self.fresh(lat, lon, ttl)
+        if observation is not None:
+            return observation
+
+        with self._key_lock(self.key(lat, lon)):
+            observation = self.fresh(lat, lon, ttl)
+            if observation is not None:
+                return observation
+            started = time.monotonic()
+            observation = fetch()
+            self.put(lat, lon, observation, started)
+            return dict(observation)
+
+    def age_seconds(self, lat, lon):
+        entry = self._entries.get(self.key(lat, lon))
+        return None if entry is None else time.monotonic() - entry[0]
+
+
+OBSERVATIONS = ObservationCache()
+
+
+def fetch_observation(lat, lon, api_key, ttl=None):
+    """Latest observation for a coordinate, served from the shared cache."""
+    return OBSERVATIONS.get(
+        lat, lon, lambda: fetch_from_provider(lat, lon, api_key), ttl
+    )
@@ -0,0 +1,182 @@
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+
+import pandas as pd
+from dotenv import load_dotenv
+
+from live_data import OBSERVATIONS, fetch_many
+from locations import get_locations
+from observation_store import STORE
+
+# --------------------------------------------------
+# BACKGROUND INGESTION
+# --------------------------------------------------
+# Polls the provider on a schedule and writes the latest observation per
+# location to a small JSON snapshot. The dashboard only reads the snapshot,
+# so page loads never wait on the network, and a provider outage leaves the
+# last good reading in place (with the error recorded next to it). Every
+# successful reading is also appended to the observation history
+# (src/observation_store.py).
+#
+# Runs as a daemon thread inside the Streamlit process (started once per
+# process), or on its own:
+#   python src/live_poller.py [--interval 300] [--locations grid:2]
+#   LIVE_POLLER=external streamlit run app.py
+SNAPSHOT_PATH = os.getenv("LIVE_SNAPSHOT_PATH", "data/live/snapshot.json")
+POLL_INTERVAL_SECONDS = float(os.getenv("POLL_INTERVAL_SECONDS", "300"))
+
+logger = logging.getLogger("delhi_weather.poller")
+
+
+# --------------------------------------------------
+# Snapshot store
+# --------------------------------------------------
+def write_snapshot(snapshot, path=SNAPSHOT_PATH):
+    # Write-then-rename, so readers never see a half-written file
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(snapshot, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def read_snapshot(path=SNAPSHOT_PATH):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {"locations": {}}
+
+
+def latest_snapshot(location_id, path=SNAPSHOT_PATH):
+    """Snapshot entry for one location, or None before its first reading.
+
+    Entry keys: observation, fetched_at (epoch seconds) and, while the
+    provider is failing, error and error_at.
+    """
+    return read_snapshot(path)["locations"].get(location_id)
+
+
+def network_frame(snapshot):
+    """One row per location with a reading: id, name, lat, lon, fetched_at,
+    stale (last poll failed) and the observation columns."""
+    rows = [
+        {
+            "id": location_id, "name": entry["name"],
+            "lat": entry["lat"], "lon": entry["lon"],
+            "fetched_at": entry["fetched_at"], "stale": "error" in entry,
+            **entry["observation"],
+        }
+        for location_id, entry in snapshot["locations"].items()
+        if "observation" in entry
+    ]
+    return pd.DataFrame(rows)
+
+
+# --------------------------------------------------
+# Polling
+# --------------------------------------------------
+def poll_once(locations, api_key, path=SNAPSHOT_PATH, store=STORE, ttl=None):
+    """Fetch every location without a reading younger than ttl (default
+    OBSERVATION_TTL_SECONDS) in the shared observation cache; the others
+    keep their snapshot entry as is."""
+    snapshot = read_snapshot(path)
+    entries = snapshot["locations"]
+
+    due = [loc for loc in locations if OBSERVATIONS.fresh(loc.lat, loc.lon, ttl) is None]
+    started = time.monotonic()
+    results = fetch_many([(loc.lat, loc.lon) for loc in due], api_key)
+    now = time.time()
+    history = []
+    for loc, result in zip(due, results):
+        entry = entries.setdefault(loc.id, {})
+        entry.update(name=loc.name, lat=loc.lat, lon=loc.lon)
+        if isinstance(result, Exception):
+            # Keep the last good observation; surface the failure instead
+            logger.warning("poll failed for %s: %s", loc.id, result)
+            entry["error"] = str(result)
+            entry["error_at"] = now
+        else:
+            OBSERVATIONS.put(loc.lat, loc.lon, result, started)
+            entry["observation"] = result
+            entry["fetched_at"] = now
+            entry.pop("error", None)
+            entry.pop("error_at", None)
+            history.append((loc.id, now, result))
+
+    snapshot["updated_at"] = time.time()
+    write_snapshot(snapshot, path)
+    try:
+        store.append_many(history)
+    except Exception:
+        # History is best effort; the snapshot is what pages depend on
+        logger.exception("could not persist observations")
+    return snapshot
+
+
+class LivePoller(threading.Thread):
+    def __init__(self, locations, api_key, interval=POLL_INTERVAL_SECONDS,
+                 path=SNAPSHOT_PATH):
+        super().__init__(name="live-poller", daemon=True)
+        self.locations = locations
+        self.api_key = api_key
+        self.interval = interval
+        self.path = path
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            start = time.monotonic()
+            try:
+                # Cycles start whole intervals apart (monotonic, like the
+                # cache stamps), so a location is fetched again on the
+                # first cycle at least one TTL after its last fetch
+                poll_once(self.locations, self.api_key, self.path)
+            except Exception:
+                logger.exception("poll cycle failed")
+            self._stop_event.wait(max(0.0, self.interval - (time.monotonic() - start)))
+
+    def stop(self):
+        self._stop_event.set()
+
+
+_poller = None
+_poller_lock = threading.Lock()
+
+
+def start_poller(locations, api_key, interval=POLL_INTERVAL_SECONDS):
+    """Start the in-process poller once; later calls return the same thread."""
+    global _poller
+    with _poller_lock:
+        if _poller is None:
+            _poller = LivePoller(locations, api_key, interval)
+            _poller.start()
+    return _poller
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Poll live observations into the local snapshot store."
+    )
+    parser.add_argument("--interval", type=float, default=POLL_INTERVAL_SECONDS)
+    parser.add_argument(
+        "--locations", help='"stations", "central" or "grid:<km>" (default: LIVE_LOCATIONS)'
+    )
+    parser.add_argument("--once", action="store_true", help="Poll once and exit")
+    args = parser.parse_args()
+
+    load_dotenv()
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"))
+    api_key = os.getenv("OPENWEATHER_API_KEY")
+    locations = get_locations(args.locations)
+
+    if args.once:
+        snapshot = poll_once(locations, api_key)
+        failed = sum("error" in entry for entry in snapshot["locations"].values())
+        print(f"Polled {len(locations)} locations ({failed} failed) -> {SNAPSHOT_PATH}")
+    else:
+        LivePoller(locations, api_key, args.interval).run()
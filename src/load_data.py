@@ -1,8 +1,7 @@
-import pandas as pd
+from data_store import load_dataset
 
-# Load dataset
-file_path = "data/delhi_weather_pollution.csv"
-df = pd.read_csv(file_path)
+# Load dataset (Parquet cache, built from the CSV on first use)
+df = load_dataset()
 
 print("Dataset loaded successfully!")
 print("Shape (rows, columns):", df.shape)
@@ -0,0 +1,89 @@
+import math
+import os
+from collections import namedtuple
+
+# --------------------------------------------------
+# LOCATIONS
+# --------------------------------------------------
+# Points the poller fetches and the dashboard scores. Either the CPCB
+# continuous monitoring stations in Delhi, or a regular grid over the NCT
+# (LIVE_LOCATIONS=grid:2 for a 2 km grid).
+Location = namedtuple("Location", ["id", "name", "lat", "lon"])
+
+# The dashboard's original single point stays first
+DELHI_CENTRAL = Location("delhi_central", "Delhi Central", 28.6139, 77.2090)
+
+# CPCB / DPCC stations (approximate coordinates)
+STATIONS = [
+    DELHI_CENTRAL,
+    Location("anand_vihar", "Anand Vihar", 28.6469, 77.3158),
+    Location("ito", "ITO", 28.6286, 77.2410),
+    Location("rk_puram", "R K Puram", 28.5633, 77.1869),
+    Location("punjabi_bagh", "Punjabi Bagh", 28.6740, 77.1310),
+    Location("mandir_marg", "Mandir Marg", 28.6364, 77.2011),
+    Location("dwarka_sector_8", "Dwarka Sector 8", 28.5710, 77.0719),
+    Location("igi_airport", "IGI Airport (T3)", 28.5627, 77.1180),
+    Location("lodhi_road", "Lodhi Road", 28.5918, 77.2273),
+    Location("okhla_phase_2", "Okhla Phase 2", 28.5308, 77.2713),
+    Location("rohini", "Rohini", 28.7325, 77.1199),
+    Location("jahangirpuri", "Jahangirpuri", 28.7328, 77.1706),
+    Location("wazirpur", "Wazirpur", 28.6999, 77.1655),
+    Location("nehru_nagar", "Nehru Nagar", 28.5679, 77.2506),
+    Location("bawana", "Bawana", 28.7762, 77.0511),
+    Location("narela", "Narela", 28.8227, 77.1019),
+    Location("najafgarh", "Najafgarh", 28.5702, 76.9337),
+    Location("shadipur", "Shadipur", 28.6515, 77.1473),
+    Location("north_campus", "North Campus, DU", 28.6573, 77.1585),
+    Location("sonia_vihar", "Sonia Vihar", 28.7105, 77.2495),
+    Location("vivek_vihar", "Vivek Vihar", 28.6723, 77.3152),
+    Location("alipur", "Alipur", 28.8155, 77.1530),
+    Location("ashok_vihar", "Ashok Vihar", 28.6952, 77.1819),
+    Location("aya_nagar", "Aya Nagar", 28.4706, 77.1099),
+    Location("pusa", "Pusa", 28.6396, 77.1463),
+    Location("sirifort", "Sirifort", 28.5504, 77.2159),
+    Location("patparganj", "Patparganj", 28.6238, 77.2872),
+    Location("national_stadium", "Major Dhyan Chand National Stadium", 28.6116, 77.2373),
+    Location("jln_stadium", "Jawaharlal Nehru Stadium", 28.5802, 77.2338),
+    Location("karni_singh_range", "Dr. Karni Singh Shooting Range", 28.4986, 77.2648),
+    Location("aurobindo_marg", "Sri Aurobindo Marg", 28.5313, 77.1902),
+    Location("burari", "Burari Crossing", 28.7256, 77.2012),
+    Location("mundka", "Mundka", 28.6842, 77.0767),
+    Location("dtu", "DTU", 28.7500, 77.1112),
+    Location("chandni_chowk", "Chandni Chowk", 28.6562, 77.2303),
+    Location("east_arjun_nagar", "East Arjun Nagar", 28.6556, 77.2950),
+    Location("nsit_dwarka", "NSIT Dwarka", 28.6090, 77.0325),
+]
+
+# Bounding box of the NCT of Delhi
+DELHI_BOUNDS = (28.40, 28.89, 76.84, 77.35)
+
+KM_PER_DEGREE = 111.32
+
+
+def grid(step_km, bounds=DELHI_BOUNDS):
+    """Regular grid of points step_km apart covering bounds."""
+    lat_min, lat_max, lon_min, lon_max = bounds
+    lat_step = step_km / KM_PER_DEGREE
+    lon_step = step_km / (KM_PER_DEGREE * math.cos(math.radians((lat_min + lat_max) / 2)))
+
+    points = []
+    n_lat = int((lat_max - lat_min) / lat_step) + 1
+    n_lon = int((lon_max - lon_min) / lon_step) + 1
+    for i in range(n_lat):
+        for j in range(n_lon):
+            lat = round(lat_min + i * lat_step, 4)
+            lon = round(lon_min + j * lon_step, 4)
+            points.append(Location(f"grid_{i}_{j}", f"Grid {i},{j}", lat, lon))
+    return points
+
+
+def get_locations(spec=None):
+    """Locations for a spec: "stations" (default), "grid:<km>" or "central"."""
+    spec = spec or os.getenv("LIVE_LOCATIONS", "stations")
+    if spec == "stations":
+        return list(STATIONS)
+    if spec == "central":
+        return [DELHI_CENTRAL]
+    if spec.startswith("grid:"):
+        return grid(float(spec.split(":", 1)[1]))
+    raise ValueError(f"Unknown location spec: {spec!r}")
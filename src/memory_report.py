@@ -0,0 +1,180 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import pandas as pd
+
+from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+
+from benchmark_labels import is_fog, pollution_risk
+from data_store import CSV_PATH, TIMESTAMP_COLUMN
+from features import load_features
+from profiling import current_rss_mb, peak_rss_mb
+from train_all_models import TRAINERS
+
+# --------------------------------------------------
+# Peak memory of each training script, before and after the typed loader.
+#   legacy  the original scripts' code (below): read_csv defaults
+#           (float64 / object timestamps), sort + reset_index, row-wise
+#           labels, dropna, then their split and estimator
+#   current float32 / categorical / datetime64 feature cache, masks
+#           instead of dropna, one slice per train/test matrix
+# "load peak" is the peak above the interpreter's starting RSS once the
+# training frame is ready; "peak RSS" includes fitting, where the forest's
+# own trees usually dominate. Each run happens in a fresh interpreter so
+# peaks do not mix.
+#   python src/memory_report.py [--models pm25 pm10]
+# --------------------------------------------------
+
+
+# --------------------------------------------------
+# Legacy: the scripts' original code, before the typed loader. Each
+# function is steps 1-4 of the old script (read_csv, sort, features,
+# dropna) and returns the frame it kept, its features, its target and
+# its estimator; train_legacy is the old steps 5-8 (select, split, fit,
+# predict).
+# --------------------------------------------------
+def _read_sorted(reset_index=True):
+    df = pd.read_csv(CSV_PATH)
+    df["event_timestamp"] = pd.to_datetime(df["event_timestamp"])
+    df = df.sort_values("event_timestamp")
+    return df.reset_index(drop=True) if reset_index else df
+
+
+def _legacy_pm(column):
+    df = _read_sorted()
+    df[f"{column}_lag_1"] = df[column].shift(1)
+    df[f"{column}_lag_2"] = df[column].shift(2)
+    df = df.dropna().reset_index(drop=True)
+    features = ["temperature", "humidity", "pressure", "wind_speed",
+                f"{column}_lag_1", f"{column}_lag_2"]
+    model = RandomForestRegressor(n_estimators=100, random_state=42, n_jobs=-1)
+    return df, features, column, model
+
+
+def _legacy_temperature():
+    df = _read_sorted(reset_index=False)
+    df["temperature_next"] = df["temperature"].shift(-1)
+    df = df.dropna()
+    features = ["humidity", "pressure", "wind_speed", "pm25", "pm10", "no2", "so2", "co"]
+    model = RandomForestRegressor(n_estimators=50, random_state=42, n_jobs=-1)
+    return df, features, "temperature_next", model
+
+
+def _legacy_fog():
+    df = _read_sorted()
+    df["fog"] = df.apply(is_fog, axis=1)
+    features = ["temperature", "humidity", "pressure", "wind_speed", "pm25", "pm10"]
+    model = RandomForestClassifier(
+        n_estimators=100, random_state=42, n_jobs=-1, class_weight="balanced"
+    )
+    return df, features, "fog", model
+
+
+def _legacy_extreme_pollution():
+    df = _read_sorted()
+    df["pollution_risk"] = df["pm25"].apply(pollution_risk)
+    features = ["temperature", "humidity", "pressure", "wind_speed", "pm10"]
+    model = RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=-1)
+    return df, features, "pollution_risk", model
+
+
+LEGACY = {
+    "pm25": lambda: _legacy_pm("pm25"),
+    "pm10": lambda: _legacy_pm("pm10"),
+    "temperature": _legacy_temperature,
+    "fog": _legacy_fog,
+    "extreme_pollution": _legacy_extreme_pollution,
+}
+
+
+def train_legacy(df, features, target, model):
+    X = df[features]
+    y = df[target]
+    split_index = int(len(df) * 0.8)
+    model.fit(X.iloc[:split_index], y.iloc[:split_index])
+    model.predict(X.iloc[split_index:])
+
+
+def measure(name, mode):
+    trainer = TRAINERS[name]
+    rss_start = current_rss_mb()
+
+    start = time.perf_counter()
+    if mode == "legacy":
+        df, features, target, model = LEGACY[name]()
+    else:
+        df = load_features(columns=trainer.features + [trainer.TARGET])
+    load_seconds = time.perf_counter() - start
+    frame_mb = df.memory_usage(deep=True).sum() / (1024 * 1024)
+    load_peak_mb = peak_rss_mb() - rss_start
+
+    start = time.perf_counter()
+    if mode == "legacy":
+        train_legacy(df, features, target, model)
+    else:
+        trainer.train(df)
+    train_seconds = time.perf_counter() - start
+
+    print(json.dumps({
+        "frame_mb": frame_mb,
+        "load_seconds": load_seconds,
+        "train_seconds": train_seconds,
+        "load_peak_mb": load_peak_mb,
+        "peak_mb": peak_rss_mb(),
+        "peak_over_start_mb": peak_rss_mb() - rss_start,
+    }))
+
+
+def measure_in_subprocess(name, mode):
+    output = subprocess.run(
+        [sys.executable, __file__, "--measure", name, mode],
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def report(names):
+    # Build the feature cache up front so "current" is not charged for it
+    load_features(columns=[TIMESTAMP_COLUMN])
+    modes = ["current"]
+    if os.path.exists(CSV_PATH):
+        modes.insert(0, "legacy")
+    else:
+        print(f"{CSV_PATH} not found: reporting the current loader only")
+
+    results = {
+        (name, mode): measure_in_subprocess(name, mode)
+        for name in names for mode in modes
+    }
+
+    print(f"\n{'model':<18}{'mode':<9}{'frame MB':>10}{'load s':>9}"
+          f"{'load peak MB':>14}{'train s':>9}{'peak RSS MB':>13}"
+          f"{'over start MB':>15}")
+    for name in names:
+        for mode in modes:
+            r = results[(name, mode)]
+            print(
+                f"{name:<18}{mode:<9}{r['frame_mb']:>10.1f}{r['load_seconds']:>9.2f}"
+                f"{r['load_peak_mb']:>14.0f}{r['train_seconds']:>9.1f}{r['peak_mb']:>13.0f}"
+                f"{r['peak_over_start_mb']:>15.0f}"
+            )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--measure":
+        measure(*sys.argv[2:4])
+        sys.exit()
+
+    parser = argparse.ArgumentParser(
+        description="Peak memory per training script, legacy vs typed loader."
+    )
+    parser.add_argument(
+        "--models", nargs="+", choices=list(TRAINERS), default=list(TRAINERS),
+    )
+    args = parser.parse_args()
+
+    report(args.models)
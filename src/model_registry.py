@@ -0,0 +1,155 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+import joblib
+
+from compact_forest import CompactForest, DispatchedForest, compact_path, is_forest
+from profiling import current_rss_mb
+
+# --------------------------------------------------
+# MODEL REGISTRY
+# --------------------------------------------------
+# Process-wide, lazily populated model cache. Streamlit re-executes app.py
+# on every interaction, but imported modules live for the whole process,
+# so each model is deserialized once and then shared by every rerun and
+# every session.
+MODEL_PATHS = {
+    "pm25": "models/pm25_model.pkl",
+    "pm10": "models/pm10_model.pkl",
+    "extreme_pollution": "models/extreme_pollution_classifier.pkl",
+    "fog": "models/fog_prediction_model.pkl",
+    # Optional: trained by src/train_multi_horizon.py
+    "multi_horizon": "models/multi_horizon_forecaster.pkl",
+}
+
+# Serve the compact, memory-mapped artifact (compact_forest.py) when one
+# exists, is at least as new as the .pkl and is exact; a depth-capped
+# (approximate) artifact is only served when there is no .pkl.
+# USE_COMPACT_MODELS=0 forces the pickles.
+USE_COMPACT_MODELS = os.getenv("USE_COMPACT_MODELS", "1") != "0"
+
+# Forests are served through compact_forest.DispatchedForest: small
+# batches (single rows, Forecast Lab scenarios) go to the exact evaluator,
+# which skips sklearn's validation and thread dispatch, and large batches
+# to sklearn, which is faster there. With an exact artifact on disk the
+# evaluator reads it memory-mapped and the .pkl is only unpickled on the
+# first large batch. A forest with only a .pkl is flattened on load and
+# the sklearn forest dropped, so one copy stays resident (the evaluator
+# then takes every batch). FOREST_EVALUATOR=0 serves the pickles as is.
+USE_FOREST_EVALUATOR = os.getenv("FOREST_EVALUATOR", "1") != "0"
+
+_models = {}
+_stats = {}
+_locks = {name: threading.Lock() for name in MODEL_PATHS}
+
+
+def _compact_artifact(path):
+    compact = compact_path(path)
+    meta = os.path.join(compact, "meta.json")
+    if not USE_COMPACT_MODELS or not os.path.exists(meta):
+        return None
+    if os.path.exists(path):
+        if os.path.getmtime(meta) < os.path.getmtime(path):
+            return None  # stale: the .pkl was retrained after the export
+        with open(meta) as f:
+            if not json.load(f).get("exact"):
+                return None  # approximate: the .pkl gives exact predictions
+    return compact
+
+
+def _size_bytes(path):
+    if os.path.isdir(path):
+        return sum(
+            os.path.getsize(os.path.join(path, f)) for f in os.listdir(path)
+        )
+    return os.path.getsize(path)
+
+
+def is_available(name):
+    """True when the model has been trained (pickle or compact artifact)."""
+    path = MODEL_PATHS[name]
+    return os.path.exists(path) or _compact_artifact(path) is not None
+
+
+def get_model(name):
+    """Return a loaded model, loading it on first use."""
+    model = _models.get(name)
+    if model is not None:
+        return model
+
+    # One lock per model: concurrent sessions wait for a single load
+    with _locks[name]:
+        if name not in _models:
+            path = MODEL_PATHS[name]
+            compact = _compact_artifact(path)
+            rss_before = current_rss_mb()
+            start = time.perf_counter()
+
+            if compact is not None:
+                model, model_format = CompactForest.load(compact), "compact"
+                if USE_FOREST_EVALUATOR and os.path.exists(path):
+                    # Exact artifact (see _compact_artifact): sklearn takes
+                    # the large batches, loaded when the first one arrives
+                    model = DispatchedForest(model, load=lambda: joblib.load(path))
+                    model_format = "compact (pickle for large batches)"
+            else:
+                model, model_format = joblib.load(path), "pickle"
+                if USE_FOREST_EVALUATOR and is_forest(model):
+                    model = CompactForest.from_sklearn(model, exact=True)
+                    model_format = "pickle (flattened on load)"
+
+            load_seconds = time.perf_counter() - start
+            rss_after = current_rss_mb()
+            _stats[name] = {
+                "format": model_format,
+                "path": compact or path,
+                "version": os.path.getmtime(
+                    os.path.join(compact, "meta.json") if compact else path
+                ),
+                "load_seconds": load_seconds,
+                "memory_mb": (
+                    rss_after - rss_before
+                    if rss_before is not None and rss_after is not None
+                    else None
+                ),
+                "loaded_at": datetime.now().strftime("%H:%M:%S"),
+            }
+            _models[name] = model
+    return _models[name]
+
+
+def model_version(name):
+    """Identifies the model being served: the mtime of the file it was
+    loaded from. A model retrained on disk keeps its version until the
+    process reloads it, like the model itself."""
+    get_model(name)
+    return _stats[name]["version"]
+
+
+def health():
+    """Per-model status: file size, load time and memory once loaded."""
+    report = []
+    for name, path in MODEL_PATHS.items():
+        stats = _stats.get(name, {})
+        served = stats.get("path", path)
+        report.append({
+            "model": name,
+            "status": "loaded" if name in _models else "not loaded",
+            "format": stats.get("format"),
+            "file_mb": (
+                round(_size_bytes(served) / (1024 * 1024), 1)
+                if served and os.path.exists(served) else None
+            ),
+            "load_seconds": (
+                round(stats["load_seconds"], 3) if stats else None
+            ),
+            "memory_mb": (
+                round(stats["memory_mb"], 1)
+                if stats.get("memory_mb") is not None else None
+            ),
+            "loaded_at": stats.get("loaded_at"),
+        })
+    return report
@@ -0,0 +1,173 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from sklearn.ensemble import RandomForestRegressor
+
+from data_store import TIMESTAMP_COLUMN
+from features import lag_columns, sampling_step
+
+# --------------------------------------------------
+# MULTI-HORIZON FORECASTER
+# --------------------------------------------------
+# PM2.5, PM10 and temperature several hours ahead, all trained from one
+# shared feature matrix. Strategies:
+#   direct        one forest per (target, horizon); forests train in
+#                 parallel across horizons
+#   multi_output  one forest per target predicting every horizon at once
+#                 (sklearn forests fit multi-column targets natively);
+#                 the default: ~4x faster to train and ~4x smaller than
+#                 direct at the same accuracy on our data
+# Either way predict() returns every target x horizon in one batched call.
+TARGETS = ["pm25", "pm10", "temperature"]
+HORIZONS_HOURS = [1, 3, 6, 24]
+STRATEGIES = ["direct", "multi_output"]
+
+FORECAST_FEATURES = [
+    "temperature", "humidity", "pressure", "wind_speed", "pm25", "pm10",
+    *lag_columns("pm25"), *lag_columns("pm10"),
+    "hour_sin", "hour_cos", "month_of_year",
+]
+
+MODEL_PATH = "models/multi_horizon_forecaster.pkl"
+
+# A dozen forests live in one artifact, so leaves keep >= 5 rows to bound
+# its size
+FOREST_PARAMS = {"n_estimators": 100, "min_samples_leaf": 5, "random_state": 42}
+
+
+def output_column(target, hours):
+    return f"{target}_{hours}h"
+
+
+def horizon_targets(df, targets, horizons, by=(), tolerance=None):
+    """Future values for every target x horizon, keyed by output column.
+
+    Matched by time, per station (by): each row takes the reading nearest
+    to its timestamp + horizon, within tolerance (default half the
+    sampling step), so gaps and irregular sampling leave NaN instead of
+    pairing a row with the wrong future reading. Repeated readings of one
+    station at one timestamp are averaged.
+    """
+    by = list(by)
+    tolerance = tolerance or sampling_step(df, by) / 2
+    lookup = (
+        df.groupby([*by, TIMESTAMP_COLUMN], observed=True, sort=False)[targets]
+        .mean().reset_index().sort_values(TIMESTAMP_COLUMN, kind="stable")
+    )
+    rows = df[[*by, TIMESTAMP_COLUMN]].assign(_row=np.arange(len(df)))
+
+    result = {}
+    for hours in horizons:
+        probe = rows.assign(
+            **{TIMESTAMP_COLUMN: rows[TIMESTAMP_COLUMN] + pd.Timedelta(hours=hours)}
+        ).sort_values(TIMESTAMP_COLUMN, kind="stable")
+        future = pd.merge_asof(
+            probe, lookup, on=TIMESTAMP_COLUMN, by=by or None,
+            direction="nearest", tolerance=tolerance,
+        ).sort_values("_row")
+        for target in targets:
+            result[output_column(target, hours)] = pd.Series(
+                future[target].to_numpy(), index=df.index
+            )
+    return result
+
+
+class MultiHorizonForecaster:
+    def __init__(self, strategy="multi_output", targets=TARGETS,
+                 horizons=HORIZONS_HOURS, features=FORECAST_FEATURES):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"strategy must be one of {STRATEGIES}")
+        self.strategy = strategy
+        self.targets = list(targets)
+        self.horizons = list(horizons)
+        self.features = list(features)
+        self.models = {}
+        self.step = None
+
+    @property
+    def outputs(self):
+        return [
+            output_column(target, hours)
+            for target in self.targets for hours in self.horizons
+        ]
+
+    def _jobs(self):
+        # (model key, output columns it predicts)
+        if self.strategy == "direct":
+            return [(output, [output]) for output in self.outputs]
+        return [
+            (target, [output_column(target, hours) for hours in self.horizons])
+            for target in self.targets
+        ]
+
+    def fit(self, X, Y, workers=None, n_jobs=None):
+        """X: shared feature matrix; Y: one column per output (NaN rows,
+        e.g. the last 24 h without a future value, are skipped per model)."""
+        jobs = self._jobs()
+        cpus = os.cpu_count() or 1
+        workers = workers or min(len(jobs), cpus)
+        n_jobs = n_jobs or max(1, cpus // workers)
+
+        def fit_one(job):
+            key, columns = job
+            rows = Y[columns].notna().all(axis=1).to_numpy()
+            y = Y.loc[rows, columns]
+            model = RandomForestRegressor(n_jobs=n_jobs, **FOREST_PARAMS)
+            model.fit(X[rows], y.iloc[:, 0] if len(columns) == 1 else y)
+            return key, model
+
+        # Tree building releases the GIL: threads share X without copies
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            self.models = dict(pool.map(fit_one, jobs))
+        return self
+
+    def predict(self, X):
+        """DataFrame with one column per target x horizon (e.g. pm25_6h)."""
+        X = X[self.features] if isinstance(X, pd.DataFrame) else X
+        columns = {}
+        for key, outputs in self._jobs():
+            pred = self.models[key].predict(X)
+            pred = pred.reshape(len(pred), -1)
+            for i, output in enumerate(outputs):
+                columns[output] = pred[:, i]
+        index = X.index if isinstance(X, pd.DataFrame) else None
+        return pd.DataFrame(columns, index=index)[self.outputs]
+
+
+def training_frame(df, forecaster, by=()):
+    """Shared feature matrix and per-horizon targets from a time-sorted
+    feature frame (features.load_features); by: station column(s) when
+    the frame holds several stations."""
+    forecaster.step = sampling_step(df, by)
+    Y = pd.DataFrame(
+        horizon_targets(df, forecaster.targets, forecaster.horizons, by),
+        index=df.index,
+    )
+    complete = np.logical_and.reduce(
+        [df[column].notna().to_numpy() for column in forecaster.features]
+    )
+    return df.loc[complete, forecaster.features], Y[complete]
+
+
+def split_rows(timestamps, forecaster, fraction=0.8):
+    """Time-based train/test masks over a time-sorted training frame.
+
+    The first fraction of rows is the training side, minus the rows whose
+    furthest target (timestamp + max horizon, matched within half a
+    sampling step) would be read at or after the first test timestamp:
+    those targets belong to the test period.
+    """
+    position = np.arange(len(timestamps))
+    split = int(len(timestamps) * fraction)
+    reach = pd.Timedelta(hours=max(forecaster.horizons)) + forecaster.step / 2
+    clear = (timestamps + reach < timestamps.iloc[split]).to_numpy()
+    return (position < split) & clear, position >= split
+
+
+def frame_columns(forecaster, by=()):
+    return list(dict.fromkeys(
+        [TIMESTAMP_COLUMN, *by, *forecaster.features, *forecaster.targets]
+    ))
@@ -0,0 +1,126 @@
+import argparse
+import os
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+# --------------------------------------------------
+# OBSERVATION HISTORY
+# --------------------------------------------------
+# Append-only SQLite table of every live observation. The primary key
+# (location_id, observed_at) is the table's clustered index (WITHOUT
+# ROWID), so "last N hours for one location" is a single B-tree range
+# scan. WAL mode lets the poller append while dashboard sessions read.
+DB_PATH = os.getenv("OBSERVATION_DB_PATH", "data/live/observations.sqlite")
+
+FIELDS = ["temperature", "humidity", "pressure", "wind_speed", "pm25", "pm10"]
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS observations (
+    location_id TEXT NOT NULL,
+    observed_at REAL NOT NULL,
+    {", ".join(f"{field} REAL" for field in FIELDS)},
+    PRIMARY KEY (location_id, observed_at)
+) WITHOUT ROWID
+"""
+
+
+class ObservationStore:
+    def __init__(self, path=DB_PATH):
+        self.path = path
+        # sqlite3 connections must stay on the thread that opened them
+        self._local = threading.local()
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    # --------------------------------------------------
+    # Writes (append-only; re-delivered readings are ignored)
+    # --------------------------------------------------
+    def append_many(self, rows):
+        """rows: iterable of (location_id, observed_at, observation dict).
+
+        observed_at is when the reading was fetched from the provider (the
+        poller's fetched_at), never the time it is written: a reading
+        written again keeps its key, so the write is a no-op.
+        """
+        params = [
+            (location_id, observed_at, *(observation.get(f) for f in FIELDS))
+            for location_id, observed_at, observation in rows
+        ]
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                f"INSERT OR IGNORE INTO observations VALUES "
+                f"({', '.join('?' * (len(FIELDS) + 2))})",
+                params,
+            )
+        return len(params)
+
+    def append(self, location_id, observation, observed_at):
+        return self.append_many([(location_id, observed_at, observation)])
+
+    # --------------------------------------------------
+    # Reads
+    # --------------------------------------------------
+    def query(self, location_id, start=None, end=None, hours=None):
+        """Observations for one location between start and end (epoch
+        seconds), or over the last `hours`, oldest first."""
+        if hours is not None:
+            start = time.time() - hours * 3600
+        frame = pd.read_sql_query(
+            "SELECT * FROM observations WHERE location_id = ? "
+            "AND observed_at >= ? AND observed_at <= ? ORDER BY observed_at",
+            self._connect(),
+            params=(location_id, start or 0.0, end or float("inf")),
+        )
+        frame["observed_at"] = pd.to_datetime(frame["observed_at"], unit="s")
+        return frame
+
+    def latest(self, location_id, n=1):
+        """The n most recent observations for one location, oldest first."""
+        frame = pd.read_sql_query(
+            "SELECT * FROM observations WHERE location_id = ? "
+            "ORDER BY observed_at DESC LIMIT ?",
+            self._connect(),
+            params=(location_id, n),
+        )
+        frame["observed_at"] = pd.to_datetime(frame["observed_at"], unit="s")
+        return frame.iloc[::-1].reset_index(drop=True)
+
+    def stats(self):
+        return pd.read_sql_query(
+            "SELECT location_id, COUNT(*) AS rows, "
+            "MIN(observed_at) AS first, MAX(observed_at) AS last "
+            "FROM observations GROUP BY location_id",
+            self._connect(),
+        )
+
+
+STORE = ObservationStore()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect the observation history.")
+    parser.add_argument("--location", default="delhi_central")
+    parser.add_argument("--hours", type=float, default=24)
+    args = parser.parse_args()
+
+    stats = STORE.stats()
+    print(f"{DB_PATH}: {int(stats['rows'].sum()) if len(stats) else 0} observations, "
+          f"{len(stats)} locations")
+
+    start = time.perf_counter()
+    frame = STORE.query(args.location, hours=args.hours)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    print(f"Last {args.hours:g} h for {args.location}: {len(frame)} rows in {elapsed_ms:.1f} ms")
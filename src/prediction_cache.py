@@ -0,0 +1,121 @@
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from inference import OUTPUTS, predict_one
+from model_registry import model_version
+
+# --------------------------------------------------
+# PREDICTION CACHE
+# --------------------------------------------------
+# Process-wide LRU + TTL cache for Forecast Lab predictions. The sliders
+# snap to fixed steps, so the input space is finite and many sessions
+# exploring what-if scenarios ask for the same points again. Entries are
+# keyed by:
+#   - the slider inputs, quantized to their step (float noise such as
+#     24.999999 and 25.0 share an entry);
+#   - every other feature as given (the real PM readings before the
+#     latest one, shared by all sessions until the next observation);
+#   - the requested outputs and the version of each model serving them,
+#     so a reloaded model never sees the previous model's answers.
+# Misses are scored with the quantized inputs, so a cached answer is
+# exactly what the models return for its key.
+
+# Slider name -> step (app.py, Forecast Lab)
+SLIDER_STEPS = {
+    "temperature": 0.5,
+    "humidity": 1.0,
+    "pressure": 1.0,
+    "wind_speed": 0.5,
+    "pm25": 5.0,
+    "pm10": 10.0,
+}
+
+MAX_ENTRIES = int(os.getenv("PREDICTION_CACHE_SIZE", "10000"))
+TTL_SECONDS = float(os.getenv("PREDICTION_TTL_SECONDS", "3600"))
+
+
+def quantize(value, step):
+    # Round to a multiple of step, then drop the float residue (0.1 * 3)
+    return round(round(float(value) / step) * step, 6)
+
+
+def _plain(value):
+    # numpy scalars -> float; NaN -> None, since NaN never equals itself
+    # and would make every lookup a miss
+    if value is None:
+        return None
+    value = float(value)
+    return None if math.isnan(value) else value
+
+
+class PredictionCache:
+    def __init__(self, max_entries=MAX_ENTRIES, ttl=TTL_SECONDS, steps=SLIDER_STEPS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.steps = steps
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def quantized(self, scenario):
+        return {
+            name: quantize(value, self.steps[name])
+            if name in self.steps else _plain(value)
+            for name, value in scenario.items()
+        }
+
+    def key(self, scenario, outputs):
+        outputs = tuple(outputs or OUTPUTS)
+        versions = tuple(model_version(OUTPUTS[output]) for output in outputs)
+        return outputs, versions, tuple(sorted(scenario.items()))
+
+    def predict_one(self, scenario, outputs=None):
+        """inference.predict_one, answered from the cache when possible."""
+        scenario = self.quantized(scenario)
+        key = self.key(scenario, outputs)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if time.time() - entry[0] < self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return dict(entry[1])
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+
+        # Scored outside the lock: a concurrent miss on the same key only
+        # costs one duplicate prediction
+        prediction = predict_one(scenario, outputs)
+
+        with self._lock:
+            self._entries[key] = (time.time(), prediction)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return dict(prediction)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else None,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+PREDICTIONS = PredictionCache()
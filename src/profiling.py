@@ -0,0 +1,116 @@
+import logging
+import os
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+# --------------------------------------------------
+# Memory helpers (MB); None when the platform cannot tell
+# --------------------------------------------------
+def peak_rss_mb():
+    # Linux: the high-water mark of this process image. ru_maxrss would
+    # carry the parent's peak into a freshly exec'd subprocess.
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS reports bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def current_rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+    except OSError:
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+def format_mb(value):
+    return "n/a" if value is None else f"{value:.0f} MB"
+
+
+# --------------------------------------------------
+# Latency tracking (process-wide, per named stage)
+# --------------------------------------------------
+logger = logging.getLogger("delhi_weather.latency")
+
+# Every sample is logged at DEBUG; at INFO, one p50/p95 line per stage
+# every LATENCY_LOG_EVERY calls (0 turns the summaries off)
+LOG_EVERY = int(os.getenv("LATENCY_LOG_EVERY", "100"))
+
+
+class LatencyTracker:
+    """Rolling window of recent durations per stage, with p50/p95."""
+
+    def __init__(self, window=500, log_every=LOG_EVERY):
+        self._samples = defaultdict(lambda: deque(maxlen=window))
+        self._last = {}
+        self._calls = defaultdict(int)
+        self._lock = threading.Lock()
+        self.log_every = log_every
+
+    @contextmanager
+    def timed(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def record(self, stage, seconds):
+        with self._lock:
+            self._samples[stage].append(seconds)
+            self._last[stage] = seconds
+            self._calls[stage] += 1
+            periodic = self.log_every and self._calls[stage] % self.log_every == 0
+            level = logging.INFO if periodic else logging.DEBUG
+            # Percentiles only when the line is actually emitted
+            if not logger.isEnabledFor(level):
+                return
+            p50, p95 = np.percentile(self._samples[stage], [50, 95])
+            count = len(self._samples[stage])
+        logger.log(
+            level, "%s: %.1f ms (p50 %.1f ms, p95 %.1f ms, n=%d)",
+            stage, seconds * 1000, p50 * 1000, p95 * 1000, count,
+        )
+
+    def summary(self, stages=None):
+        with self._lock:
+            names = stages or sorted(self._samples)
+            rows = []
+            for stage in names:
+                samples = self._samples.get(stage)
+                if not samples:
+                    continue
+                p50, p95 = np.percentile(samples, [50, 95])
+                rows.append({
+                    "stage": stage,
+                    "last_ms": round(self._last[stage] * 1000, 2),
+                    "p50_ms": round(p50 * 1000, 2),
+                    "p95_ms": round(p95 * 1000, 2),
+                    "calls": len(samples),
+                })
+        return rows
+
+
+LATENCY = LatencyTracker()
+timed = LATENCY.timed
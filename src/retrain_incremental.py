@@ -0,0 +1,247 @@
+import argparse
+import os
+import shutil
+import time
+import warnings
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from compact_forest import compact_path, export_compact, replace_compact
+from data_store import TIMESTAMP_COLUMN
+from training_state import read_state, write_state
+from train_all_models import TRAINERS, load_shared_frame
+
+# --------------------------------------------------
+# INCREMENTAL RETRAINING
+# --------------------------------------------------
+# Daily refresh without a full refit. For each forest model:
+#   1. read its training watermark (models/<name>.state.json)
+#   2. take the rows newer than the watermark (the delta); skip the model
+#      when fewer than --min-rows arrived
+#   3. grow --trees new trees with warm_start on the delta plus a
+#      --lookback of recent history, so no tree sees a single day only
+#   4. retire the oldest trees beyond --max-trees (default: the script's
+#      n_estimators), so the artifact stays the same size and slowly
+#      rolls towards recent conditions
+#   5. validate, save the .pkl and compact artifact, advance the watermark
+# warm_start appends trees, so estimators_ stays in training order and
+# the oldest trees are always at the front.
+# sklearn re-derives classes_ from the labels of each fit, and trees over
+# different class sets would not combine. A rare class (fog, extreme
+# pollution) is often missing from a short delta, so its most recent
+# stored rows are added to the batch, at the class's share of the
+# history. A class the forest has never seen needs a full retrain. The
+# updated forest is checked on the fit rows, and the .pkl and compact
+# artifact are both staged before either replaces the served files.
+# Other backends are skipped (retrain those with train_all_models.py).
+#
+# train_all_models.py sets the watermark at its train/test boundary and
+# records the end of its held-out test rows, so the first update also
+# fits those rows (the most recent history). The update log counts them:
+# from then on, train_all's test scores no longer describe the model.
+#   python src/retrain_incremental.py [--models pm25 pm10] [--trees 10]
+DEFAULT_TREES = 10
+DEFAULT_LOOKBACK = "30D"
+DEFAULT_MIN_ROWS = 100
+
+
+def cover_classes(model, df, target, complete, fit_rows):
+    """Add stored rows of the classes missing from fit_rows.
+
+    For each class the forest knows but the batch lacks, the most recent
+    earlier rows of that class join the batch, as many as its share of
+    the complete history (at least one). Returns (fit_rows, rows added,
+    error or None).
+    """
+    labels = df[target].to_numpy()
+    known = model.classes_.tolist()
+    seen = set(np.unique(labels[fit_rows]).tolist())
+    if not seen <= set(known):
+        return fit_rows, 0, (
+            f"new rows have classes {sorted(seen)}, the forest {sorted(known)}"
+        )
+
+    fit_rows = fit_rows.copy()
+    earlier = complete & ~fit_rows
+    batch = int(fit_rows.sum())
+    sampled = 0
+    for label in known:
+        if label in seen:
+            continue
+        stored = np.flatnonzero(earlier & (labels == label))
+        if not len(stored):
+            return fit_rows, 0, f"no stored rows of class {label}"
+        share = (labels[complete] == label).mean()
+        take = stored[-max(1, int(round(share * batch))):]
+        fit_rows[take] = True
+        sampled += len(take)
+    return fit_rows, sampled, None
+
+
+def update_model(name, df, trees=DEFAULT_TREES, max_trees=None,
+                 lookback=DEFAULT_LOOKBACK, min_rows=DEFAULT_MIN_ROWS,
+                 since=None, n_jobs=-1):
+    """Add trees for rows newer than the watermark; returns a status line."""
+    trainer = TRAINERS[name]
+    if not os.path.exists(trainer.MODEL_PATH):
+        return "skipped: not trained yet"
+
+    state = read_state(trainer.MODEL_PATH)
+    if since is not None:
+        watermark = pd.Timestamp(since)
+    elif state is not None:
+        watermark = state["watermark"]
+    else:
+        return "skipped: no watermark (retrain with train_all_models.py or pass --since)"
+
+    model = joblib.load(trainer.MODEL_PATH)
+    if not hasattr(model, "estimators_") or not hasattr(model.estimators_[0], "tree_"):
+        return f"skipped: {type(model).__name__} cannot grow trees incrementally"
+
+    # --------------------------------------------------
+    # 1. Delta since the watermark (+ lookback context)
+    # --------------------------------------------------
+    timestamps = df[TIMESTAMP_COLUMN]
+    complete = np.logical_and.reduce(
+        [df[column].notna().to_numpy() for column in trainer.features + [trainer.TARGET]]
+    )
+    new_rows = complete & (timestamps > watermark).to_numpy()
+    if new_rows.sum() < min_rows:
+        return f"skipped: {new_rows.sum()} new rows since {watermark} (< {min_rows})"
+
+    fit_rows = complete & (timestamps > watermark - pd.Timedelta(lookback)).to_numpy()
+    sampled = 0
+    if hasattr(trainer, "CLASSES"):
+        fit_rows, sampled, error = cover_classes(model, df, trainer.TARGET, complete, fit_rows)
+        if error:
+            return f"skipped: {error} (retrain with train_all_models.py)"
+    X = df.loc[fit_rows, trainer.features]
+    y = df.loc[fit_rows, trainer.TARGET]
+
+    # --------------------------------------------------
+    # 2. Grow new trees, retire the oldest
+    # --------------------------------------------------
+    start = time.perf_counter()
+    before = len(model.estimators_)
+    model.set_params(warm_start=True, n_estimators=before + trees, n_jobs=n_jobs)
+    with warnings.catch_warnings():
+        # "balanced" weights for the new trees come from the update rows
+        # alone; cover_classes keeps every class present in them
+        warnings.filterwarnings("ignore", message="class_weight presets")
+        model.fit(X, y)
+
+    max_trees = max_trees or trainer.FOREST_PARAMS["n_estimators"]
+    retired = max(0, len(model.estimators_) - max_trees)
+    if retired:
+        model.estimators_ = model.estimators_[retired:]
+        model.n_estimators = len(model.estimators_)
+    model.set_params(warm_start=False)
+    seconds = time.perf_counter() - start
+
+    # --------------------------------------------------
+    # 3. Validate, stage both artifacts, then swap them in
+    # --------------------------------------------------
+    try:
+        check = X.iloc[-1000:]
+        values = model.predict_proba(check) if hasattr(trainer, "CLASSES") else model.predict(check)
+        if not np.isfinite(values).all():
+            raise ValueError("non-finite predictions")
+    except ValueError as error:
+        return f"skipped: updated model failed validation ({error}); nothing saved"
+
+    tmp_path = f"{trainer.MODEL_PATH}.tmp"
+    staged = f"{compact_path(trainer.MODEL_PATH)}.tmp"
+    try:
+        joblib.dump(model, tmp_path)
+        staged = export_compact(model, trainer.MODEL_PATH, path=staged)
+    except Exception:
+        for path in (tmp_path, staged):
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+            elif os.path.exists(path):
+                os.remove(path)
+        raise
+    # .pkl first: until the newer artifact lands, the registry sees the
+    # old one as stale and serves the new .pkl
+    os.replace(tmp_path, trainer.MODEL_PATH)
+    replace_compact(staged, trainer.MODEL_PATH)
+
+    new_watermark = timestamps[new_rows].max()
+    held_out_through = (state or {}).get("held_out_through")
+    held_out = (
+        int((new_rows & (timestamps <= held_out_through).to_numpy()).sum())
+        if held_out_through is not None else 0
+    )
+    updates = (state or {}).get("updates", []) + [{
+        "from": watermark.isoformat(),
+        "to": new_watermark.isoformat(),
+        "new_rows": int(new_rows.sum()),
+        "fit_rows": int(fit_rows.sum()),
+        "class_rows_sampled": sampled,
+        "held_out_rows": held_out,
+        "added": trees,
+        "retired": retired,
+        "seconds": round(seconds, 2),
+    }]
+    write_state(
+        trainer.MODEL_PATH, new_watermark, len(model.estimators_), updates,
+        held_out_through=(
+            held_out_through
+            if held_out_through is not None and held_out_through > new_watermark
+            else None
+        ),
+    )
+    notes = [f"{fit_rows.sum()} with lookback"]
+    if sampled:
+        notes.append(f"{sampled} sampled for missing classes")
+    if held_out:
+        notes.append(f"{held_out} were train_all's held-out test rows")
+    return (
+        f"{new_rows.sum()} new rows ({', '.join(notes)}): "
+        f"+{trees} / -{retired} trees in {seconds:.1f}s, "
+        f"watermark {watermark} -> {new_watermark}"
+    )
+
+
+def update_all(names, **options):
+    trainers = {name: TRAINERS[name] for name in names}
+    df = load_shared_frame(trainers)
+    for name in names:
+        print(f"{name}: {update_model(name, df, **options)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Update trained forests with rows newer than their watermark."
+    )
+    parser.add_argument(
+        "--models", nargs="+", choices=list(TRAINERS), default=list(TRAINERS),
+    )
+    parser.add_argument(
+        "--trees", type=int, default=DEFAULT_TREES,
+        help=f"New trees per update (default {DEFAULT_TREES})"
+    )
+    parser.add_argument(
+        "--max-trees", type=int,
+        help="Retire the oldest trees beyond this (default: the script's n_estimators)"
+    )
+    parser.add_argument(
+        "--lookback", default=DEFAULT_LOOKBACK,
+        help=f"History before the watermark the new trees also see (default {DEFAULT_LOOKBACK})"
+    )
+    parser.add_argument(
+        "--min-rows", type=int, default=DEFAULT_MIN_ROWS,
+        help="Skip a model when fewer new rows arrived"
+    )
+    parser.add_argument(
+        "--since",
+        help="Override the watermark (e.g. for models trained without one)"
+    )
+    args = parser.parse_args()
+
+    update_all(
+        args.models, trees=args.trees, max_trees=args.max_trees,
+        lookback=args.lookback, min_rows=args.min_rows, since=args.since,
+    )
@@ -0,0 +1,35 @@
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+import numpy as np
+
+# --------------------------------------------------
+# PROCESS POOL OVER SHARED MEMORY-MAPPED ARRAYS
+# --------------------------------------------------
+# Used by src/tune_models.py and src/backtest.py. The arrays are written
+# once as .npy and every worker process memory-maps them: the OS shares
+# one copy of the pages, and contiguous row ranges slice as views.
+# Worker-side tasks read them from ARRAYS by name.
+ARRAYS = {}
+
+
+def _init_worker(shared_dir, names):
+    for name in names:
+        ARRAYS[name] = np.load(os.path.join(shared_dir, f"{name}.npy"), mmap_mode="r")
+
+
+@contextmanager
+def memmap_pool(workers, **arrays):
+    """ProcessPoolExecutor whose workers see each keyword array in ARRAYS."""
+    with tempfile.TemporaryDirectory() as shared_dir:
+        for name, array in arrays.items():
+            np.save(os.path.join(shared_dir, f"{name}.npy"), array)
+        names = list(arrays)
+        # Only the files are needed from here on; let the caller free RAM
+        arrays.clear()
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(shared_dir, names)
+        ) as pool:
+            yield pool
@@ -0,0 +1,83 @@
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+# --------------------------------------------------
+# Local stand-in for the two OpenWeather endpoints the dashboard uses.
+#   python src/stub_openweather_server.py --delay 0.3 --fail-rate 0.2
+#   python src/stub_openweather_server.py --fail-first 3   # then healthy
+#   OPENWEATHER_BASE_URL=http://127.0.0.1:8765 streamlit run app.py
+# --------------------------------------------------
+WEATHER = {
+    "main": {"temp": 24.5, "humidity": 62, "pressure": 1009},
+    "wind": {"speed": 2.4},
+}
+AIR_POLLUTION = {
+    "list": [{"components": {"pm2_5": 118.0, "pm10": 196.0}}],
+}
+RESPONSES = {"/weather": WEATHER, "/air_pollution": AIR_POLLUTION}
+
+
+def make_handler(delay, fail_rate, fail_first=0):
+    class StubHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            with self.server.lock:
+                self.server.requests += 1
+                number = self.server.requests
+            time.sleep(delay)
+            body = RESPONSES.get(urlparse(self.path).path)
+            if body is None:
+                status, body = 404, {"message": "not found"}
+            elif number <= fail_first or random.random() < fail_rate:
+                status, body = 503, {"message": "stub failure"}
+            else:
+                status = 200
+
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return StubHandler
+
+
+def serve(port=8765, delay=0.0, fail_rate=0.0, fail_first=0):
+    """The server counts the requests it answered (server.requests); the
+    first fail_first of them get a 503."""
+    server = ThreadingHTTPServer(
+        ("127.0.0.1", port), make_handler(delay, fail_rate, fail_first)
+    )
+    server.requests = 0
+    server.lock = threading.Lock()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stub OpenWeather API server.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument(
+        "--delay", type=float, default=0.0,
+        help="Seconds each response is held back (simulated latency)"
+    )
+    parser.add_argument(
+        "--fail-rate", type=float, default=0.0,
+        help="Fraction of requests answered with 503"
+    )
+    parser.add_argument(
+        "--fail-first", type=int, default=0,
+        help="Answer the first N requests with 503 (a transient outage)"
+    )
+    args = parser.parse_args()
+
+    server = serve(args.port, args.delay, args.fail_rate, args.fail_first)
+    print(f"Stub OpenWeather API on http://127.0.0.1:{args.port}")
+    server.serve_forever()
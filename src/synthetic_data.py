@@ -0,0 +1,148 @@
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from scipy.signal import lfilter
+
+from data_store import CSV_PATH, TIMESTAMP_COLUMN
+
+# --------------------------------------------------
+# SYNTHETIC DATASET
+# --------------------------------------------------
+# A stand-in for delhi_weather_pollution.csv (same columns, units and
+# text format) at any size, for benchmarks and for trying the pipeline
+# without the real file. The readings follow Delhi's shape closely enough
+# for every label and model to see realistic classes:
+#   temperature  seasonal (~16 C in January, ~35 C in June) + diurnal
+#   humidity     monsoon-wet, anti-correlated with the daily temperature
+#   pm25/pm10    winter smog, night-time peaks, worse in still air
+#   fog          humid, cold, calm and polluted winter nights
+# Noise terms are AR(1) so consecutive readings are correlated and lag
+# features carry signal. Output is deterministic for a given seed.
+#   python src/synthetic_data.py --rows 1m [--out data/delhi_weather_pollution.csv]
+SIZES = {"10k": 10_000, "1m": 1_000_000, "10m": 10_000_000}
+
+START = pd.Timestamp("2015-01-01")
+# Readings every 10 minutes, closer together for big sizes so the whole
+# series stays within ten years (and inside pandas' timestamp range)
+MAX_STEP = pd.Timedelta(minutes=10)
+MAX_SPAN = pd.Timedelta(days=3652)
+
+CHUNK_ROWS = 1_000_000
+
+
+def parse_rows(value):
+    """'10k' / '1m' / '10m' or a plain integer."""
+    return SIZES.get(str(value).lower()) or int(value)
+
+
+def step_for(rows):
+    return min(MAX_STEP, (MAX_SPAN / rows).floor("s"))
+
+
+def _ar1(rng, n, phi, scale, state):
+    # x[t] = phi * x[t-1] + e[t], continued from the previous chunk
+    noise = rng.normal(0, scale, n)
+    values, state = lfilter([1.0], [1.0, -phi], noise, zi=state)
+    return values, state
+
+
+def iter_chunks(rows, seed=42, chunk_rows=CHUNK_ROWS):
+    """Yield the synthetic dataset in time order, chunk_rows at a time."""
+    rng = np.random.default_rng(seed)
+    step = step_for(rows)
+    state = {name: np.zeros(1) for name in ("temp", "hum", "wind", "pm")}
+
+    for offset in range(0, rows, chunk_rows):
+        n = min(chunk_rows, rows - offset)
+        timestamps = pd.DatetimeIndex(START + step * np.arange(offset, offset + n))
+        day = (timestamps.dayofyear.to_numpy() - 1) / 365.25
+        hour = timestamps.hour.to_numpy() + timestamps.minute.to_numpy() / 60
+
+        winter = np.cos(2 * np.pi * day)  # +1 in January, -1 in July
+        monsoon = np.exp(-((day - 0.6) ** 2) / 0.006)  # peaks in August
+        afternoon = np.cos(2 * np.pi * (hour - 15) / 24)  # +1 at 3 pm
+
+        noise, state["temp"] = _ar1(rng, n, 0.98, 0.4, state["temp"])
+        temperature = (
+            26 - 10 * winter - 4 * monsoon + 5 * afternoon + noise
+        )
+
+        noise, state["hum"] = _ar1(rng, n, 0.97, 2.0, state["hum"])
+        humidity = np.clip(
+            55 + 12 * winter + 30 * monsoon - 15 * afternoon + noise, 5, 100
+        )
+
+        noise, state["wind"] = _ar1(rng, n, 0.95, 0.3, state["wind"])
+        wind_speed = np.clip(
+            2.8 - 0.8 * winter + 1.2 * afternoon + noise, 0, None
+        )
+
+        pressure = (
+            1006 + 8 * winter - 1.5 * np.cos(4 * np.pi * (hour - 10) / 24)
+            + rng.normal(0, 1.0, n)
+        )
+
+        noise, state["pm"] = _ar1(rng, n, 0.99, 0.05, state["pm"])
+        # Log-normal around a winter-heavy base; still air traps it
+        pm25 = np.exp(
+            4.3 + 0.9 * winter - 0.6 * monsoon - 0.3 * afternoon
+            - 0.15 * wind_speed + noise
+        )
+        pm10 = pm25 * rng.uniform(1.5, 2.2, n) + rng.gamma(2.0, 15.0, n)
+
+        no2 = np.clip(35 + 15 * winter - 10 * afternoon + rng.normal(0, 8, n), 1, None)
+        so2 = np.clip(12 + 4 * winter + rng.normal(0, 3, n), 0.5, None)
+        co = np.clip(900 + 500 * winter - 200 * afternoon + rng.normal(0, 150, n), 50, None)
+
+        yield pd.DataFrame({
+            TIMESTAMP_COLUMN: timestamps,
+            "temperature": temperature.round(2),
+            "humidity": humidity.round(0),
+            "pressure": pressure.round(1),
+            "wind_speed": wind_speed.round(2),
+            "pm25": pm25.round(2),
+            "pm10": pm10.round(2),
+            "no2": no2.round(2),
+            "so2": so2.round(2),
+            "co": co.round(1),
+        })
+
+
+def generate(rows, seed=42):
+    """The whole synthetic dataset as one DataFrame (time-sorted)."""
+    return pd.concat(iter_chunks(rows, seed), ignore_index=True)
+
+
+def write_csv(rows, path=CSV_PATH, seed=42):
+    """Write the dataset in chunks, so 10M rows never sit in memory at once."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    for i, chunk in enumerate(iter_chunks(rows, seed)):
+        chunk.to_csv(
+            tmp_path, mode="w" if i == 0 else "a", header=i == 0,
+            index=False, date_format="%Y-%m-%d %H:%M:%S",
+        )
+    os.replace(tmp_path, path)
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Generate a synthetic delhi_weather_pollution.csv."
+    )
+    parser.add_argument(
+        "--rows", default="1m",
+        help=f"Row count or one of {', '.join(SIZES)} (default: 1m)"
+    )
+    parser.add_argument("--out", default=CSV_PATH)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rows = parse_rows(args.rows)
+    start = time.perf_counter()
+    write_csv(rows, args.out, args.seed)
+    print(f"Wrote {rows} rows to {args.out} in {time.perf_counter() - start:.1f}s "
+          f"({os.path.getsize(args.out) / (1024 * 1024):.0f} MB)")
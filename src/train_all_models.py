@@ -0,0 +1,137 @@
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import joblib
+
+from compact_forest import export_compact
+from data_store import TIMESTAMP_COLUMN
+from estimators import BACKENDS
+from features import load_features, training_row_interval, write_feature_meta
+from profiling import peak_rss_mb, format_mb
+from training_state import write_state
+
+import train_pm25_model
+import train_pm10_model
+import train_temperature_model
+import train_fog_prediction_model
+import train_extreme_pollution_classifier
+
+# --------------------------------------------------
+# Every model trained from the same in-memory frame
+# --------------------------------------------------
+TRAINERS = {
+    "pm25": train_pm25_model,
+    "pm10": train_pm10_model,
+    "temperature": train_temperature_model,
+    "fog": train_fog_prediction_model,
+    "extreme_pollution": train_extreme_pollution_classifier,
+}
+
+
+def load_shared_frame(trainers):
+    # One read of the cached feature frame (src/features.py), already
+    # time-sorted, holding every model's features and target
+    columns = [TIMESTAMP_COLUMN]
+    for trainer in trainers.values():
+        columns += [
+            c for c in trainer.features + [trainer.TARGET] if c not in columns
+        ]
+    return load_features(columns=columns)
+
+
+def run_trainer(name, trainer, df, split_index, n_jobs, backend):
+    start = time.perf_counter()
+    model, report = trainer.train(
+        df, split_index=split_index, n_jobs=n_jobs, backend=backend
+    )
+    joblib.dump(model, trainer.MODEL_PATH)
+    export_compact(model, trainer.MODEL_PATH)
+    # Watermark for src/retrain_incremental.py: the newest training row.
+    # The test rows after it were only scored; the first incremental
+    # update fits them and logs that it did
+    write_state(
+        trainer.MODEL_PATH, df[TIMESTAMP_COLUMN].iloc[split_index - 1],
+        n_trees=len(getattr(model, "estimators_", [])) or None,
+        held_out_through=df[TIMESTAMP_COLUMN].iloc[-1],
+    )
+    return name, report, time.perf_counter() - start
+
+
+def train_all(names=None, workers=None, backend="forest"):
+    trainers = {
+        name: trainer for name, trainer in TRAINERS.items()
+        if names is None or name in names
+    }
+
+    # --------------------------------------------------
+    # 1. Load features ONCE
+    # --------------------------------------------------
+    start = time.perf_counter()
+    df = load_shared_frame(trainers)
+    load_seconds = time.perf_counter() - start
+    print(f"Loaded {len(df)} rows in {load_seconds:.1f}s")
+
+    # --------------------------------------------------
+    # 2. Shared time-based 80/20 split (index of the sorted frame)
+    # --------------------------------------------------
+    split_index = int(len(df) * 0.8)
+    print(f"Train/test boundary: {df['event_timestamp'].iloc[split_index]}")
+
+    # --------------------------------------------------
+    # 3. Train concurrently; tree building releases the GIL, so
+    #    threads share the frame without copying it per model
+    # --------------------------------------------------
+    cpus = os.cpu_count() or 1
+    workers = workers or min(len(trainers), cpus)
+    n_jobs = max(1, cpus // workers)
+
+    timings = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(
+                run_trainer, name, trainer, df, split_index, n_jobs, backend
+            )
+            for name, trainer in trainers.items()
+        ]
+        for future in as_completed(futures):
+            name, report, seconds = future.result()
+            timings[name] = seconds
+            print(f"\n===== {name} ({seconds:.1f}s) =====")
+            print(report)
+
+    # --------------------------------------------------
+    # 4. Timing and memory summary
+    # --------------------------------------------------
+    print("\nTraining summary")
+    print(f"  {'load features':<20}{load_seconds:>8.1f}s")
+    for name in trainers:
+        print(f"  {name:<20}{timings[name]:>8.1f}s")
+    print(f"  {'peak memory':<20}{format_mb(peak_rss_mb()):>9}")
+
+    # Lag spacing the models were trained on, for serving
+    # (src/feature_store.py)
+    write_feature_meta(training_row_interval())
+    return timings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Train all forecasting models from one shared dataset load."
+    )
+    parser.add_argument(
+        "--models", nargs="+", choices=list(TRAINERS),
+        help="Subset of models to train (default: all)"
+    )
+    parser.add_argument(
+        "--workers", type=int,
+        help="Models trained at the same time (default: one per core)"
+    )
+    parser.add_argument(
+        "--backend", choices=BACKENDS, default="forest",
+        help="Estimator backend for every model (see src/estimators.py)"
+    )
+    args = parser.parse_args()
+
+    train_all(args.models, args.workers, args.backend)
@@ -1,40 +1,14 @@
-import pandas as pd
-import numpy as np
+import argparse
 import joblib
 
-from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import classification_report, confusion_matrix
 
-# --------------------------------------------------
-# 1. Load dataset
-# --------------------------------------------------
-df = pd.read_csv("data/delhi_weather_pollution.csv")
-
-# --------------------------------------------------
-# 2. Convert timestamp and sort
-# --------------------------------------------------
-df["event_timestamp"] = pd.to_datetime(df["event_timestamp"])
-df = df.sort_values("event_timestamp").reset_index(drop=True)
-
-# --------------------------------------------------
-# 3. Create fog label using domain rules
-# --------------------------------------------------
-def is_fog(row):
-    if (
-        row["humidity"] >= 90 and
-        row["wind_speed"] <= 2 and
-        row["temperature"] <= 15 and
-        row["pm25"] >= 100
-    ):
-        return 1  # Fog
-    else:
-        return 0  # No Fog
-
-df["fog"] = df.apply(is_fog, axis=1)
-
-# --------------------------------------------------
-# 4. Feature selection
-# --------------------------------------------------
+from compact_forest import export_compact
+from estimators import BACKENDS, make_estimator
+from features import load_features
+
+MODEL_PATH = "models/fog_prediction_model.pkl"
+
 features = [
     "temperature",
     "humidity",
@@ -44,51 +18,81 @@ features = [
     "pm10"
 ]
 
-X = df[features]
-y = df["fog"]
-
-# --------------------------------------------------
-# 5. Time-based train/test split
-# --------------------------------------------------
-split_index = int(len(df) * 0.8)
-
-X_train = X.iloc[:split_index]
-X_test  = X.iloc[split_index:]
-
-y_train = y.iloc[:split_index]
-y_test  = y.iloc[split_index:]
-
-# --------------------------------------------------
-# 6. Train classifier
-# --------------------------------------------------
-model = RandomForestClassifier(
-    n_estimators=100,
-    random_state=42,
-    n_jobs=-1,
-    class_weight="balanced"
-)
-
-model.fit(X_train, y_train)
-
-# --------------------------------------------------
-# 7. Evaluate model
-# --------------------------------------------------
-y_pred = model.predict(X_test)
-
-print("Fog Prediction Classification Report:\n")
-print(classification_report(
-    y_test,
-    y_pred,
-    labels=[0, 1],
-    target_names=["No Fog", "Fog"],
-    zero_division=0
-))
-
-print("Confusion Matrix:")
-print(confusion_matrix(y_test, y_pred, labels=[0, 1]))
-
-# --------------------------------------------------
-# 8. Save model locally
-# --------------------------------------------------
-joblib.dump(model, "models/fog_prediction_model.pkl")
-print("Fog prediction model saved locally.")
+# Rule lives in label_rules.LABEL_RULES["fog"] (shared with the dashboard);
+# the label is part of the shared feature pipeline (src/features.py)
+TARGET = "fog"
+CLASSES = [0, 1]
+
+# RandomForest settings; other backends use their defaults (src/estimators.py)
+FOREST_PARAMS = {"n_estimators": 100, "random_state": 42,
+                 "class_weight": "balanced"}
+
+
+def train(df, split_index=None, n_jobs=-1, backend="forest"):
+    """Train on a time-sorted feature frame (features.load_features);
+    rows with index < split_index train."""
+    # --------------------------------------------------
+    # 4./5. Time-based train/test split; features and target are sliced
+    #       straight from df, one copy apiece
+    # --------------------------------------------------
+    if split_index is None:
+        split_index = df.index[int(len(df) * 0.8)]
+    train_rows = df.index < split_index
+    test_rows = ~train_rows
+
+    X_train = df.loc[train_rows, features]
+    X_test  = df.loc[test_rows, features]
+
+    y_train = df.loc[train_rows, TARGET]
+    y_test  = df.loc[test_rows, TARGET]
+
+    # --------------------------------------------------
+    # 6. Train classifier
+    # --------------------------------------------------
+    model = make_estimator(backend, "classifier", FOREST_PARAMS, n_jobs=n_jobs)
+
+    model.fit(X_train, y_train)
+
+    # --------------------------------------------------
+    # 7. Evaluate model
+    # --------------------------------------------------
+    y_pred = model.predict(X_test)
+
+    report = "Fog Prediction Classification Report:\n\n"
+    report += classification_report(
+        y_test,
+        y_pred,
+        labels=CLASSES,
+        target_names=["No Fog", "Fog"],
+        zero_division=0
+    )
+    report += "\nConfusion Matrix:\n"
+    report += str(confusion_matrix(y_test, y_pred, labels=CLASSES))
+    return model, report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backend", choices=BACKENDS, default="forest",
+                        help="Estimator backend (see src/estimators.py)")
+    args = parser.parse_args()
+
+    # --------------------------------------------------
+    # 1. Load the cached feature frame (built once, time-sorted)
+    # --------------------------------------------------
+    df = load_features(columns=features + [TARGET])
+
+    model, report = train(df, backend=args.backend)
+    print(report)
+
+    # --------------------------------------------------
+    # 8. Save model locally
+    # --------------------------------------------------
+    joblib.dump(model, MODEL_PATH)
+    print("Fog prediction model saved locally.")
+
+    # Compact serving artifact (exact float64, full depth, memory-mappable);
+    # forests only, other backends are served from the .pkl
+    compact = export_compact(model, MODEL_PATH)
+    if compact:
+        print("Compact artifact written to", compact)
@@ -0,0 +1,75 @@
+import argparse
+import time
+
+import joblib
+import numpy as np
+
+from data_store import TIMESTAMP_COLUMN
+from features import load_features, write_feature_meta
+from multi_horizon import (
+    HORIZONS_HOURS, MODEL_PATH, STRATEGIES, MultiHorizonForecaster,
+    frame_columns, split_rows, training_frame,
+)
+from profiling import format_mb, peak_rss_mb
+
+# --------------------------------------------------
+# Train the multi-horizon forecaster from the cached feature frame:
+#   python src/train_multi_horizon.py [--strategy multi_output]
+#                                     [--horizons 1 3 6 24] [--workers 4]
+#                                     [--by station_id]
+# --------------------------------------------------
+
+
+def train(df, strategy="multi_output", horizons=HORIZONS_HOURS, workers=None, by=()):
+    forecaster = MultiHorizonForecaster(strategy=strategy, horizons=horizons)
+    X, Y = training_frame(df, forecaster, by)
+
+    # Time-based 80/20 split; training stops max(horizons) before the test
+    # period so no training target is read from it
+    train_rows, test_rows = split_rows(df.loc[X.index, TIMESTAMP_COLUMN], forecaster)
+    start = time.perf_counter()
+    forecaster.fit(X[train_rows], Y[train_rows], workers=workers)
+    fit_seconds = time.perf_counter() - start
+
+    pred = forecaster.predict(X[test_rows])
+    actual = Y[test_rows]
+    gap = int(test_rows.argmax() - train_rows.sum())
+
+    lines = [
+        f"Multi-horizon forecaster ({strategy}, {len(forecaster.models)} forests, "
+        f"{forecaster.step} sampling step) trained in {fit_seconds:.1f}s",
+        f"{gap} rows before the test period left out (targets inside it)",
+        "",
+        f"{'MAE':<14}" + "".join(f"{f'+{h}h':>9}" for h in forecaster.horizons),
+    ]
+    for target in forecaster.targets:
+        maes = []
+        for hours in forecaster.horizons:
+            column = f"{target}_{hours}h"
+            rows = actual[column].notna().to_numpy()
+            maes.append(np.abs(pred.loc[rows, column] - actual.loc[rows, column]).mean())
+        lines.append(f"{target:<14}" + "".join(f"{mae:>9.2f}" for mae in maes))
+    return forecaster, "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Train PM2.5 / PM10 / temperature forecasts for several horizons."
+    )
+    parser.add_argument("--strategy", choices=STRATEGIES, default="multi_output")
+    parser.add_argument("--horizons", type=int, nargs="+", default=HORIZONS_HOURS,
+                        help="Hours ahead (default: 1 3 6 24)")
+    parser.add_argument("--workers", type=int,
+                        help="Forests trained at the same time (default: one per core)")
+    parser.add_argument("--by", nargs="+", default=[],
+                        help="Station column(s), when the dataset holds several stations")
+    args = parser.parse_args()
+
+    df = load_features(columns=frame_columns(MultiHorizonForecaster(), args.by))
+    forecaster, report = train(df, args.strategy, args.horizons, args.workers, args.by)
+    print(report)
+    print(f"Peak memory: {format_mb(peak_rss_mb())}")
+
+    joblib.dump(forecaster, MODEL_PATH)
+    write_feature_meta(forecaster.step.total_seconds())
+    print("Multi-horizon forecaster saved to", MODEL_PATH)
@@ -1,83 +1,106 @@
-import pandas as pd
+import argparse
 import numpy as np
 import joblib
 
-from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_absolute_error, mean_squared_error
 
-# --------------------------------------------------
-# 1. Load dataset
-# --------------------------------------------------
-df = pd.read_csv("data/delhi_weather_pollution.csv")
-
-# --------------------------------------------------
-# 2. Convert timestamp and sort (CRITICAL)
-# --------------------------------------------------
-df["event_timestamp"] = pd.to_datetime(df["event_timestamp"])
-df = df.sort_values("event_timestamp").reset_index(drop=True)
-
-# --------------------------------------------------
-# 3. Create lag features for PM2.5 (real forecasting)
-# --------------------------------------------------
-df["pm25_lag_1"] = df["pm25"].shift(1)
-df["pm25_lag_2"] = df["pm25"].shift(2)
-
-# --------------------------------------------------
-# 4. Drop rows with missing values
-# --------------------------------------------------
-df = df.dropna().reset_index(drop=True)
-
-# --------------------------------------------------
-# 5. Feature selection
-# --------------------------------------------------
+from compact_forest import export_compact
+from estimators import BACKENDS, make_estimator
+from features import (
+    lag_columns, load_features, training_row_interval, write_feature_meta,
+)
+
+MODEL_PATH = "models/pm25_model.pkl"
+
 features = [
     "temperature",
     "humidity",
     "pressure",
     "wind_speed",
-    "pm25_lag_1",
-    "pm25_lag_2"
+    *lag_columns("pm25"),  # shared with serving (src/features.py)
 ]
 
-X = df[features]
-y = df["pm25"]
-
-# --------------------------------------------------
-# 6. TIME-BASED TRAIN / TEST SPLIT (NO LEAKAGE)
-# --------------------------------------------------
-split_index = int(len(df) * 0.8)
-
-X_train = X.iloc[:split_index]
-X_test  = X.iloc[split_index:]
-
-y_train = y.iloc[:split_index]
-y_test  = y.iloc[split_index:]
-
-# --------------------------------------------------
-# 7. Train Random Forest model
-# --------------------------------------------------
-model = RandomForestRegressor(
-    n_estimators=100,
-    random_state=42,
-    n_jobs=-1
-)
-
-model.fit(X_train, y_train)
-
-# --------------------------------------------------
-# 8. Evaluate model
-# --------------------------------------------------
-y_pred = model.predict(X_test)
-
-mae = mean_absolute_error(y_test, y_pred)
-rmse = np.sqrt(mean_squared_error(y_test, y_pred))
-
-print("PM2.5 Forecasting Model Trained Successfully!")
-print(f"MAE  : {mae:.2f}")
-print(f"RMSE : {rmse:.2f}")
-
-# --------------------------------------------------
-# 9. Save model locally (NOT for GitHub)
-# --------------------------------------------------
-joblib.dump(model, "models/pm25_model.pkl")
-print("PM2.5 model saved locally.")
+TARGET = "pm25"
+
+# RandomForest settings; other backends use their defaults (src/estimators.py)
+FOREST_PARAMS = {"n_estimators": 100, "random_state": 42}
+
+
+def train(df, split_index=None, n_jobs=-1, backend="forest"):
+    """Train on a time-sorted feature frame (features.load_features);
+    rows with index < split_index train."""
+    # --------------------------------------------------
+    # 4. Rows with every feature and the target present. A boolean
+    #    mask instead of dropna(), so the frame is not copied just to
+    #    drop the first lag rows
+    # --------------------------------------------------
+    complete = np.logical_and.reduce(
+        [df[column].notna().to_numpy() for column in features + [TARGET]]
+    )
+
+    # --------------------------------------------------
+    # 5./6. TIME-BASED TRAIN / TEST SPLIT (NO LEAKAGE); each matrix is
+    #       sliced straight from df, one copy apiece
+    # --------------------------------------------------
+    if split_index is None:
+        split_index = df.index[complete][int(complete.sum() * 0.8)]
+    before_split = df.index < split_index
+    train_rows = complete & before_split
+    test_rows = complete & ~before_split
+
+    X_train = df.loc[train_rows, features]
+    X_test  = df.loc[test_rows, features]
+
+    y_train = df.loc[train_rows, TARGET]
+    y_test  = df.loc[test_rows, TARGET]
+
+    # --------------------------------------------------
+    # 7. Train Random Forest model
+    # --------------------------------------------------
+    model = make_estimator(backend, "regressor", FOREST_PARAMS, n_jobs=n_jobs)
+
+    model.fit(X_train, y_train)
+
+    # --------------------------------------------------
+    # 8. Evaluate model
+    # --------------------------------------------------
+    y_pred = model.predict(X_test)
+
+    mae = mean_absolute_error(y_test, y_pred)
+    rmse = np.sqrt(mean_squared_error(y_test, y_pred))
+
+    report = (
+        "PM2.5 Forecasting Model Trained Successfully!\n"
+        f"MAE  : {mae:.2f}\n"
+        f"RMSE : {rmse:.2f}"
+    )
+    return model, report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backend", choices=BACKENDS, default="forest",
+                        help="Estimator backend (see src/estimators.py)")
+    args = parser.parse_args()
+
+    # --------------------------------------------------
+    # 1. Load the cached feature frame (built once, time-sorted)
+    # --------------------------------------------------
+    df = load_features(columns=features + [TARGET])
+
+    model, report = train(df, backend=args.backend)
+    print(report)
+
+    # --------------------------------------------------
+    # 9. Save model locally (NOT for GitHub)
+    # --------------------------------------------------
+    joblib.dump(model, MODEL_PATH)
+    # Lag spacing the model was trained on, for serving (src/feature_store.py)
+    write_feature_meta(training_row_interval())
+    print("PM2.5 model saved locally.")
+
+    # Compact serving artifact (exact float64, full depth, memory-mappable);
+    # forests only, other backends are served from the .pkl
+    compact = export_compact(model, MODEL_PATH)
+    if compact:
+        print("Compact artifact written to", compact)
@@ -0,0 +1,212 @@
+import argparse
+import os
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import SGDClassifier, SGDRegressor
+from sklearn.metrics import confusion_matrix
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from compact_forest import export_compact
+from data_store import (
+    RAW_COLUMNS, TIMESTAMP_COLUMN, count_rows, iter_dataset, text_columns,
+)
+from features import (
+    FEATURE_META_PATH, build_features, max_lag, sampling_step, write_feature_meta,
+)
+from profiling import peak_rss_mb, format_mb
+from train_all_models import TRAINERS
+
+# --------------------------------------------------
+# STREAMING TRAINING MODE
+# --------------------------------------------------
+# Reads the Parquet cache in time-ordered chunks and trains an estimator
+# that can learn incrementally, so memory is bounded by the chunk size
+# instead of the length of the history:
+#   forest -> RandomForestRegressor shards: warm_start adds a few trees
+#             fitted on each new chunk (regression models only)
+#   sgd    -> StandardScaler + SGDRegressor / SGDClassifier partial_fit
+# The default is forest for regression models and sgd for classifiers.
+# The first 80% of rows (in time order) train, the rest are scored.
+
+# Rows of history / future each training row needs (0 when absent)
+MAX_LAG = {"pm25": max_lag("pm25"), "pm10": max_lag("pm10")}
+MAX_LEAD = {"temperature": 1}
+
+
+def iter_training_chunks(name, chunk_rows):
+    """Yield feature frames whose lags/leads are correct across chunks.
+
+    The last MAX_LAG + MAX_LEAD raw rows of each station are carried into
+    the next chunk: MAX_LAG rows of history for the lag features, and
+    MAX_LEAD rows whose future target only arrives with the next chunk.
+    """
+    trainer = TRAINERS[name]
+    max_lead = MAX_LEAD.get(name, 0)
+    context_rows = MAX_LAG.get(name, 0) + max_lead
+    stations = text_columns()
+    columns = RAW_COLUMNS[name] + stations
+    context = None
+    pending = pd.Index([])
+    offset = 0
+
+    for chunk in iter_dataset(columns=columns, chunk_rows=chunk_rows):
+        # Global row position as index, used for the train/test boundary
+        chunk = chunk.set_axis(pd.RangeIndex(offset, offset + len(chunk)))
+        offset += len(chunk)
+
+        frame = chunk if context is None else pd.concat([context, chunk])
+        data = build_features(frame[columns].copy())
+
+        # Skip carried rows already emitted with an earlier chunk, and
+        # hold back each station's rows still waiting for their future
+        # target
+        fresh = (data.index >= chunk.index[0]) | data.index.isin(pending)
+        if stations:
+            from_end = data.groupby(stations, observed=True).cumcount(ascending=False)
+        else:
+            from_end = pd.Series(np.arange(len(data))[::-1], index=data.index)
+        held = (from_end < max_lead).to_numpy()
+        pending = data.index[fresh & held]
+        data = data[fresh & ~held].dropna(
+            subset=trainer.features + [trainer.TARGET]
+        )
+
+        if context_rows:
+            context = (
+                frame.groupby(stations, observed=True).tail(context_rows)
+                if stations else frame.iloc[-context_rows:]
+            )
+        if len(data):
+            yield data
+
+
+def row_interval(chunk_rows):
+    """Seconds between dataset rows, from the first chunk (the whole
+    frame is never loaded here, so the feature cache's value is not
+    available)."""
+    stations = text_columns()
+    first = next(iter_dataset(columns=[TIMESTAMP_COLUMN, *stations], chunk_rows=chunk_rows))
+    return sampling_step(first, stations).total_seconds()
+
+
+def make_incremental_model(trainer, estimator, n_jobs):
+    is_classifier = hasattr(trainer, "CLASSES")
+    if estimator is None:
+        estimator = "sgd" if is_classifier else "forest"
+
+    if estimator == "forest":
+        if is_classifier:
+            # New trees on a chunk that lacks a class would disagree with
+            # the earlier trees about classes_, so forests stay regression-only
+            raise ValueError("forest streaming supports regression models only; use --estimator sgd")
+        return RandomForestRegressor(
+            n_estimators=0,
+            warm_start=True,
+            random_state=42,
+            n_jobs=n_jobs
+        )
+
+    model = SGDClassifier(random_state=42) if is_classifier else SGDRegressor(random_state=42)
+    return Pipeline([("scale", StandardScaler()), ("model", model)])
+
+
+def partial_fit(model, trainer, X, y, trees_per_chunk):
+    if isinstance(model, RandomForestRegressor):
+        model.n_estimators += trees_per_chunk
+        model.fit(X, y)
+        return
+
+    scaler = model.named_steps["scale"]
+    scaler.partial_fit(X)
+    X_scaled = scaler.transform(X)
+    if hasattr(trainer, "CLASSES"):
+        model.named_steps["model"].partial_fit(X_scaled, y, classes=trainer.CLASSES)
+    else:
+        model.named_steps["model"].partial_fit(X_scaled, y)
+
+
+def train_streaming(name, estimator=None, chunk_rows=200_000,
+                    trees_per_chunk=5, n_jobs=-1):
+    trainer = TRAINERS[name]
+    model = make_incremental_model(trainer, estimator, n_jobs)
+    split_row = int(count_rows() * 0.8)
+
+    # Running evaluation state (bounded memory)
+    abs_error = squared_error = 0.0
+    scored = 0
+    is_classifier = hasattr(trainer, "CLASSES")
+    if is_classifier:
+        matrix = np.zeros((len(trainer.CLASSES), len(trainer.CLASSES)), dtype=np.int64)
+
+    start = time.perf_counter()
+    chunks = 0
+    for data in iter_training_chunks(name, chunk_rows):
+        chunks += 1
+        train_rows = data.index < split_row
+        X = data[trainer.features]
+        y = data[trainer.TARGET]
+
+        if train_rows.any():
+            partial_fit(model, trainer, X[train_rows], y[train_rows], trees_per_chunk)
+
+        if (~train_rows).any():
+            y_test = y[~train_rows]
+            y_pred = model.predict(X[~train_rows])
+            if is_classifier:
+                matrix += confusion_matrix(y_test, y_pred, labels=trainer.CLASSES)
+            else:
+                errors = np.asarray(y_test, dtype=np.float64) - y_pred
+                abs_error += np.abs(errors).sum()
+                squared_error += (errors ** 2).sum()
+                scored += len(errors)
+
+    print(f"Streaming {name} ({type(model).__name__}): {chunks} chunks in {time.perf_counter() - start:.1f}s")
+    if is_classifier:
+        accuracy = np.trace(matrix) / max(matrix.sum(), 1)
+        print(f"Accuracy : {accuracy:.2f}")
+        print("Confusion Matrix:")
+        print(matrix)
+    elif scored:
+        print(f"MAE  : {abs_error / scored:.2f}")
+        print(f"RMSE : {np.sqrt(squared_error / scored):.2f}")
+    print(f"Peak memory: {format_mb(peak_rss_mb())}")
+    return model
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Train a model from time-ordered chunks in bounded memory."
+    )
+    parser.add_argument("model", choices=list(TRAINERS))
+    parser.add_argument("--estimator", choices=["forest", "sgd"])
+    parser.add_argument("--chunk-rows", type=int, default=200_000)
+    parser.add_argument("--trees-per-chunk", type=int, default=5)
+    parser.add_argument(
+        "--output",
+        help="Where to save the model (default: the model's usual path); its "
+             "compact artifact and feature meta go next to it"
+    )
+    args = parser.parse_args()
+
+    model = train_streaming(
+        args.model, args.estimator, args.chunk_rows, args.trees_per_chunk
+    )
+    output = args.output or TRAINERS[args.model].MODEL_PATH
+    joblib.dump(model, output)
+    print(f"Model saved to {output}")
+    if MAX_LAG.get(args.model):
+        # Lag spacing the model was trained on, for serving; like the
+        # compact artifact, it goes next to the saved model
+        write_feature_meta(
+            row_interval(args.chunk_rows),
+            os.path.join(os.path.dirname(output), os.path.basename(FEATURE_META_PATH)),
+        )
+    compact = export_compact(model, output)
+    if compact:
+        print("Compact artifact written to", compact)
@@ -1,30 +1,14 @@
-import pandas as pd
-from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestRegressor
+import argparse
 from sklearn.metrics import mean_absolute_error, mean_squared_error
 import joblib
 import numpy as np
 
-# -------------------------
-# Load dataset
-# -------------------------
-df = pd.read_csv("data/delhi_weather_pollution.csv")
+from compact_forest import export_compact
+from estimators import BACKENDS, make_estimator
+from features import lead_column, load_features
 
-# Convert timestamp and sort
-df["event_timestamp"] = pd.to_datetime(df["event_timestamp"])
-df = df.sort_values("event_timestamp")
+MODEL_PATH = "models/temperature_model.pkl"
 
-# -------------------------
-# Create LAG feature (real forecasting)
-# -------------------------
-df["temperature_next"] = df["temperature"].shift(-1)
-
-# Drop last row (no future value)
-df = df.dropna()
-
-# -------------------------
-# Select features and target
-# -------------------------
 features = [
     "humidity",
     "pressure",
@@ -36,45 +20,81 @@ features = [
     "co"
 ]
 
-X = df[features]
-y = df["temperature_next"]
+TARGET = lead_column("temperature", 1)
+
+# RandomForest settings; other backends use their defaults (src/estimators.py)
+FOREST_PARAMS = {"n_estimators": 50, "random_state": 42}
+
+
+def train(df, split_index=None, n_jobs=-1, backend="forest"):
+    """Train on a time-sorted feature frame (features.load_features);
+    rows with index < split_index train."""
+    # Rows with every feature and the target (the last row has no future
+    # value); a mask, so the frame is not copied by dropna()
+    complete = np.logical_and.reduce(
+        [df[column].notna().to_numpy() for column in features + [TARGET]]
+    )
+
+    # -------------------------
+    # Train-test split (time-based), sliced straight from df
+    # -------------------------
+    if split_index is None:
+        split_index = df.index[complete][int(complete.sum() * 0.8)]
+    before_split = df.index < split_index
+    train_rows = complete & before_split
+    test_rows = complete & ~before_split
+
+    X_train = df.loc[train_rows, features]
+    X_test  = df.loc[test_rows, features]
+
+    y_train = df.loc[train_rows, TARGET]
+    y_test  = df.loc[test_rows, TARGET]
+
+    # -------------------------
+    # Train model
+    # -------------------------
+    model = make_estimator(backend, "regressor", FOREST_PARAMS, n_jobs=n_jobs)
+
+    model.fit(X_train, y_train)
 
-# -------------------------
-# Train-test split (time-based)
-# -------------------------
-split_index = int(len(df) * 0.8)
+    # -------------------------
+    # Evaluate
+    # -------------------------
+    y_pred = model.predict(X_test)
 
-X_train = X.iloc[:split_index]
-X_test  = X.iloc[split_index:]
+    mae = mean_absolute_error(y_test, y_pred)
+    rmse = np.sqrt(mean_squared_error(y_test, y_pred))
 
-y_train = y.iloc[:split_index]
-y_test  = y.iloc[split_index:]
+    report = (
+        "Temperature Forecasting Model Trained!\n"
+        f"MAE: {round(mae, 2)}\n"
+        f"RMSE: {round(rmse, 2)}"
+    )
+    return model, report
 
-# -------------------------
-# Train model
-# -------------------------
-model = RandomForestRegressor(
-    n_estimators=50,
-    random_state=42,
-    n_jobs=-1
-)
 
-model.fit(X_train, y_train)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backend", choices=BACKENDS, default="forest",
+                        help="Estimator backend (see src/estimators.py)")
+    args = parser.parse_args()
 
-# -------------------------
-# Evaluate
-# -------------------------
-y_pred = model.predict(X_test)
+    # -------------------------
+    # Load the cached feature frame (built once, time-sorted)
+    # -------------------------
+    df = load_features(columns=features + [TARGET])
 
-mae = mean_absolute_error(y_test, y_pred)
-rmse = np.sqrt(mean_squared_error(y_test, y_pred))
+    model, report = train(df, backend=args.backend)
+    print(report)
 
-print("Temperature Forecasting Model Trained!")
-print("MAE:", round(mae, 2))
-print("RMSE:", round(rmse, 2))
+    # -------------------------
+    # Save model
+    # -------------------------
+    joblib.dump(model, MODEL_PATH)
+    print("Model saved successfully.")
 
-# -------------------------
-# Save model
-# -------------------------
-joblib.dump(model, "models/temperature_model.pkl")
-print("Model saved successfully.")
+    # Compact serving artifact (exact float64, full depth, memory-mappable);
+    # forests only, other backends are served from the .pkl
+    compact = export_compact(model, MODEL_PATH)
+    if compact:
+        print("Compact artifact written to", compact)
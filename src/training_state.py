@@ -0,0 +1,53 @@
+import json
+import os
+from datetime import datetime
+
+import pandas as pd
+
+# --------------------------------------------------
+# TRAINING STATE
+# --------------------------------------------------
+# A small JSON file next to each .pkl recording how far into the history
+# the model has been trained (the watermark: timestamp of the newest row
+# it was fitted on), plus a log of incremental updates. Written by
+# src/train_all_models.py and src/retrain_incremental.py.
+# held_out_through marks the end of train_all's held-out test rows: they
+# lie after the watermark, so the next update fits them (see
+# retrain_incremental.py).
+
+
+def state_path(model_path):
+    return os.path.splitext(model_path)[0] + ".state.json"
+
+
+def read_state(model_path):
+    """The state dict, or None for a model trained without one."""
+    try:
+        with open(state_path(model_path)) as f:
+            state = json.load(f)
+    except FileNotFoundError:
+        return None
+    state["watermark"] = pd.Timestamp(state["watermark"])
+    if state.get("held_out_through") is not None:
+        state["held_out_through"] = pd.Timestamp(state["held_out_through"])
+    return state
+
+
+def write_state(model_path, watermark, n_trees=None, updates=None,
+                held_out_through=None):
+    state = {
+        "watermark": pd.Timestamp(watermark).isoformat(),
+        "held_out_through": (
+            pd.Timestamp(held_out_through).isoformat()
+            if held_out_through is not None else None
+        ),
+        "trained_at": datetime.now().isoformat(timespec="seconds"),
+        "n_trees": n_trees,
+        "updates": updates or [],
+    }
+    path = state_path(model_path)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, path)
+    return state
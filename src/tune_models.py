@@ -0,0 +1,270 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import as_completed
+
+import numpy as np
+
+from sklearn.metrics import (
+    accuracy_score,
+    f1_score,
+    mean_absolute_error,
+    mean_squared_error,
+)
+from sklearn.model_selection import ParameterGrid, ParameterSampler, TimeSeriesSplit
+
+from data_store import dataset_fingerprint
+from estimators import BACKENDS, make_estimator
+from features import spec_hash
+from shared_memmap import ARRAYS, memmap_pool
+from train_all_models import TRAINERS, load_shared_frame
+
+# --------------------------------------------------
+# HYPERPARAMETER SEARCH WITH TIME-SERIES CROSS-VALIDATION
+# --------------------------------------------------
+# Scores candidate settings for one model on rolling-origin folds: each
+# fold trains on everything before a cut and tests on the block after it,
+# like TimeSeriesSplit, so no fold ever sees the future.
+#   - The feature matrix is written once as .npy and every worker process
+#     memory-maps it: the OS shares one copy of the pages, and the
+#     contiguous fold ranges are sliced as views, not copied.
+#   - Folds are computed once as (start, stop) row bounds, so a task
+#     carries four integers instead of pickled index arrays.
+#   - Each (candidate, fold) is a separate task, so all cores stay busy.
+#   - Scores are cached per (dataset, features, folds, base estimator
+#     settings, params): re-runs and widened grids only evaluate
+#     candidates not seen before.
+# The holdout tail (the last 20%, the scripts' test period) is never used
+# for tuning.
+#   python src/tune_models.py pm25 [--backend hgb] [--n-candidates 20]
+RESULTS_PATH = "data/tuning/results.jsonl"
+
+SEARCH_SPACES = {
+    "forest": {
+        "n_estimators": [50, 100, 200],
+        "max_depth": [None, 12, 20],
+        "min_samples_leaf": [1, 5, 20],
+        "max_features": [1.0, 0.5, "sqrt"],
+    },
+    "hgb": {
+        "learning_rate": [0.05, 0.1, 0.2],
+        "max_leaf_nodes": [31, 63, 127],
+        "min_samples_leaf": [20, 100],
+        "l2_regularization": [0.0, 1.0],
+    },
+    "lightgbm": {
+        "learning_rate": [0.05, 0.1, 0.2],
+        "num_leaves": [31, 63, 127],
+        "min_child_samples": [20, 100],
+        "reg_lambda": [0.0, 1.0],
+    },
+}
+
+# Metric to rank candidates by: (name, higher is better)
+PRIMARY_METRIC = {"regressor": ("mae", False), "classifier": ("f1_macro", True)}
+
+
+# --------------------------------------------------
+# Folds
+# --------------------------------------------------
+def rolling_folds(n_rows, n_splits=5, gap=0):
+    """((train_start, train_stop), (test_start, test_stop)) per fold,
+    oldest cut first. Rolling-origin folds are contiguous, so bounds
+    describe them fully, and slicing a memmap with them is a view."""
+    return [
+        ((int(train[0]), int(train[-1]) + 1), (int(test[0]), int(test[-1]) + 1))
+        for train, test in TimeSeriesSplit(n_splits=n_splits, gap=gap).split(
+            np.empty((n_rows, 1))
+        )
+    ]
+
+
+# --------------------------------------------------
+# Worker side (one per process, arrays from shared_memmap.py)
+# --------------------------------------------------
+def score(task, y_true, y_pred):
+    if task == "classifier":
+        return {
+            "accuracy": float(accuracy_score(y_true, y_pred)),
+            "f1_macro": float(f1_score(y_true, y_pred, average="macro", zero_division=0)),
+        }
+    return {
+        "mae": float(mean_absolute_error(y_true, y_pred)),
+        "rmse": float(np.sqrt(mean_squared_error(y_true, y_pred))),
+    }
+
+
+def _evaluate(task, backend, forest_params, params, train_bounds, test_bounds):
+    X, y = ARRAYS["X"], ARRAYS["y"]
+    train, test = slice(*train_bounds), slice(*test_bounds)
+
+    model = make_estimator(backend, task, forest_params, n_jobs=1, params=params)
+    start = time.perf_counter()
+    model.fit(X[train], y[train])
+    fit_seconds = time.perf_counter() - start
+
+    scores = score(task, y[test], model.predict(X[test]))
+    scores["fit_seconds"] = fit_seconds
+    return scores
+
+
+# --------------------------------------------------
+# Results cache
+# --------------------------------------------------
+def result_key(context, params):
+    payload = json.dumps({**context, "params": params}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def load_results(path=RESULTS_PATH):
+    results = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            for line in f:
+                record = json.loads(line)
+                results[record["key"]] = record
+    return results
+
+
+def append_result(record, path=RESULTS_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a") as f:
+        f.write(json.dumps(record, default=str) + "\n")
+
+
+# --------------------------------------------------
+# Search
+# --------------------------------------------------
+def candidates(backend, n_candidates=None, seed=42):
+    space = SEARCH_SPACES[backend]
+    grid = ParameterGrid(space)
+    if n_candidates is None or n_candidates >= len(grid):
+        return list(grid)
+    return list(ParameterSampler(space, n_candidates, random_state=seed))
+
+
+def tune(name, backend="forest", n_candidates=None, n_splits=5, gap=0,
+         holdout=0.2, workers=None, results_path=RESULTS_PATH):
+    trainer = TRAINERS[name]
+    task = "classifier" if hasattr(trainer, "CLASSES") else "regressor"
+    metric, higher_is_better = PRIMARY_METRIC[task]
+
+    # --------------------------------------------------
+    # 1. Feature matrix: complete rows before the holdout, time-sorted
+    # --------------------------------------------------
+    df = load_shared_frame({name: trainer})
+    df = df.iloc[:int(len(df) * (1 - holdout))]
+    complete = np.logical_and.reduce(
+        [df[column].notna().to_numpy() for column in trainer.features + [trainer.TARGET]]
+    )
+    X = df.loc[complete, trainer.features].to_numpy(dtype=np.float32)
+    y = df.loc[complete, trainer.TARGET].to_numpy()
+    del df
+
+    folds = rolling_folds(len(X), n_splits, gap)
+
+    # --------------------------------------------------
+    # 2. Skip candidates already scored on this data and these folds
+    # --------------------------------------------------
+    context = {
+        "dataset": dataset_fingerprint(),
+        "features_spec": spec_hash(),
+        "model": name,
+        "features": trainer.features,
+        "target": trainer.TARGET,
+        "backend": backend,
+        # The settings candidates are layered on (the script's
+        # FOREST_PARAMS, the backend defaults): changing them invalidates
+        "base_params": make_estimator(
+            backend, task, trainer.FOREST_PARAMS, n_jobs=1
+        ).get_params(),
+        "rows": len(X),
+        "n_splits": n_splits,
+        "gap": gap,
+    }
+    cached = load_results(results_path)
+    results, pending = [], []
+    for params in candidates(backend, n_candidates):
+        key = result_key(context, params)
+        if key in cached:
+            results.append(cached[key])
+        else:
+            pending.append((key, params))
+    print(f"{name} ({backend}): {len(X)} rows, {n_splits} folds, "
+          f"{len(results)} cached / {len(pending)} to evaluate")
+
+    # --------------------------------------------------
+    # 3. Evaluate (candidate, fold) tasks in a process pool
+    # --------------------------------------------------
+    if pending:
+        workers = workers or os.cpu_count() or 1
+        start = time.perf_counter()
+        fold_scores = {key: [None] * len(folds) for key, _ in pending}
+        with memmap_pool(workers, X=X, y=y) as pool:
+            del X, y
+            futures = {
+                pool.submit(
+                    _evaluate, task, backend, trainer.FOREST_PARAMS,
+                    params, train_bounds, test_bounds,
+                ): (key, i)
+                for key, params in pending
+                for i, (train_bounds, test_bounds) in enumerate(folds)
+            }
+            for future in as_completed(futures):
+                key, i = futures[future]
+                fold_scores[key][i] = future.result()
+
+        for key, params in pending:
+            scores = fold_scores[key]
+            record = {
+                "key": key, **context, "params": params,
+                "folds": scores,
+                "mean": {
+                    m: float(np.mean([s[m] for s in scores])) for m in scores[0]
+                },
+                "std": {
+                    m: float(np.std([s[m] for s in scores])) for m in scores[0]
+                },
+            }
+            append_result(record, results_path)
+            results.append(record)
+        print(f"Evaluated {len(pending) * len(folds)} fits in "
+              f"{time.perf_counter() - start:.1f}s with {workers} workers")
+
+    results.sort(key=lambda r: r["mean"][metric], reverse=higher_is_better)
+    return results, metric
+
+
+def print_results(results, metric, top=10):
+    print(f"\n{'rank':<6}{metric:>10}{'± std':>9}{'fit s':>8}   params")
+    for rank, r in enumerate(results[:top], 1):
+        print(f"{rank:<6}{r['mean'][metric]:>10.3f}{r['std'][metric]:>9.3f}"
+              f"{r['mean']['fit_seconds']:>8.1f}   {json.dumps(r['params'])}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Time-series cross-validated hyperparameter search."
+    )
+    parser.add_argument("model", choices=list(TRAINERS))
+    parser.add_argument("--backend", choices=BACKENDS, default="forest")
+    parser.add_argument(
+        "--n-candidates", type=int,
+        help="Random sample of the grid (default: the full grid)"
+    )
+    parser.add_argument("--splits", type=int, default=5, help="Rolling-origin folds")
+    parser.add_argument(
+        "--gap", type=int, default=0,
+        help="Rows skipped between each fold's train and test block"
+    )
+    parser.add_argument("--workers", type=int, help="Worker processes (default: one per core)")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    results, metric = tune(
+        args.model, args.backend, args.n_candidates, args.splits, args.gap,
+        workers=args.workers,
+    )
+    print_results(results, metric, args.top)
@@ -0,0 +1,78 @@
+import os
+
+import numpy as np
+import pytest
+
+from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+
+import compact_forest
+from compact_forest import CompactForest
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(2_000, 6)).astype(np.float32)
+    y = X[:, 0] * 3 + np.sin(X[:, 1]) + rng.normal(0, 0.1, len(X))
+    return X, y
+
+
+@pytest.fixture(scope="module")
+def forests(data):
+    X, y = data
+    regressor = RandomForestRegressor(n_estimators=20, random_state=0, n_jobs=1).fit(X, y)
+    classifier = RandomForestClassifier(n_estimators=20, random_state=0, n_jobs=1).fit(
+        X, np.digitize(y, [-1, 1])
+    )
+    return regressor, classifier
+
+
+@pytest.mark.parametrize("engine", ["numpy", "numba"])
+def test_exact_evaluator_is_identical_to_sklearn(data, forests, engine, monkeypatch):
+    if engine == "numba":
+        pytest.importorskip("numba")
+    monkeypatch.setattr(compact_forest, "ENGINE", engine)
+    X, _ = data
+    regressor, classifier = forests
+
+    for rows in (X[:1], X):
+        compact = CompactForest.from_sklearn(regressor, exact=True)
+        assert np.array_equal(compact.predict(rows), regressor.predict(rows))
+
+        compact = CompactForest.from_sklearn(classifier, exact=True)
+        assert np.array_equal(compact.predict_proba(rows), classifier.predict_proba(rows))
+        assert np.array_equal(compact.predict(rows), classifier.predict(rows))
+
+
+def test_saved_artifact_round_trips(data, forests, tmp_path):
+    X, _ = data
+    regressor, _ = forests
+    path = compact_forest.export_compact(regressor, str(tmp_path / "m.pkl"),
+                                         path=str(tmp_path / "compact"))
+    assert np.array_equal(CompactForest.load(path).predict(X), regressor.predict(X))
+
+
+def test_large_batches_go_to_sklearn(data, forests):
+    X, _ = data
+    regressor, _ = forests
+    loads = []
+    served = compact_forest.DispatchedForest(
+        CompactForest.from_sklearn(regressor, exact=True),
+        load=lambda: loads.append(1) or regressor,
+        max_rows=100,
+    )
+
+    assert np.array_equal(served.predict(X[:100]), regressor.predict(X[:100]))
+    assert loads == []  # small batches never unpickle the forest
+    assert np.array_equal(served.predict(X), regressor.predict(X))
+    served.predict(X)
+    assert loads == [1]
+
+
+def test_artifact_lives_next_to_its_model():
+    assert compact_forest.compact_path("models/pm25_model.pkl") == os.path.join(
+        "models", "compact", "pm25_model"
+    )
+    assert compact_forest.compact_path("/tmp/runs/pm25_model.pkl") == os.path.join(
+        "/tmp/runs", "compact", "pm25_model"
+    )
@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from sklearn.ensemble import RandomForestRegressor
+
+import model_registry
+from feature_store import OnlineFeatureStore
+from features import build_features, lag_columns, sampling_step
+from inference import predict_one
+from observation_store import ObservationStore
+from synthetic_data import generate
+
+INTERVAL = 3600.0
+FEATURES = ["temperature", "humidity", "pressure", "wind_speed", *lag_columns("pm25")]
+
+
+def reading(pm25, pm10=None):
+    return {
+        "temperature": 15.0, "humidity": 80.0, "pressure": 1015.0,
+        "wind_speed": 1.0, "pm25": pm25, "pm10": pm10 if pm10 is not None else pm25 * 1.5,
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    return OnlineFeatureStore(ObservationStore(str(tmp_path / "obs.sqlite")), interval=INTERVAL)
+
+
+def test_training_lags_stay_within_a_station():
+    hours = pd.date_range("2024-01-01", periods=4, freq="h")
+    df = pd.DataFrame({
+        "event_timestamp": hours.repeat(2),
+        "station": pd.Categorical(["a", "b"] * 4),
+        # Station b reads 100 more than a, so a crossed lag is visible
+        "pm25": [0.0, 100.0, 1.0, 101.0, 2.0, 102.0, 3.0, 103.0],
+    })
+    features = build_features(df)
+
+    assert features["pm25_lag_1"].tolist()[2:] == [0.0, 100.0, 1.0, 101.0, 2.0, 102.0]
+    assert features["pm25_lag_2"].tolist()[4:] == [0.0, 100.0, 1.0, 101.0]
+    assert features["pm25_roll_mean_3"].tolist()[6:] == [1.0, 101.0]
+
+
+def test_lags_are_one_row_interval_apart(store):
+    start = 1_700_000_000.0
+    # Polled every 5 minutes for two hours; PM2.5 counts the polls
+    for i in range(25):
+        store.update("a", reading(float(i)), start + i * 300)
+
+    row = store.features("a", reading(24.0), start + 24 * 300)
+    assert row["pm25_lag_1"] == 12.0  # one hour (12 polls) earlier
+    assert row["pm25_lag_2"] == 0.0
+
+
+def test_rewritten_readings_are_stored_once(tmp_path):
+    history = ObservationStore(str(tmp_path / "obs.sqlite"))
+    fetched_at = 1_700_000_000.0
+    # Every rerun sees the same snapshot entry until the next poll
+    for _ in range(3):
+        history.append("a", reading(118.0), fetched_at)
+    history.append("a", reading(120.0), fetched_at + INTERVAL)
+
+    rows = history.query("a", start=fetched_at - 1)
+    assert rows["pm25"].tolist() == [118.0, 120.0]
+
+
+def test_store_without_a_trained_interval_serves_no_lags(tmp_path, monkeypatch):
+    monkeypatch.setattr("feature_store.read_row_interval", lambda: None)
+    store = OnlineFeatureStore(ObservationStore(str(tmp_path / "obs.sqlite")))
+
+    row = store.features("a", reading(50.0), 1_700_000_000.0)
+    assert row == reading(50.0)
+
+
+def test_current_pm_reading_changes_the_forecast(tmp_path, monkeypatch):
+    raw = generate(5_000)
+    # Serve lags at the spacing the model is trained on (10-minute rows)
+    interval = sampling_step(raw).total_seconds()
+    store = OnlineFeatureStore(ObservationStore(str(tmp_path / "obs.sqlite")), interval=interval)
+
+    df = build_features(raw).dropna(subset=FEATURES + ["pm25"])
+    model = RandomForestRegressor(n_estimators=20, random_state=0)
+    model.fit(df[FEATURES].astype(np.float32), df["pm25"])
+    monkeypatch.setitem(model_registry._models, "pm25", model)
+
+    start = 1_700_000_000.0
+    store.update("a", reading(120.0), start)
+    store.update("a", reading(120.0), start + interval)
+
+    predictions = {
+        pm25: predict_one(
+            store.features("a", reading(pm25), start + 2 * interval),
+            outputs=["pm25_pred"],
+        )["pm25_pred"]
+        for pm25 in (50.0, 150.0, 400.0)
+    }
+    assert predictions[50.0] < predictions[150.0] < predictions[400.0]
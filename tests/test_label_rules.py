@@ -0,0 +1,106 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmark_labels import extreme_event, is_fog, pollution_risk
+from label_rules import LABEL_RULES, evaluate, evaluate_one
+from labels import extreme_event_label, fog_label, pollution_risk_label
+
+
+# Row-wise rules the compiled ones replaced: the training labels are in
+# benchmark_labels.py, the dashboard's if/elif chains (app.py) are here
+def air_quality(row):
+    if row["pm25"] < 50:
+        return "Good"
+    elif row["pm25"] < 100:
+        return "Moderate"
+    elif row["pm25"] < 200:
+        return "Poor"
+    return "Severe"
+
+
+def comfort(row):
+    comfort = "Comfortable"
+    if row["humidity"] > 80:
+        comfort = "Humid"
+    elif row["temperature"] > 30:
+        comfort = "Hot"
+    return comfort
+
+
+DASHBOARD = {
+    "air_quality": air_quality,
+    "comfort": comfort,
+    "health_risk": lambda row: (
+        "High" if row["pm25"] > 150 else "Medium" if row["pm25"] > 75 else "Low"
+    ),
+    "pm25_level": lambda row: (
+        "Low" if row["pm25"] < 50 else "Moderate" if row["pm25"] < 100 else "High"
+    ),
+    "pm10_level": lambda row: (
+        "Low" if row["pm10"] < 50 else "Moderate" if row["pm10"] < 100 else "High"
+    ),
+    "temperature_trend": lambda row: (
+        "Warm" if row["temperature"] > 28 else "Cool" if row["temperature"] < 20 else "Normal"
+    ),
+    "wind_level": lambda row: (
+        "Breeze" if row["wind_speed"] < 5 else "Moderate" if row["wind_speed"] < 10 else "Strong"
+    ),
+    "wind_alert": lambda row: (
+        "Normal" if row["wind_speed"] < 10 else "High" if row["wind_speed"] < 20 else "Severe"
+    ),
+    "pressure_level": lambda row: (
+        "Normal" if 1010 < row["pressure"] < 1020
+        else "High" if row["pressure"] >= 1020 else "Low"
+    ),
+    "heat_stress": lambda row: 1 if row["temperature"] > 35 else 0,
+}
+
+
+def edge_values(column):
+    """Every threshold in the rules for column, a step either side, NaN."""
+    edges = set()
+    for spec in LABEL_RULES.values():
+        if spec.get("column") == column:
+            edges.update(spec["edges"])
+        conditions = spec.get("conditions", []) + [
+            c for _, conds in spec.get("rules", []) for c in conds
+        ]
+        edges.update(t for name, _, t in conditions if name == column)
+    values = sorted({v + d for v in edges for d in (-0.5, 0, 0.5)})
+    return values + [np.nan]
+
+
+@pytest.fixture(scope="module")
+def frame():
+    # Every combination of edge values for the columns the fog rule
+    # crosses, then each other column swept through its own edges
+    crossed = ["temperature", "humidity", "wind_speed", "pm25"]
+    rows = pd.DataFrame(
+        list(itertools.product(*(edge_values(c) for c in crossed))), columns=crossed
+    )
+    rows["pressure"] = np.resize(edge_values("pressure"), len(rows))
+    rows["pm10"] = np.resize(edge_values("pm10"), len(rows))
+    return rows.astype(np.float32)
+
+
+def test_training_labels_match_the_row_wise_rules(frame):
+    df = frame.assign(fog=fog_label(frame))
+    assert fog_label(frame).tolist() == frame.apply(is_fog, axis=1).tolist()
+    assert extreme_event_label(df).tolist() == df.apply(extreme_event, axis=1).tolist()
+    assert (
+        pollution_risk_label(frame["pm25"]).tolist()
+        == frame["pm25"].apply(pollution_risk).tolist()
+    )
+
+
+@pytest.mark.parametrize("name", list(DASHBOARD))
+def test_dashboard_labels_match_the_row_wise_rules(frame, name):
+    expected = frame.apply(DASHBOARD[name], axis=1)
+    assert evaluate(name, frame).tolist() == expected.tolist()
+
+    # The single-observation path gives the same answers
+    for row in frame.sample(50, random_state=0).to_dict("records"):
+        assert evaluate_one(name, row) == DASHBOARD[name](row)
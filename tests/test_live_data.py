@@ -0,0 +1,94 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+import live_data
+import live_poller
+from live_data import ObservationCache
+from locations import STATIONS
+from observation_store import ObservationStore
+from stub_openweather_server import serve
+
+
+@pytest.fixture
+def stub(request, monkeypatch):
+    """The stub provider on a free port, and an empty observation cache;
+    parametrize indirectly with the number of requests that fail first."""
+    server = serve(port=0, fail_first=getattr(request, "param", 0))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(
+        live_data, "OPENWEATHER_BASE_URL", f"http://127.0.0.1:{server.server_address[1]}"
+    )
+    cache = ObservationCache(ttl=60)
+    monkeypatch.setattr(live_data, "OBSERVATIONS", cache)
+    monkeypatch.setattr(live_poller, "OBSERVATIONS", cache)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_poller_skips_locations_fresh_in_the_cache(stub, tmp_path):
+    path = str(tmp_path / "snapshot.json")
+    store = ObservationStore(str(tmp_path / "history.sqlite"))
+    locations = STATIONS[:3]
+
+    live_poller.poll_once(locations, "stub", path, store)
+    assert stub.requests == 2 * len(locations)  # /weather + /air_pollution
+    first = live_poller.read_snapshot(path)
+
+    live_poller.poll_once(locations, "stub", path, store)
+    assert stub.requests == 2 * len(locations)
+    assert live_poller.read_snapshot(path)["locations"] == first["locations"]
+
+    live_poller.poll_once(locations, "stub", path, store, ttl=0)
+    assert stub.requests == 4 * len(locations)
+
+
+def test_one_provider_fetch_per_ttl_window(stub):
+    live_data.OBSERVATIONS.ttl = 0.5
+    point = (STATIONS[0].lat, STATIONS[0].lon)
+
+    # Concurrent misses for one coordinate share a single fetch
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda _: live_data.fetch_observation(*point, "stub"), range(8)))
+    live_data.fetch_observation(*point, "stub")
+    assert stub.requests == 2
+
+    time.sleep(0.6)
+    live_data.fetch_observation(*point, "stub")
+    assert stub.requests == 4
+
+
+@pytest.fixture
+def backoff(monkeypatch):
+    """Records the backoff delays instead of sleeping through them."""
+    delays = []
+    sleep = asyncio.sleep
+
+    async def record(seconds):
+        delays.append(seconds)
+        await sleep(0)
+
+    monkeypatch.setattr(live_data.asyncio, "sleep", record)
+    return delays
+
+
+@pytest.mark.parametrize("stub", [2], indirect=True)
+def test_transient_failures_are_retried(stub, backoff):
+    url = f"{live_data.OPENWEATHER_BASE_URL}/weather"
+    assert asyncio.run(live_data.get_json(url, {}))["main"]["temp"] == 24.5
+    assert stub.requests == 3
+    assert backoff == [live_data.BACKOFF_SECONDS, 2 * live_data.BACKOFF_SECONDS]
+
+
+@pytest.mark.parametrize("stub", [100], indirect=True)
+def test_retries_give_up_after_max_retries(stub, backoff):
+    url = f"{live_data.OPENWEATHER_BASE_URL}/weather"
+    with pytest.raises(requests.HTTPError, match="503"):
+        asyncio.run(live_data.get_json(url, {}))
+    assert stub.requests == live_data.MAX_RETRIES + 1
+    assert len(backoff) == live_data.MAX_RETRIES
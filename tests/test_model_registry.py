@@ -0,0 +1,66 @@
+import gc
+import os
+import weakref
+
+import joblib
+import numpy as np
+import pytest
+
+from sklearn.ensemble import RandomForestRegressor
+
+import model_registry
+from compact_forest import CompactForest, compact_path, export_compact
+
+NAME = "pm25"
+
+
+@pytest.fixture
+def pickled(tmp_path, monkeypatch):
+    """A forest saved as a .pkl only, and an empty registry."""
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("models")
+    monkeypatch.setattr(model_registry, "_models", {})
+    monkeypatch.setattr(model_registry, "_stats", {})
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(5_000, 6)).astype(np.float32)
+    model = RandomForestRegressor(n_estimators=20, random_state=0, n_jobs=1)
+    model.fit(X, X[:, 0] + rng.normal(0, 1, len(X)))
+    path = model_registry.MODEL_PATHS[NAME]
+    joblib.dump(model, path)
+    return model, path, X
+
+
+def test_pickle_only_forest_keeps_one_copy(pickled, monkeypatch):
+    _, _, X = pickled
+    loaded, unpickle = [], joblib.load
+
+    def load(path):
+        model = unpickle(path)
+        loaded.append(weakref.ref(model))
+        return model
+
+    monkeypatch.setattr(model_registry.joblib, "load", load)
+    served = model_registry.get_model(NAME)
+    gc.collect()
+
+    # Only the flattened copy stays resident: the unpickled forest is freed
+    assert len(loaded) == 1 and loaded[0]() is None
+    assert isinstance(served, CompactForest)
+    assert served.predict(X[:5]).shape == (5,)
+
+
+def test_health_reports_the_served_artifact(pickled):
+    model, path, X = pickled
+    export_compact(model, path)
+    compact = compact_path(path)
+
+    served = model_registry.get_model(NAME)
+    served.predict(X[:1])
+    assert served.forest is None  # no large batch yet: .pkl not unpickled
+
+    entry = next(e for e in model_registry.health() if e["model"] == NAME)
+    assert entry["format"].startswith("compact")
+    assert entry["file_mb"] == round(
+        model_registry._size_bytes(compact) / (1024 * 1024), 1
+    )
+    assert entry["file_mb"] < round(os.path.getsize(path) / (1024 * 1024), 1)
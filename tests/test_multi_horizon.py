@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_store import TIMESTAMP_COLUMN
+from multi_horizon import (
+    MultiHorizonForecaster, horizon_targets, sampling_step, split_rows,
+)
+
+
+def readings(station, timestamps, offset):
+    timestamps = pd.DatetimeIndex(timestamps)
+    return pd.DataFrame({
+        "station": station,
+        TIMESTAMP_COLUMN: timestamps,
+        # Value encodes station and hour, so a mismatch is visible
+        "pm25": offset + (timestamps - timestamps[0]) / pd.Timedelta(hours=1),
+    })
+
+
+def test_targets_are_matched_by_time_and_station():
+    hours = pd.date_range("2024-01-01", periods=6, freq="h")
+    df = pd.concat([
+        readings("a", hours, 0),
+        readings("b", hours.delete(2), 100),  # b misses 02:00
+    ]).sort_values(TIMESTAMP_COLUMN, kind="stable", ignore_index=True)
+
+    y = horizon_targets(df, ["pm25"], [1], by=["station"])["pm25_1h"]
+
+    expected = np.where(
+        (df[TIMESTAMP_COLUMN] + pd.Timedelta(hours=1) > hours[-1])
+        | ((df["station"] == "b") & (df[TIMESTAMP_COLUMN] == hours[1])),
+        np.nan, df["pm25"] + 1,
+    )
+    np.testing.assert_array_equal(y.to_numpy(), expected)
+
+
+def test_repeated_timestamps_need_a_station_column():
+    hours = pd.date_range("2024-01-01", periods=4, freq="h")
+    df = pd.concat([readings("a", hours, 0), readings("b", hours, 100)])
+    with pytest.raises(ValueError, match="station"):
+        sampling_step(df)
+    with pytest.raises(ValueError, match="sampling step"):
+        sampling_step(df.iloc[:1])
+
+
+def test_training_targets_stop_before_the_test_period():
+    hours = pd.date_range("2024-01-01", periods=100, freq="h")
+    df = pd.concat([readings("a", hours, 0), readings("b", hours, 0)]).sort_values(
+        TIMESTAMP_COLUMN, kind="stable", ignore_index=True
+    )
+    forecaster = MultiHorizonForecaster(targets=["pm25"], horizons=[1, 6])
+    forecaster.step = sampling_step(df, ["station"])
+    Y = pd.DataFrame(horizon_targets(df, ["pm25"], forecaster.horizons, ["station"]))
+
+    train, test = split_rows(df[TIMESTAMP_COLUMN], forecaster)
+    first_test = df.loc[test, TIMESTAMP_COLUMN].min()
+    # pm25 encodes the hour of the reading a target was taken from
+    read_at = hours[0] + pd.to_timedelta(Y[train].stack(), unit="h")
+    assert train.any() and (read_at < first_test).all()
+    # Only the rows whose targets reach the test period are left out
+    assert df.loc[train, TIMESTAMP_COLUMN].max() == first_test - pd.Timedelta(hours=7)
@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+
+import prediction_cache
+from prediction_cache import PredictionCache, quantize
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def scored(monkeypatch):
+    """Fake models: each call is recorded, versions are set per model."""
+    calls, versions, clock = [], {}, Clock()
+
+    def predict_one(scenario, outputs=None):
+        calls.append(dict(scenario))
+        return {"pm25_pred": scenario["pm25"] * 2}
+
+    monkeypatch.setattr(prediction_cache, "predict_one", predict_one)
+    monkeypatch.setattr(prediction_cache, "model_version", lambda name: versions.get(name, 1.0))
+    monkeypatch.setattr(prediction_cache, "time", clock)
+    return calls, versions, clock
+
+
+def scenario(**values):
+    return {"temperature": 25.0, "pm25": 120.0, "pm25_lag_1": 110.0, **values}
+
+
+def test_quantize_snaps_to_the_slider_step():
+    assert quantize(24.999999, 0.5) == 25.0
+    assert quantize(25.26, 0.5) == 25.5
+    assert quantize(0.1 * 3, 0.1) == 0.3
+    assert quantize(np.float32(117.6), 5.0) == 120.0
+
+
+def test_nearby_inputs_share_an_entry_and_misses_use_quantized_inputs(scored):
+    calls, _, _ = scored
+    cache = PredictionCache()
+
+    first = cache.predict_one(scenario(temperature=24.999999, pm25=121.0), ["pm25_pred"])
+    second = cache.predict_one(scenario(temperature=25.0, pm25=np.float64(119.0)), ["pm25_pred"])
+
+    assert first == second == {"pm25_pred": 240.0}
+    assert calls == [scenario()]
+    assert cache.stats()["hits"] == 1
+
+    # Non-slider features are keyed as given; NaN matches NaN
+    cache.predict_one(scenario(pm25_lag_1=111.0), ["pm25_pred"])
+    cache.predict_one(scenario(pm25_lag_1=np.nan), ["pm25_pred"])
+    cache.predict_one(scenario(pm25_lag_1=float("nan")), ["pm25_pred"])
+    assert len(calls) == 3
+    assert calls[2]["pm25_lag_1"] is None
+
+
+def test_new_model_version_invalidates(scored):
+    calls, versions, _ = scored
+    cache = PredictionCache()
+
+    cache.predict_one(scenario(), ["pm25_pred"])
+    versions["pm10"] = 2.0  # a model the request does not use
+    cache.predict_one(scenario(), ["pm25_pred"])
+    assert len(calls) == 1
+
+    versions["pm25"] = 2.0  # the serving model was reloaded from a newer file
+    cache.predict_one(scenario(), ["pm25_pred"])
+    assert len(calls) == 2
+
+
+def test_entries_expire_after_the_ttl(scored):
+    calls, _, clock = scored
+    cache = PredictionCache(ttl=60)
+
+    cache.predict_one(scenario(), ["pm25_pred"])
+    clock.now += 59
+    cache.predict_one(scenario(), ["pm25_pred"])
+    assert len(calls) == 1
+
+    clock.now += 1
+    cache.predict_one(scenario(), ["pm25_pred"])
+    assert len(calls) == 2
+    assert cache.stats()["expirations"] == 1
+
+
+def test_least_recently_used_entry_is_evicted(scored):
+    calls, _, _ = scored
+    cache = PredictionCache(max_entries=2)
+
+    cache.predict_one(scenario(pm25=100.0), ["pm25_pred"])
+    cache.predict_one(scenario(pm25=200.0), ["pm25_pred"])
+    cache.predict_one(scenario(pm25=100.0), ["pm25_pred"])  # now most recent
+    cache.predict_one(scenario(pm25=300.0), ["pm25_pred"])  # evicts 200
+
+    stats = cache.stats()
+    assert stats["entries"] == 2 and stats["evictions"] == 1
+    cache.predict_one(scenario(pm25=100.0), ["pm25_pred"])
+    assert len(calls) == 3
+    cache.predict_one(scenario(pm25=200.0), ["pm25_pred"])
+    assert len(calls) == 4
@@ -0,0 +1,20 @@
+import logging
+
+from profiling import LatencyTracker
+
+
+def test_samples_log_at_debug_and_summaries_at_info(caplog):
+    tracker = LatencyTracker(log_every=10)
+    with caplog.at_level(logging.INFO, logger="delhi_weather.latency"):
+        for _ in range(25):
+            tracker.record("predict", 0.002)
+    assert len(caplog.records) == 2
+    assert all(r.levelno == logging.INFO for r in caplog.records)
+    assert "n=20" in caplog.records[-1].getMessage()
+
+    caplog.clear()
+    with caplog.at_level(logging.DEBUG, logger="delhi_weather.latency"):
+        for _ in range(5):
+            tracker.record("predict", 0.002)
+    assert [r.levelno for r in caplog.records] == [logging.DEBUG] * 4 + [logging.INFO]
+    assert tracker.summary()[0]["calls"] == 30
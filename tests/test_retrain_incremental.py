@@ -0,0 +1,93 @@
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+from sklearn.ensemble import RandomForestClassifier
+
+from compact_forest import compact_path, export_compact
+from data_store import TIMESTAMP_COLUMN
+from retrain_incremental import update_model
+from train_all_models import TRAINERS
+from training_state import read_state, write_state
+
+NAME = "extreme_pollution"
+
+
+def frame(rows, start, classes, seed):
+    trainer = TRAINERS[NAME]
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(
+        rng.normal(size=(rows, len(trainer.features))).astype(np.float32),
+        columns=trainer.features,
+    )
+    df[trainer.TARGET] = rng.choice(classes, rows).astype("int8")
+    df[TIMESTAMP_COLUMN] = pd.date_range(start, periods=rows, freq="h")
+    return df
+
+
+@pytest.fixture
+def trained(tmp_path, monkeypatch):
+    """A classifier trained on classes 0 and 1 only, with a watermark."""
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("models")
+    trainer = TRAINERS[NAME]
+    history = frame(500, "2024-01-01", [0, 1], seed=0)
+    model = RandomForestClassifier(n_estimators=10, random_state=0)
+    model.fit(history[trainer.features], history[trainer.TARGET])
+    joblib.dump(model, trainer.MODEL_PATH)
+    export_compact(model, trainer.MODEL_PATH)
+    write_state(trainer.MODEL_PATH, history[TIMESTAMP_COLUMN].iloc[-1], 10)
+    return trainer, history
+
+
+def snapshot(trainer):
+    meta = os.path.join(compact_path(trainer.MODEL_PATH), "meta.json")
+    with open(trainer.MODEL_PATH, "rb") as f, open(meta) as m:
+        return f.read(), m.read()
+
+
+def test_new_class_skips_the_update(trained):
+    trainer, history = trained
+    before = snapshot(trainer)
+
+    delta = frame(300, history[TIMESTAMP_COLUMN].iloc[-1] + pd.Timedelta(hours=1),
+                  [0, 1, 2], seed=1)
+    status = update_model(NAME, pd.concat([history, delta], ignore_index=True))
+
+    assert status.startswith("skipped")
+    assert snapshot(trainer) == before
+    joblib.load(trainer.MODEL_PATH).predict_proba(delta[trainer.features])
+
+
+def test_same_classes_update_both_artifacts(trained):
+    trainer, history = trained
+    before = snapshot(trainer)
+
+    delta = frame(300, history[TIMESTAMP_COLUMN].iloc[-1] + pd.Timedelta(hours=1),
+                  [0, 1], seed=1)
+    status = update_model(NAME, pd.concat([history, delta], ignore_index=True),
+                          trees=5, max_trees=10)
+
+    assert not status.startswith("skipped"), status
+    after = snapshot(trainer)
+    assert after[0] != before[0] and after[1] != before[1]
+    assert not os.path.exists(f"{compact_path(trainer.MODEL_PATH)}.tmp")
+    assert len(joblib.load(trainer.MODEL_PATH).estimators_) == 10
+
+
+def test_missing_rare_class_is_sampled_from_history(trained):
+    trainer, history = trained
+
+    # Twelve days of new rows without a single class-1 row
+    delta = frame(300, history[TIMESTAMP_COLUMN].iloc[-1] + pd.Timedelta(hours=1),
+                  [0], seed=1)
+    status = update_model(NAME, pd.concat([history, delta], ignore_index=True),
+                          trees=5, max_trees=10, lookback="0h")
+
+    assert "sampled for missing classes" in status, status
+    model = joblib.load(trainer.MODEL_PATH)
+    assert model.classes_.tolist() == [0, 1]
+    assert read_state(trainer.MODEL_PATH)["updates"][-1]["class_rows_sampled"] > 0